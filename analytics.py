@@ -0,0 +1,118 @@
+import sys
+import time
+import pandas as pd
+
+# Cube dimensions, coarsest first
+DIMENSIONS = ['department', 'semester', 'class_name', 'section']
+
+# Additive measures stored per cell; rates are derived after summing
+MEASURES = ['enrolled', 'graded', 'marks_sum', 'present_count', 'total_count', 'assignments_due', 'submissions']
+
+# Rebuild the cells of every dirty course from the enrollment counters kept
+# up to date by the attendance and grade triggers
+REFRESH_STATEMENTS = [
+    "DELETE FROM analytics_cube WHERE course_id IN (SELECT course_id FROM analytics_dirty)",
+    """
+    INSERT INTO analytics_cube (course_id, class_name, section, department, semester,
+                                enrolled, graded, marks_sum, present_count, total_count,
+                                assignments_due, submissions)
+    WITH assignment_counts AS (
+        SELECT course_id, COUNT(*) AS n
+        FROM assignments
+        WHERE course_id IN (SELECT course_id FROM analytics_dirty)
+        GROUP BY course_id
+    ),
+    submission_counts AS (
+        SELECT a.course_id, sub.student_id, COUNT(*) AS n
+        FROM assignment_submissions sub
+        JOIN assignments a ON sub.assignment_id = a.assignment_id
+        WHERE a.course_id IN (SELECT course_id FROM analytics_dirty)
+        GROUP BY a.course_id, sub.student_id
+    )
+    SELECT e.course_id, s.class_name, s.section, c.department, c.semester,
+           COUNT(*),
+           SUM(e.weight_sum > 0),
+           SUM(CASE WHEN e.weight_sum > 0 THEN e.marks ELSE 0 END),
+           SUM(e.present_count),
+           SUM(e.total_count),
+           SUM(COALESCE(ac.n, 0)),
+           SUM(COALESCE(sc.n, 0))
+    FROM enrollments e
+    JOIN students s ON e.student_id = s.student_id
+    JOIN courses c ON e.course_id = c.course_id
+    LEFT JOIN assignment_counts ac ON ac.course_id = e.course_id
+    LEFT JOIN submission_counts sc ON sc.course_id = e.course_id AND sc.student_id = e.student_id
+    WHERE e.status = 'enrolled' AND e.course_id IN (SELECT course_id FROM analytics_dirty)
+    GROUP BY e.course_id, s.class_name, s.section
+    """,
+    "DELETE FROM analytics_dirty",
+]
+
+def derive_rates(frame):
+    """Add average marks, attendance rate and submission rate (percent) to summed measures"""
+    frame = frame.copy()
+    frame['avg_marks'] = frame['marks_sum'] / frame['graded'].where(frame['graded'] > 0)
+    frame['attendance_rate'] = frame['present_count'] * 100 / frame['total_count'].where(frame['total_count'] > 0)
+    frame['submission_rate'] = frame['submissions'] * 100 / frame['assignments_due'].where(frame['assignments_due'] > 0)
+    return frame.round({'avg_marks': 2, 'attendance_rate': 2, 'submission_rate': 2})
+
+class AnalyticsCube:
+    """Department x semester x class x section aggregates of marks, attendance and submissions
+
+    Cells live in the analytics_cube table, one per course and class/section.
+    Triggers record which courses changed in analytics_dirty; a refresh
+    rebuilds just those courses' cells in one set-based statement. Reads
+    come from the query cache, and drill-downs are pandas group-bys over
+    a few hundred cells.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def refresh(self, full=False):
+        """Rebuild stale cells (every cell when full); returns the number of courses refreshed"""
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            if full:
+                cursor.execute("INSERT OR IGNORE INTO analytics_dirty (course_id) SELECT course_id FROM courses")
+            cursor.execute("SELECT COUNT(*) FROM analytics_dirty")
+            refreshed = cursor.fetchone()[0]
+            if refreshed:
+                for statement in REFRESH_STATEMENTS:
+                    cursor.execute(statement)
+            conn.commit()
+            cursor.close()
+        return refreshed
+
+    def cells(self):
+        """All cube cells, refreshed first if any course changed"""
+        if self.db.get_analytics_pending():
+            self.refresh()
+        return self.db.get_analytics_cells()
+
+    def drill_down(self, dimensions, filters=None):
+        """Measures and rates grouped by the given dimensions
+
+        filters maps a dimension to a value (or list of values) to keep.
+        An empty dimensions list gives the institution-wide totals.
+        """
+        frame = self.cells()
+        for dimension, value in (filters or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            frame = frame[frame[dimension].isin(values)]
+        if dimensions:
+            frame = frame.groupby(list(dimensions), dropna=False, sort=True)[MEASURES].sum().reset_index()
+        else:
+            # Grouping on a constant keeps the integer column types
+            frame = frame.groupby(lambda _: 0)[MEASURES].sum().reset_index(drop=True)
+        return derive_rates(frame)
+
+if __name__ == "__main__":
+    from database import Database
+    cube = AnalyticsCube(Database())
+    start = time.perf_counter()
+    refreshed = cube.refresh(full='--full' in sys.argv)
+    print(f"✅ Refreshed {refreshed} courses in {(time.perf_counter() - start) * 1000:.0f} ms")
+    dimensions = [d for d in sys.argv[1:] if d in DIMENSIONS] or ['department']
+    print(cube.drill_down(dimensions).to_string(index=False))
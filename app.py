@@ -2,10 +2,21 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
 from database import Database
+from async_database import AsyncDatabase
+from index_advisor import IndexAdvisor
+from user_import import UserImporter, template_csv
+from exporter import DataExporter, EXPORT_QUERIES, EXPORT_FORMATS
+from analytics import AnalyticsCube, DIMENSIONS
+from transcript import TranscriptEngine
+from attendance_analytics import AttendanceAnalytics
+from archive import TermArchiver
+from file_store import SubmissionFileStore, format_size
+from attendance_store import term_start
 import hashlib
 import time
 import sys
 import os
+import tempfile
 
 # Page configuration - MUST be first Streamlit command
 st.set_page_config(
@@ -23,10 +34,25 @@ if 'logged_in' not in st.session_state:
     st.session_state.page = "login"
     st.session_state.viewing_submissions = None
 
-# Initialize database
+# Initialize database - one shared instance per process, so schema
+# migrations and pool setup do not run again on every rerun
+@st.cache_resource
+def get_database():
+    return Database()
+
+# Coroutine facade so pages can load independent reads concurrently
+@st.cache_resource
+def get_async_database():
+    return AsyncDatabase(get_database())
+
+# Content-addressed submission files
+@st.cache_resource
+def get_file_store():
+    return SubmissionFileStore(get_database())
+
 def init_database():
     try:
-        db = Database()
+        db = get_database()
         return db
     except Exception as e:
         st.error(f"❌ Failed to initialize database: {str(e)}")
@@ -36,6 +62,8 @@ db = init_database()
 if db is None:
     st.error("Failed to connect to database. Please check the console for errors.")
     st.stop()
+adb = get_async_database()
+files = get_file_store()
 
 # Helper function for rerun
 def rerun_app():
@@ -52,6 +80,37 @@ def rerun_app():
         </script>
         """, unsafe_allow_html=True)
 
+# Keyset pagination for the admin list pages
+PAGE_SIZE = 50
+
+def paged_results(key, fetch_page, reset_on=(), as_frame=True):
+    """Fetch one page from a keyset-paginated getter and render Previous/Next controls
+    
+    The stack of page cursors lives in session state and is reset whenever
+    reset_on (e.g. the active filters) changes.
+    """
+    state_key = f"page_cursors_{key}"
+    state = st.session_state.get(state_key)
+    if state is None or state['reset_on'] != reset_on:
+        state = {'reset_on': reset_on, 'cursors': [None]}
+        st.session_state[state_key] = state
+    cursors = state['cursors']
+    
+    rows, next_after = fetch_page(after=cursors[-1], limit=PAGE_SIZE, as_frame=as_frame)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("← Previous", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            rerun_app()
+    with col2:
+        st.caption(f"Page {len(cursors)} · {len(rows)} rows")
+    with col3:
+        if st.button("Next →", key=f"{key}_next", disabled=next_after is None):
+            cursors.append(next_after)
+            rerun_app()
+    return rows
+
 # Authentication functions
 def login():
     st.title("🎓 Student Management System")
@@ -94,7 +153,9 @@ def login():
     
     if login_clicked:
         if username and password:
-            user = db.authenticate_user(username, password)
+            # st.context.ip_address is only available on newer Streamlit versions
+            client_ip = getattr(getattr(st, 'context', None), 'ip_address', None)
+            user = db.authenticate_user(username, password, client_ip=client_ip)
             if user:
                 st.session_state.logged_in = True
                 st.session_state.user = user
@@ -251,6 +312,7 @@ def admin_dashboard():
         "👨‍🏫 Teacher Management",
         "📚 Course Management",
         "➕ Create New User",
+        "📈 Analytics",
         "⚙️ System Settings"
     ])
     
@@ -258,23 +320,20 @@ def admin_dashboard():
     st.markdown("---")
     
     if menu == "📊 Dashboard":
+        stats = db.get_system_stats()
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            students = db.get_all_students()
-            st.metric("Total Students", len(students))
+            st.metric("Total Students", stats['total_students'])
         
         with col2:
-            teachers = db.get_all_teachers()
-            st.metric("Total Teachers", len(teachers))
+            st.metric("Total Teachers", stats['total_teachers'])
         
         with col3:
-            courses = db.get_all_courses()
-            st.metric("Total Courses", len(courses))
+            st.metric("Total Courses", stats['total_courses'])
         
         with col4:
-            users = db.get_all_users()
-            st.metric("Total Users", len(users))
+            st.metric("Total Users", stats['total_users'])
         
         # Recent activities
         st.subheader("📈 Recent Activities")
@@ -282,36 +341,37 @@ def admin_dashboard():
         
         with col1:
             st.write("**Recent Students**")
-            if students:
-                df_students = pd.DataFrame(students[:5])
+            if stats['recent_students']:
+                df_students = pd.DataFrame(stats['recent_students'])
                 st.dataframe(df_students[['roll_number', 'full_name', 'class_name', 'section']])
         
         with col2:
             st.write("**Recent Teachers**")
-            if teachers:
-                df_teachers = pd.DataFrame(teachers[:5])
+            if stats['recent_teachers']:
+                df_teachers = pd.DataFrame(stats['recent_teachers'])
                 st.dataframe(df_teachers[['employee_id', 'full_name', 'department']])
     
     elif menu == "👥 User Management":
         st.subheader("Manage Users")
         
-        users = db.get_all_users()
-        if users:
-            df = pd.DataFrame(users)
+        # Search and filter - applied in the query so paging stays correct
+        col1, col2 = st.columns(2)
+        with col1:
+            search = st.text_input("Search users")
+        with col2:
+            filter_role = st.selectbox("Filter by role", ["All", "admin", "teacher", "student"])
+        
+        df = paged_results(
+            "users",
+            lambda **page: db.get_all_users_page(
+                role=None if filter_role == "All" else filter_role,
+                search=search or None,
+                **page
+            ),
+            reset_on=(search, filter_role)
+        )
+        if not df.empty:
             df = df[['user_id', 'username', 'email', 'full_name', 'role', 'created_at']]
-            
-            # Search and filter
-            col1, col2 = st.columns(2)
-            with col1:
-                search = st.text_input("Search users")
-            with col2:
-                filter_role = st.selectbox("Filter by role", ["All", "admin", "teacher", "student"])
-            
-            if search:
-                df = df[df.apply(lambda row: search.lower() in str(row).lower(), axis=1)]
-            if filter_role != "All":
-                df = df[df['role'] == filter_role]
-            
             st.dataframe(df)
             
             # User actions
@@ -322,7 +382,7 @@ def admin_dashboard():
                 st.write("### User Details")
                 user_id = st.number_input("User ID to view", min_value=1, step=1)
                 if user_id:
-                    user = next((u for u in users if u['user_id'] == user_id), None)
+                    user = db.get_user_by_id(user_id)
                     if user:
                         st.write(f"Username: {user['username']}")
                         st.write(f"Role: {user['role']}")
@@ -338,32 +398,30 @@ def admin_dashboard():
                 st.write("### Delete User")
                 del_user_id = st.number_input("User ID to delete", min_value=1, step=1, key="del_user")
                 if st.button("Delete User"):
-                    try:
-                        cursor = db.conn.cursor()
-                        cursor.execute("DELETE FROM users WHERE user_id = ?", (del_user_id,))
-                        db.conn.commit()
+                    if db.delete_user(del_user_id):
                         st.success("User deleted!")
                         time.sleep(1)
                         rerun_app()
-                    except Exception as e:
-                        st.error(f"Error deleting user: {str(e)}")
         else:
             st.info("No users found")
     
     elif menu == "🎓 Student Management":
         st.subheader("Student Management")
         
-        students = db.get_all_students()
-        if students:
-            df = pd.DataFrame(students)
+        students = paged_results("students", db.get_all_students_page)
+        if not students.empty:
+            # GPAs for the whole page in one batch
+            transcripts = TranscriptEngine(db)
+            gpas = transcripts.summaries(students['student_id'].tolist()).set_index('student_id')['gpa']
+            df = students.assign(gpa=students['student_id'].map(gpas))
             df = df[['student_id', 'roll_number', 'full_name', 'class_name', 
-                    'section', 'phone', 'email']]
+                    'section', 'gpa', 'phone', 'email']]
             
             st.dataframe(df)
             
             # Student details
             st.subheader("Student Details")
-            student_options = [f"{s['roll_number']} - {s['full_name']}" for s in students]
+            student_options = [f"{s.roll_number} - {s.full_name}" for s in students.itertuples()]
             if student_options:
                 selected_student = st.selectbox(
                     "Select Student",
@@ -373,7 +431,7 @@ def admin_dashboard():
                 if selected_student:
                     # Extract roll number correctly
                     roll_num = selected_student.split(" - ")[0]
-                    student = next((s for s in students if s['roll_number'] == roll_num), None)
+                    student = next(iter(students[students['roll_number'] == roll_num].to_dict('records')), None)
                     
                     if student:
                         col1, col2 = st.columns(2)
@@ -390,27 +448,40 @@ def admin_dashboard():
                             st.write(f"**Guardian Phone:** {student['guardian_phone'] or 'N/A'}")
                         
                         # Student enrollments
-                        enrollments = db.get_student_enrollments(student['student_id'])
-                        if enrollments:
+                        df_enrollments = db.get_student_enrollments(student['student_id'], as_frame=True)
+                        if not df_enrollments.empty:
                             st.subheader("📚 Enrolled Courses")
-                            df_enrollments = pd.DataFrame(enrollments)
                             st.dataframe(df_enrollments[['course_code', 'course_name', 'credits', 'grade', 'marks', 'attendance_percentage']])
+                        
+                        semesters = transcripts.transcript(student['student_id'])['semesters']
+                        if not semesters.empty:
+                            st.subheader("🎓 GPA by Semester")
+                            st.dataframe(semesters[['semester', 'courses', 'credits', 'gpa', 'cumulative_gpa']])
+                        
+                        if db.get_term_archives():
+                            history = TermArchiver(db).history(student['student_id'])
+                            if any(not frame.empty for frame in history.values()):
+                                with st.expander("🗄️ Archived Records"):
+                                    st.write(", ".join(f"**{table.replace('_', ' ').title()}:** {len(frame)}"
+                                                       for table, frame in history.items()))
+                                    if not history['enrollments'].empty:
+                                        st.dataframe(history['enrollments'][['archive_year', 'course_id', 'enrollment_date',
+                                                                             'status', 'grade', 'marks', 'attendance_percentage']])
         else:
             st.info("No students found")
     
     elif menu == "👨‍🏫 Teacher Management":
         st.subheader("Teacher Management")
         
-        teachers = db.get_all_teachers()
-        if teachers:
-            df = pd.DataFrame(teachers)
-            df = df[['teacher_id', 'employee_id', 'full_name', 'department', 
+        teachers = paged_results("teachers", db.get_all_teachers_page)
+        if not teachers.empty:
+            df = teachers[['teacher_id', 'employee_id', 'full_name', 'department', 
                     'qualification', 'experience', 'phone', 'email']]
             
             st.dataframe(df)
             
             # Teacher details and courses
-            teacher_options = [f"{t['employee_id']} - {t['full_name']}" for t in teachers]
+            teacher_options = [f"{t.employee_id} - {t.full_name}" for t in teachers.itertuples()]
             if teacher_options:
                 selected_teacher = st.selectbox(
                     "Select Teacher",
@@ -420,7 +491,7 @@ def admin_dashboard():
                 if selected_teacher:
                     # Extract employee ID correctly
                     emp_id = selected_teacher.split(" - ")[0]
-                    teacher = next((t for t in teachers if t['employee_id'] == emp_id), None)
+                    teacher = next(iter(teachers[teachers['employee_id'] == emp_id].to_dict('records')), None)
                     
                     if teacher:
                         col1, col2 = st.columns(2)
@@ -436,10 +507,9 @@ def admin_dashboard():
                             st.write(f"**Phone:** {teacher['phone'] or 'N/A'}")
                         
                         # Teacher's courses
-                        courses = db.get_courses_by_teacher(teacher['teacher_id'])
-                        if courses:
+                        df_courses = db.get_courses_by_teacher(teacher['teacher_id'], as_frame=True)
+                        if not df_courses.empty:
                             st.subheader("📚 Assigned Courses")
-                            df_courses = pd.DataFrame(courses)
                             st.dataframe(df_courses[['course_code', 'course_name', 'credits', 'semester', 'enrolled_students']])
         else:
             st.info("No teachers found")
@@ -447,9 +517,8 @@ def admin_dashboard():
     elif menu == "📚 Course Management":
         st.subheader("Course Management")
         
-        courses = db.get_all_courses()
-        if courses:
-            df = pd.DataFrame(courses)
+        df = paged_results("courses", db.get_all_courses_page)
+        if not df.empty:
             df = df[['course_id', 'course_code', 'course_name', 'credits', 
                     'department', 'semester', 'teacher_name', 'enrolled_students']]
             
@@ -585,6 +654,110 @@ def admin_dashboard():
                         st.success(f"{role.capitalize()} user created successfully!")
                         time.sleep(1)
                         rerun_app()
+        
+        st.markdown("---")
+        st.subheader("📥 Bulk Import from CSV")
+        st.write("One row per user; students need roll_number, class_name and section, teachers need employee_id.")
+        st.download_button(
+            label="Download CSV Template",
+            data=template_csv(),
+            file_name="users_template.csv",
+            mime="text/csv"
+        )
+        
+        uploaded_csv = st.file_uploader("Users CSV", type=['csv'])
+        if uploaded_csv is not None and st.button("Import Users"):
+            progress_text = st.empty()
+            
+            def show_progress(rows, imported):
+                progress_text.info(f"⏳ {rows} rows read, {imported} imported...")
+            
+            result = UserImporter(db).import_csv(uploaded_csv, progress=show_progress)
+            progress_text.empty()
+            if result['imported']:
+                st.success(f"✅ Imported {result['imported']} of {result['rows']} users")
+            if result['errors']:
+                st.error(f"❌ {len(result['errors'])} rows were not imported")
+                st.dataframe(pd.DataFrame(result['errors']), use_container_width=True)
+    
+    elif menu == "📈 Analytics":
+        st.subheader("Institution Analytics")
+        
+        cube = AnalyticsCube(db)
+        totals = cube.drill_down([])
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Active Enrollments", int(totals['enrolled'].sum()))
+        with col2:
+            avg_marks = totals['avg_marks'].iloc[0] if not totals.empty else None
+            st.metric("Average Marks", f"{avg_marks:.1f}%" if pd.notna(avg_marks) else "N/A")
+        with col3:
+            attendance_rate = totals['attendance_rate'].iloc[0] if not totals.empty else None
+            st.metric("Attendance Rate", f"{attendance_rate:.1f}%" if pd.notna(attendance_rate) else "N/A")
+        with col4:
+            submission_rate = totals['submission_rate'].iloc[0] if not totals.empty else None
+            st.metric("Submission Rate", f"{submission_rate:.1f}%" if pd.notna(submission_rate) else "N/A")
+        
+        labels = {'department': 'Department', 'semester': 'Semester', 'class_name': 'Class', 'section': 'Section'}
+        group_by = st.multiselect(
+            "Group by",
+            options=DIMENSIONS,
+            default=['department', 'semester'],
+            format_func=labels.get
+        )
+        
+        # Filter on any dimension that is not grouped
+        cells = cube.cells()
+        filters = {}
+        filter_dimensions = [d for d in DIMENSIONS if d not in group_by]
+        if filter_dimensions and not cells.empty:
+            columns = st.columns(len(filter_dimensions))
+            for column, dimension in zip(columns, filter_dimensions):
+                with column:
+                    choice = st.selectbox(
+                        labels[dimension],
+                        ["All"] + sorted(cells[dimension].dropna().unique().tolist()),
+                        key=f"analytics_{dimension}"
+                    )
+                    if choice != "All":
+                        filters[dimension] = choice
+        
+        df = cube.drill_down(group_by, filters)
+        if df.empty:
+            st.info("No enrollment data yet")
+        else:
+            metric = st.selectbox(
+                "Chart",
+                ['avg_marks', 'attendance_rate', 'submission_rate'],
+                format_func=lambda m: m.replace('_', ' ').title()
+            )
+            if group_by:
+                chart = df.assign(group=df[group_by].astype(str).agg(' / '.join, axis=1)).set_index('group')
+                st.bar_chart(chart[metric])
+            st.dataframe(
+                df[group_by + ['enrolled', 'avg_marks', 'attendance_rate', 'submission_rate',
+                               'graded', 'total_count', 'submissions', 'assignments_due']],
+                use_container_width=True
+            )
+        
+        if st.button("Rebuild Analytics"):
+            refreshed = cube.refresh(full=True)
+            st.success(f"Rebuilt analytics for {refreshed} courses")
+
+        if st.button("Store Stale Transcripts"):
+            refreshed = TranscriptEngine(db).refresh_stale()
+            st.success(f"Stored transcripts for {refreshed} students")
+
+        attendance_analytics = AttendanceAnalytics(db)
+        st.write(f"### ⚠️ At-Risk Students (last {attendance_analytics.short_days}/{attendance_analytics.long_days} days)")
+        at_risk = attendance_analytics.at_risk()
+        if not at_risk.empty:
+            st.metric("Students at Risk", at_risk['student_id'].nunique())
+            st.dataframe(at_risk[['course_code', 'roll_number', 'student_name', 'class_name', 'section',
+                                  'short_rate', 'long_rate', 'absent_streak', 'reasons']],
+                         use_container_width=True)
+        else:
+            st.success("No students below the attendance thresholds")
     
     elif menu == "⚙️ System Settings":
         st.subheader("System Settings")
@@ -597,47 +770,104 @@ def admin_dashboard():
                 st.success("Database reset successfully!")
                 time.sleep(1)
                 rerun_app()
+
+        st.write("### Query Cache")
+        stats = db.cache_stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Cached Results", stats['entries'])
+        with col2:
+            st.metric("Cache Size", f"{stats['bytes'] / 1024:.1f} KB")
+        with col3:
+            st.metric("Hits / Misses", f"{stats['hits']} / {stats['misses']}")
+        with col4:
+            st.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+        if st.button("Clear Query Cache"):
+            db.cache.clear()
+            st.success("Query cache cleared!")
+
+        st.write("### Query Plan Advisor")
+        if st.button("Run Index Advisor"):
+            findings, skipped = IndexAdvisor(db).analyze()
+            flagged = [f for f in findings if f['full_scans'] or f['temp_btrees']]
+            st.metric("Queries Explained", len(findings))
+            if flagged:
+                st.warning(f"{len(flagged)} queries use full scans or temp B-trees")
+            else:
+                st.success("All queries are index-driven")
+            df = pd.DataFrame([{
+                'method': f['method'],
+                'full_scans': "; ".join(f['full_scans']),
+                'temp_btrees': "; ".join(f['temp_btrees']),
+                'plan': " | ".join(f['plan'])
+            } for f in findings])
+            st.dataframe(df, use_container_width=True)
+            for method, reason in skipped:
+                st.info(f"Skipped {method}: {reason}")
+        
+        st.write("### Term Archive")
+        archives = db.get_term_archives()
+        if archives:
+            st.dataframe(pd.DataFrame(archives)[['year', 'path', 'archived_before', 'row_count', 'updated_at']],
+                         use_container_width=True)
+        else:
+            st.info("No terms archived yet")
+        if db.attendance_store is not None:
+            st.warning("Term archiving reads the attendance table and is not available with the bitmap attendance store")
+            archive_before = None
+        else:
+            archive_before = st.date_input("Archive closed terms before", value=term_start(date.today()))
+        if archive_before and st.button("Archive Closed Terms"):
+            try:
+                moved = TermArchiver(db).archive(archive_before)
+                if moved:
+                    for year, tables in moved.items():
+                        st.success(f"✅ {year}: " + ", ".join(f"{rows} {table}" for table, rows in tables.items()))
+                else:
+                    st.info("Nothing to archive")
+            except Exception as e:
+                st.error(f"❌ Error archiving terms: {str(e)}")
         
         st.write("### Export Data")
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         with col1:
-            if st.button("Export Students"):
-                students = db.get_all_students()
-                if students:
-                    df = pd.DataFrame(students)
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name="students.csv",
-                        mime="text/csv"
-                    )
-        
+            datasets = st.multiselect(
+                "Datasets",
+                list(EXPORT_QUERIES),
+                default=["students", "teachers", "courses"]
+            )
         with col2:
-            if st.button("Export Teachers"):
-                teachers = db.get_all_teachers()
-                if teachers:
-                    df = pd.DataFrame(teachers)
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name="teachers.csv",
-                        mime="text/csv"
-                    )
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS))
         
-        with col3:
-            if st.button("Export Courses"):
-                courses = db.get_all_courses()
-                if courses:
-                    df = pd.DataFrame(courses)
-                    csv = df.to_csv(index=False)
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name="courses.csv",
-                        mime="text/csv"
-                    )
+        if datasets:
+            extension, mime = EXPORT_FORMATS[export_format]
+            if len(datasets) == 1:
+                file_name = datasets[0] + extension
+            else:
+                file_name, mime = "export.zip", "application/zip"
+            
+            def build_export(datasets=tuple(datasets), export_format=export_format):
+                # Runs on click only: rows stream from one read snapshot into an
+                # anonymous temp file, never through a DataFrame or a CSV string
+                exporter = DataExporter(db)
+                with tempfile.TemporaryFile(buffering=0) as export_file:
+                    if len(datasets) == 1:
+                        with exporter.snapshot() as conn:
+                            exporter.write(conn, datasets[0], export_format, export_file)
+                    else:
+                        exporter.export_bundle(list(datasets), export_format, export_file)
+                    export_file.seek(0)
+                    return export_file.read()
+            
+            st.download_button(
+                label=f"📥 Export {file_name}",
+                data=build_export,
+                file_name=file_name,
+                mime=mime,
+                on_click="ignore",
+                key="export_download"
+            )
+            st.caption("The export is built from one consistent snapshot when you click.")
 
 # Dashboard functions - TEACHER
 def teacher_dashboard():
@@ -671,8 +901,12 @@ def teacher_dashboard():
     if menu == "📊 Dashboard":
         st.subheader(f"Welcome, {teacher['full_name']}!")
         
-        # Get teacher's courses
-        courses = db.get_courses_by_teacher(teacher['teacher_id'])
+        # Courses and the at-risk list are independent reads
+        attendance_analytics = AttendanceAnalytics(db)
+        courses, at_risk = adb.gather(
+            adb.get_courses_by_teacher(teacher['teacher_id']),
+            adb.run(attendance_analytics.at_risk, teacher_id=teacher['teacher_id']),
+        )
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -696,6 +930,14 @@ def teacher_dashboard():
             st.dataframe(df_courses[['course_code', 'course_name', 'credits', 'semester', 'enrolled_students']])
         else:
             st.info("No courses assigned yet")
+        
+        # Rolling-window attendance across all of this teacher's courses
+        st.subheader(f"⚠️ At-Risk Students (last {attendance_analytics.short_days}/{attendance_analytics.long_days} days)")
+        if not at_risk.empty:
+            st.dataframe(at_risk[['course_code', 'roll_number', 'student_name', 'short_rate', 'long_rate',
+                                  'absent_streak', 'last_date', 'reasons']])
+        else:
+            st.success("No students below the attendance thresholds")
     
     elif menu == "📚 My Courses":
         st.subheader("My Courses")
@@ -720,10 +962,9 @@ def teacher_dashboard():
                 with col_btn1:
                     if st.button("View Students", key=f"view_{idx}"):
                         # Simplified - just show students
-                        enrollments = db.get_course_enrollments(course['course_id'])
-                        if enrollments:
+                        df_students = db.get_course_enrollments(course['course_id'], as_frame=True)
+                        if not df_students.empty:
                             st.subheader(f"Students in {course['course_code']}")
-                            df_students = pd.DataFrame(enrollments)
                             st.dataframe(df_students[['roll_number', 'student_name', 'grade', 'marks']])
                         else:
                             st.info("No students enrolled")
@@ -750,13 +991,10 @@ def teacher_dashboard():
                                 })
                             
                             if st.button("Submit Attendance", key=f"submit_att_{idx}"):
-                                success_count = 0
-                                for data in attendance_data:
-                                    if db.mark_attendance(
-                                        data['student_id'], course['course_id'], 
-                                        str(attendance_date), data['status']
-                                    ):
-                                        success_count += 1
+                                success_count = db.mark_attendance_bulk(
+                                    course['course_id'], str(attendance_date),
+                                    [(data['student_id'], data['status'], "") for data in attendance_data]
+                                )
                                 
                                 if success_count == len(attendance_data):
                                     st.success("Attendance marked successfully!")
@@ -859,13 +1097,10 @@ def teacher_dashboard():
                                     })
                                 
                                 if st.button("Submit Attendance"):
-                                    success_count = 0
-                                    for data in attendance_data:
-                                        if db.mark_attendance(
-                                            data['student_id'], course_id, 
-                                            str(attendance_date), data['status']
-                                        ):
-                                            success_count += 1
+                                    success_count = db.mark_attendance_bulk(
+                                        course_id, str(attendance_date),
+                                        [(data['student_id'], data['status'], "") for data in attendance_data]
+                                    )
                                     
                                     if success_count == len(attendance_data):
                                         st.success("Attendance marked successfully!")
@@ -929,13 +1164,10 @@ def teacher_dashboard():
                         })
                     
                     if st.button("Submit Attendance"):
-                        success_count = 0
-                        for data in attendance_data:
-                            if db.mark_attendance(
-                                data['student_id'], course_id, 
-                                str(attendance_date), data['status']
-                            ):
-                                success_count += 1
+                        success_count = db.mark_attendance_bulk(
+                            course_id, str(attendance_date),
+                            [(data['student_id'], data['status'], "") for data in attendance_data]
+                        )
                         
                         if success_count == len(attendance_data):
                             st.success("Attendance marked successfully!")
@@ -981,6 +1213,17 @@ def teacher_dashboard():
                         pending = total - graded
                         st.metric("Pending", pending)
                     
+                    # All files and text answers as one ZIP, built on disk on click
+                    # and reused until another submission arrives
+                    st.download_button(
+                        label=f"📦 Download All Submissions ({total})",
+                        data=lambda: files.read_bundle(assignment_id, submissions),
+                        file_name=f"{assignment['title']}_submissions.zip".replace(" ", "_"),
+                        mime="application/zip",
+                        on_click="ignore",
+                        key=f"download_all_{assignment_id}"
+                    )
+                    
                     # Submissions table
                     for sub_idx, submission in enumerate(submissions):
                         with st.expander(f"{submission['roll_number']} - {submission['student_name']}"):
@@ -992,18 +1235,27 @@ def teacher_dashboard():
                                     st.write(f"**Text Submission:**")
                                     st.info(submission['submission_text'])
                                 if submission.get('submission_file'):
-                                    st.write(f"**File:** {submission['submission_file']}")
-                                    # Show download button for file
-                                    file_path = f"assignments/{submission['roll_number']}_{assignment_id}_{submission['submission_file']}"
+                                    # Metadata comes from the submission row (or a stat for
+                                    # files from before the store); contents are only read
+                                    # when the download is requested
+                                    file_path = files.submission_path(submission)
                                     if os.path.exists(file_path):
-                                        with open(file_path, "rb") as file:
-                                            st.download_button(
-                                                label="Download File",
-                                                data=file,
-                                                file_name=submission['submission_file'],
-                                                mime="application/octet-stream"
-                                            )
+                                        size = submission.get('file_size')
+                                        if size is None:
+                                            size = os.path.getsize(file_path)
+                                        st.write(f"**File:** {submission['submission_file']} ({format_size(size)})")
+                                        if submission.get('file_hash'):
+                                            st.caption(f"SHA-256 {submission['file_hash'][:16]}…")
+                                        st.download_button(
+                                            label="Download File",
+                                            data=files.download(file_path),
+                                            file_name=submission['submission_file'],
+                                            mime="application/octet-stream",
+                                            on_click="ignore",
+                                            key=f"download_{submission['submission_id']}"
+                                        )
                                     else:
+                                        st.write(f"**File:** {submission['submission_file']}")
                                         st.warning("File not found on server")
                             with col2:
                                 if submission.get('status') == 'graded':
@@ -1124,76 +1376,150 @@ def teacher_dashboard():
             
             if selected_course:
                 course_id = next(c['course_id'] for c in courses if f"{c['course_code']} - {c['course_name']}" == selected_course)
-                enrollments = db.get_course_enrollments(course_id)
+                # Whole student x assignment matrix in one query
+                gradebook = db.get_course_gradebook(course_id)
+                students = gradebook['students']
+                assignments = gradebook['assignments']
                 
-                if enrollments:
+                if not students.empty:
                     # Overall course statistics
                     col1, col2, col3 = st.columns(3)
                     with col1:
-                        st.metric("Total Students", len(enrollments))
+                        st.metric("Total Students", len(students))
                     with col2:
-                        avg_marks = sum(e.get('marks', 0) for e in enrollments) / len(enrollments) if enrollments else 0
+                        avg_marks = students['marks'].fillna(0).mean()
                         st.metric("Average Marks", f"{avg_marks:.1f}%")
                     with col3:
-                        assignments = db.get_assignments_by_course(course_id)
                         st.metric("Total Assignments", len(assignments))
                     
+                    # Column label per assignment; ids only where titles repeat
+                    duplicate_titles = assignments['title'].duplicated(keep=False)
+                    labels = {
+                        row.assignment_id: f"{row.title} ({row.assignment_id})" if dup else row.title
+                        for row, dup in zip(assignments.itertuples(), duplicate_titles)
+                    }
+                    
+                    st.write("### Gradebook")
+                    matrix = gradebook['marks'].rename(columns=labels)
+                    matrix.index = [f"{r.roll_number} - {r.student_name}" for r in students.itertuples()]
+                    matrix["Course Marks %"] = students['marks'].to_numpy()
+                    matrix["Assignment Avg %"] = students['assignment_average'].round(1).to_numpy()
+                    st.dataframe(matrix, use_container_width=True)
+                    
+                    if not assignments.empty:
+                        st.write("### Assignment Statistics")
+                        df_stats = assignments[['title', 'due_date', 'total_marks', 'submitted_count',
+                                                'graded_count', 'average', 'highest', 'lowest', 'average_pct']]
+                        st.dataframe(df_stats.round(2), use_container_width=True)
+
+                        st.write("### Grade an Assignment")
+                        bulk_assignment = st.selectbox(
+                            "Assignment",
+                            options=list(labels),
+                            format_func=lambda assignment_id: labels[assignment_id],
+                            key=f"bulk_grade_assignment_{course_id}"
+                        )
+                        total_marks = assignments.set_index('assignment_id').loc[bulk_assignment, 'total_marks']
+                        with st.form(key=f"bulk_grade_{course_id}_{bulk_assignment}"):
+                            sheet = pd.DataFrame({
+                                'student_id': students['student_id'].to_numpy(),
+                                'Student': [f"{r.roll_number} - {r.student_name}" for r in students.itertuples()],
+                                'Marks': gradebook['marks'][bulk_assignment].to_numpy(),
+                                'Remarks': ""
+                            })
+                            edited = st.data_editor(
+                                sheet,
+                                column_config={
+                                    'student_id': None,
+                                    'Marks': st.column_config.NumberColumn(
+                                        f"Marks (out of {total_marks:g})", min_value=0.0, max_value=float(total_marks)
+                                    ),
+                                },
+                                disabled=['Student'],
+                                hide_index=True,
+                                use_container_width=True
+                            )
+
+                            if st.form_submit_button("Save Grades"):
+                                # Blank cells are students not graded yet
+                                graded = edited.dropna(subset=['Marks'])
+                                outcomes = db.update_grades_bulk(
+                                    int(bulk_assignment),
+                                    [(int(row.student_id), row.Marks, row.Remarks) for row in graded.itertuples()]
+                                )
+                                failed = [o for o in outcomes if not o['success']]
+                                saved = len(outcomes) - len(failed)
+                                if failed:
+                                    names = dict(zip(sheet['student_id'], sheet['Student']))
+                                    st.warning(f"Saved {saved}/{len(outcomes)} grades")
+                                    st.dataframe(pd.DataFrame({
+                                        'Student': [names.get(o['student_id'], o['student_id']) for o in failed],
+                                        'Error': [o['error'] for o in failed]
+                                    }), hide_index=True)
+                                else:
+                                    st.success(f"Saved {saved} grades!")
+                                    time.sleep(1)
+                                    rerun_app()
+
+                    submissions = {
+                        (row.student_id, row.assignment_id): row
+                        for row in gradebook['submissions'].itertuples()
+                    }
+                    marks_by_student = gradebook['marks']
+                    assignment_rows = list(assignments.itertuples())
+                    
                     st.write("### Student Grades")
-                    for idx, enrollment in enumerate(enrollments):
-                        with st.expander(f"{enrollment['roll_number']} - {enrollment['student_name']}"):
+                    for idx, enrollment in enumerate(students.itertuples()):
+                        with st.expander(f"{enrollment.roll_number} - {enrollment.student_name}"):
                             # Student info
                             col1, col2 = st.columns(2)
                             with col1:
-                                st.write(f"**Class:** {enrollment['class_name']}-{enrollment['section']}")
-                                st.write(f"**Course Grade:** {enrollment['grade'] or 'N/A'}")
-                                st.write(f"**Course Marks:** {enrollment['marks'] or '0'}%")
+                                st.write(f"**Class:** {enrollment.class_name}-{enrollment.section}")
+                                st.write(f"**Course Grade:** {enrollment.grade or 'N/A'}")
+                                st.write(f"**Course Marks:** {enrollment.marks or '0'}%")
                             with col2:
-                                st.write(f"**Attendance:** {enrollment.get('attendance_percentage', 0)}%")
-                                st.write(f"**Status:** {enrollment['status']}")
+                                st.write(f"**Attendance:** {enrollment.attendance_percentage or 0}%")
+                                st.write(f"**Status:** {enrollment.status}")
                             
-                            # Assignment grades
+                            # Assignment grades, read from this student's matrix row
                             st.subheader("Assignment Grades")
-                            grades = db.get_student_grades(enrollment['student_id'], course_id)
-                            if grades:
-                                df_grades = pd.DataFrame(grades)
-                                df_grades = df_grades[['title', 'marks_obtained', 'total_marks', 'remarks']]
+                            if enrollment.graded_count:
+                                student_marks = marks_by_student.loc[enrollment.student_id]
+                                df_grades = pd.DataFrame({
+                                    'title': assignments['title'].to_numpy(),
+                                    'marks_obtained': student_marks.to_numpy(),
+                                    'total_marks': assignments['total_marks'].to_numpy()
+                                }).dropna(subset=['marks_obtained'])
                                 st.dataframe(df_grades)
-                                
-                                # Calculate assignment average
-                                if not df_grades.empty:
-                                    total_obtained = df_grades['marks_obtained'].sum()
-                                    total_possible = df_grades['total_marks'].sum()
-                                    if total_possible > 0:
-                                        assignment_avg = (total_obtained / total_possible) * 100
-                                        st.write(f"**Assignment Average:** {assignment_avg:.1f}%")
+                                if enrollment.total_possible > 0:
+                                    st.write(f"**Assignment Average:** {enrollment.assignment_average:.1f}%")
                             else:
                                 st.info("No grades yet")
                             
                             # Quick grade assignment button
-                            if assignments:
+                            if assignment_rows:
                                 st.subheader("Quick Grade")
                                 selected_assignment = st.selectbox(
                                     "Select Assignment to Grade",
-                                    options=[f"{a['title']} (Due: {a['due_date']})" for a in assignments],
+                                    options=[f"{a.title} (Due: {a.due_date})" for a in assignment_rows],
                                     key=f"assign_select_{idx}"
                                 )
                                 
                                 if selected_assignment:
-                                    assignment = next(a for a in assignments if f"{a['title']} (Due: {a['due_date']})" == selected_assignment)
-                                    submissions = db.get_assignment_submissions(assignment['assignment_id'])
-                                    student_sub = next((s for s in submissions if s['student_id'] == enrollment['student_id']), None)
+                                    assignment = next(a for a in assignment_rows if f"{a.title} (Due: {a.due_date})" == selected_assignment)
+                                    student_sub = submissions.get((enrollment.student_id, assignment.assignment_id))
                                     
-                                    if student_sub:
-                                        if student_sub.get('status') == 'graded':
-                                            st.success(f"Already graded: {student_sub['marks_obtained']}/{assignment['total_marks']}")
-                                            if student_sub.get('feedback'):
-                                                st.write(f"Feedback: {student_sub['feedback']}")
+                                    if student_sub is not None:
+                                        if student_sub.submission_status == 'graded':
+                                            st.success(f"Already graded: {student_sub.marks_obtained}/{assignment.total_marks}")
+                                            if student_sub.feedback:
+                                                st.write(f"Feedback: {student_sub.feedback}")
                                         else:
                                             with st.form(key=f"quick_grade_{idx}"):
                                                 marks = st.number_input(
                                                     "Marks",
                                                     min_value=0.0,
-                                                    max_value=float(assignment['total_marks']),
+                                                    max_value=float(assignment.total_marks),
                                                     value=0.0,
                                                     key=f"quick_marks_{idx}"
                                                 )
@@ -1201,7 +1527,7 @@ def teacher_dashboard():
                                                 
                                                 if st.form_submit_button("Submit Grade"):
                                                     if db.grade_submission(
-                                                        student_sub['submission_id'],
+                                                        int(student_sub.submission_id),
                                                         marks,
                                                         feedback,
                                                         teacher['teacher_id']
@@ -1246,10 +1572,15 @@ def student_dashboard():
         st.error("Student profile not found!")
         return
     
+    # One set of queries per rerun; every tab below reads from it
+    overview = db.get_student_overview(student['student_id'])
+    enrollments = overview['enrollments']
+    
     if menu == "📊 Dashboard":
         st.subheader(f"Welcome, {student['full_name']}!")
         
-        enrollments = db.get_student_enrollments(student['student_id'])
+        grades = overview['grades']
+        attendance = overview['attendance']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -1261,12 +1592,8 @@ def student_dashboard():
             st.metric("Total Credits", total_credits)
         
         with col3:
-            if enrollments:
-                total_marks = sum(e.get('marks', 0) for e in enrollments)
-                avg_marks = total_marks / len(enrollments) if enrollments else 0
-                st.metric("Average Marks", f"{avg_marks:.1f}%")
-            else:
-                st.metric("Average Marks", "N/A")
+            gpa = TranscriptEngine(db).summaries([student['student_id']])['gpa'].iloc[0]
+            st.metric("Cumulative GPA", f"{gpa:.2f}" if pd.notna(gpa) else "N/A")
         
         with col4:
             st.metric("Class", f"{student['class_name']} - {student['section']}")
@@ -1278,11 +1605,34 @@ def student_dashboard():
             st.dataframe(df_enrollments[['course_code', 'course_name', 'credits', 'grade', 'marks', 'attendance_percentage']])
         else:
             st.info("No courses enrolled yet")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.subheader("📝 Pending Assignments")
+            pending = overview['pending_assignments']
+            if pending:
+                df_pending = pd.DataFrame(pending)
+                st.dataframe(df_pending[['course_code', 'title', 'due_date']])
+            else:
+                st.info("No pending assignments")
+        
+        with col2:
+            st.subheader("📈 Recent Grades")
+            if not grades.empty:
+                df_grades = grades.sort_values('graded_at', ascending=False).head(5)
+                st.dataframe(df_grades[['course_code', 'title', 'marks_obtained', 'total_marks']])
+            else:
+                st.info("No grades yet")
+        
+        st.subheader("📅 Recent Attendance")
+        if not attendance.empty:
+            st.dataframe(attendance.head(5)[['date', 'course_code', 'status']])
+        else:
+            st.info("No attendance records yet")
     
     elif menu == "📚 My Courses":
         st.subheader("My Courses")
         
-        enrollments = db.get_student_enrollments(student['student_id'])
         if enrollments:
             for idx, enrollment in enumerate(enrollments):
                 st.write(f"**{enrollment['course_code']} - {enrollment['course_name']}** ({enrollment['credits']} credits)")
@@ -1300,18 +1650,20 @@ def student_dashboard():
                 col_btn1, col_btn2 = st.columns(2)
                 with col_btn1:
                     if st.button("View Attendance", key=f"att_{idx}"):
-                        attendance = db.get_student_attendance(student['student_id'], enrollment['course_id'])
-                        if attendance:
-                            df_attendance = pd.DataFrame(attendance)
+                        df_attendance = overview['attendance']
+                        if not df_attendance.empty:
+                            df_attendance = df_attendance[df_attendance['course_id'] == enrollment['course_id']]
+                        if not df_attendance.empty:
                             st.dataframe(df_attendance[['date', 'status', 'remarks']])
                         else:
                             st.info("No attendance records")
                 
                 with col_btn2:
                     if st.button("View Grades", key=f"grades_{idx}"):
-                        grades = db.get_student_grades(student['student_id'], enrollment['course_id'])
-                        if grades:
-                            df_grades = pd.DataFrame(grades)
+                        df_grades = overview['grades']
+                        if not df_grades.empty:
+                            df_grades = df_grades[df_grades['course_id'] == enrollment['course_id']]
+                        if not df_grades.empty:
                             st.dataframe(df_grades[['title', 'marks_obtained', 'total_marks', 'remarks']])
                         else:
                             st.info("No grades available")
@@ -1322,7 +1674,6 @@ def student_dashboard():
     elif menu == "📅 My Attendance":
         st.subheader("My Attendance")
         
-        enrollments = db.get_student_enrollments(student['student_id'])
         if enrollments:
             options = [f"{e['course_code']} - {e['course_name']}" for e in enrollments] + ["All Courses"]
             selected_course = st.selectbox(
@@ -1335,14 +1686,18 @@ def student_dashboard():
                 if selected_course != "All Courses":
                     course_id = next(e['course_id'] for e in enrollments if f"{e['course_code']} - {e['course_name']}" == selected_course)
                 
-                attendance = db.get_student_attendance(student['student_id'], course_id)
-                if attendance:
-                    df_attendance = pd.DataFrame(attendance)
+                df_attendance = overview['attendance']
+                if course_id is not None and not df_attendance.empty:
+                    df_attendance = df_attendance[df_attendance['course_id'] == course_id]
+                if not df_attendance.empty:
                     df_attendance = df_attendance[['date', 'course_code', 'course_name', 'status', 'remarks']]
                     
-                    # Calculate statistics
-                    total_classes = len(df_attendance)
-                    present_classes = len(df_attendance[df_attendance['status'].isin(['present', 'late'])])
+                    # Statistics from the per-course summary
+                    summary = overview['attendance_summary']
+                    if course_id is not None:
+                        summary = summary[summary['course_id'] == course_id]
+                    total_classes = int(summary['total'].sum())
+                    present_classes = int(summary['present'].sum())
                     attendance_percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
                     
                     col1, col2, col3 = st.columns(3)
@@ -1362,7 +1717,6 @@ def student_dashboard():
     elif menu == "📈 My Grades":
         st.subheader("My Grades")
         
-        enrollments = db.get_student_enrollments(student['student_id'])
         if enrollments:
             options = [f"{e['course_code']} - {e['course_name']}" for e in enrollments] + ["All Courses"]
             selected_course = st.selectbox(
@@ -1375,9 +1729,10 @@ def student_dashboard():
                 if selected_course != "All Courses":
                     course_id = next(e['course_id'] for e in enrollments if f"{e['course_code']} - {e['course_name']}" == selected_course)
                 
-                grades = db.get_student_grades(student['student_id'], course_id)
-                if grades:
-                    df_grades = pd.DataFrame(grades)
+                df_grades = overview['grades']
+                if course_id is not None and not df_grades.empty:
+                    df_grades = df_grades[df_grades['course_id'] == course_id]
+                if not df_grades.empty:
                     df_grades = df_grades[['course_code', 'course_name', 'title', 'marks_obtained', 'total_marks', 'remarks']]
                     
                     # Calculate average
@@ -1391,14 +1746,41 @@ def student_dashboard():
                     st.dataframe(df_grades)
                 else:
                     st.info("No grades available yet")
+            
+            # Credit-weighted transcript across all courses
+            st.subheader("🎓 Transcript")
+            transcript = TranscriptEngine(db).transcript(student['student_id'])
+            if transcript['courses'].empty:
+                st.info("No graded courses yet")
+            else:
+                summary = transcript['summary']
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Cumulative GPA", f"{summary['gpa']:.2f}" if pd.notna(summary['gpa']) else "N/A")
+                with col2:
+                    st.metric("Graded Credits", f"{summary['credits']:g}")
+                with col3:
+                    st.metric("Graded Courses", int(summary['courses']))
+                
+                st.write("**By Semester**")
+                st.dataframe(transcript['semesters'][['semester', 'courses', 'credits', 'gpa', 'cumulative_gpa']])
+                st.write("**Courses**")
+                st.dataframe(transcript['courses'][['semester', 'course_code', 'course_name', 'credits', 'marks', 'letter', 'points']])
+                st.download_button(
+                    "📥 Download Transcript (CSV)",
+                    data=transcript['courses'].merge(
+                        transcript['semesters'][['semester', 'gpa', 'cumulative_gpa']], on='semester', how='left'
+                    ).drop(columns=['student_id', 'course_id', 'grade', 'status']).to_csv(index=False),
+                    file_name=f"transcript_{student['roll_number']}.csv",
+                    mime="text/csv"
+                )
         else:
             st.info("No courses enrolled")
     
     elif menu == "📝 My Assignments":
         st.subheader("My Assignments")
         
-        # Get all assignments for the student
-        assignments = db.get_student_assignments(student['student_id'])
+        assignments = overview['assignments']
         
         if assignments:
             # Filter options
@@ -1479,7 +1861,10 @@ def student_dashboard():
                             if assignment.get('submission_text'):
                                 st.write(f"**Your submission:** {assignment['submission_text']}")
                             if assignment.get('submission_file'):
-                                st.write(f"**Uploaded file:** {assignment['submission_file']}")
+                                if assignment.get('file_size') is not None:
+                                    st.write(f"**Uploaded file:** {assignment['submission_file']} ({format_size(assignment['file_size'])})")
+                                else:
+                                    st.write(f"**Uploaded file:** {assignment['submission_file']}")
                             
                             if assignment.get('submission_status') == 'graded':
                                 st.markdown("---")
@@ -1509,21 +1894,21 @@ def student_dashboard():
                                     if not submission_text and not uploaded_file:
                                         st.error("Please provide either text submission or upload a file")
                                     else:
-                                        # Handle file upload
-                                        file_path = ""
+                                        # Handle file upload - streamed into the store in
+                                        # chunks while hashing; identical files are kept once
+                                        file_name, file_hash, file_size = "", None, None
                                         if uploaded_file:
-                                            # Save file
-                                            file_path = f"{student['roll_number']}_{assignment['assignment_id']}_{uploaded_file.name}"
-                                            save_path = f"assignments/{file_path}"
-                                            with open(save_path, "wb") as f:
-                                                f.write(uploaded_file.getbuffer())
+                                            file_name = uploaded_file.name
+                                            file_hash, file_size = files.put(uploaded_file)
                                         
                                         # Submit assignment
                                         if db.submit_assignment(
                                             assignment['assignment_id'],
                                             student['student_id'],
                                             submission_text,
-                                            file_path
+                                            file_name,
+                                            file_hash,
+                                            file_size
                                         ):
                                             st.success("✅ Assignment submitted successfully!")
                                             time.sleep(1)
@@ -1593,19 +1978,11 @@ def student_dashboard():
             
             if submitted:
                 # Update student details
-                try:
-                    cursor = db.conn.cursor()
-                    cursor.execute("""
-                        UPDATE students 
-                        SET phone = ?, address = ?, guardian_name = ?, guardian_phone = ?
-                        WHERE student_id = ?
-                    """, (phone, address, guardian_name, guardian_phone, student['student_id']))
-                    db.conn.commit()
+                if db.update_student_profile(student['student_id'], phone, address,
+                                             guardian_name, guardian_phone):
                     st.success("Profile updated successfully!")
                     time.sleep(1)
                     rerun_app()
-                except Exception as e:
-                    st.error(f"Error updating profile: {str(e)}")
 
 # Main application
 def main():
@@ -1648,6 +2025,4 @@ def main():
             rerun_app()
 
 if __name__ == "__main__":
-    # Create assignments directory if not exists
-    os.makedirs("assignments", exist_ok=True)
     main()
\ No newline at end of file
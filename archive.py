@@ -0,0 +1,260 @@
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import date
+from urllib.parse import quote
+import pandas as pd
+from attendance_store import term_start
+from config import ArchiveConfig
+
+# Closed-term rows per table as (row_key, year) for rows dated before
+# :cutoff. Grades and submissions belong to their assignment's term; an
+# enrollment moves once it is inactive and has no activity left after the
+# cutoff.
+CANDIDATES = {
+    'attendance': ('attendance_id', """
+        SELECT attendance_id AS row_key, CAST(strftime('%Y', date) AS INTEGER) AS year
+        FROM attendance
+        WHERE date < :cutoff
+    """),
+    'grades': ('grade_id', """
+        SELECT g.grade_id AS row_key, CAST(strftime('%Y', COALESCE(a.due_date, a.created_at)) AS INTEGER) AS year
+        FROM grades g
+        JOIN assignments a ON g.assignment_id = a.assignment_id
+        WHERE COALESCE(a.due_date, a.created_at) < :cutoff
+    """),
+    'assignment_submissions': ('submission_id', """
+        SELECT sub.submission_id AS row_key, CAST(strftime('%Y', COALESCE(a.due_date, a.created_at)) AS INTEGER) AS year
+        FROM assignment_submissions sub
+        JOIN assignments a ON sub.assignment_id = a.assignment_id
+        WHERE COALESCE(a.due_date, a.created_at) < :cutoff
+    """),
+    'enrollments': ('enrollment_id', """
+        SELECT e.enrollment_id AS row_key, CAST(strftime('%Y', e.enrollment_date) AS INTEGER) AS year
+        FROM enrollments e
+        WHERE e.status != 'enrolled' AND e.enrollment_date < :cutoff
+          AND NOT EXISTS (
+              SELECT 1 FROM attendance a
+              WHERE a.student_id = e.student_id AND a.course_id = e.course_id AND a.date >= :cutoff)
+          AND NOT EXISTS (
+              SELECT 1 FROM grades g JOIN assignments a ON g.assignment_id = a.assignment_id
+              WHERE g.student_id = e.student_id AND a.course_id = e.course_id
+                AND COALESCE(a.due_date, a.created_at) >= :cutoff)
+          AND NOT EXISTS (
+              SELECT 1 FROM assignment_submissions sub JOIN assignments a ON sub.assignment_id = a.assignment_id
+              WHERE sub.student_id = e.student_id AND a.course_id = e.course_id
+                AND COALESCE(a.due_date, a.created_at) >= :cutoff)
+    """),
+}
+ARCHIVED_TABLES = list(CANDIDATES)
+
+# Enrollment columns the attendance and grade triggers maintain; archival
+# keeps them as they were, since they summarise a student's whole history
+COUNTER_COLUMNS = ['present_count', 'total_count', 'attendance_percentage',
+                   'weighted_score_sum', 'weight_sum', 'marks']
+
+class TermArchiver:
+    """Moves closed-term rows into one SQLite file per year, and reads them back
+
+    archive() copies attendance, grades and submissions dated before a
+    cutoff, and inactive enrollments with nothing left after it, into
+    archive/sms_archive_<year>.db and deletes them from the live database,
+    one transaction per year. Enrollment counters keep their values so
+    marks and attendance percentages do not change; the archived part of
+    each is kept in attendance_archived_counts and grades_archived_sums, and
+    assignments with archived grades can no longer be rescaled or deleted.
+    historical() opens a read-only connection with every archive ATTACHed,
+    exposing archived_<table> views over all years.
+    """
+
+    def __init__(self, db, archive_dir=ArchiveConfig.DIR):
+        self.db = db
+        self.archive_dir = archive_dir
+
+    def path_for(self, year):
+        return os.path.join(self.archive_dir, ArchiveConfig.FILE_PATTERN.format(year=year))
+
+    def _years(self, cutoff):
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(" UNION ".join(f"SELECT year FROM ({sql})" for _, sql in CANDIDATES.values())
+                           + " ORDER BY 1", {'cutoff': cutoff})
+            years = [row[0] for row in cursor.fetchall() if row[0] is not None]
+            cursor.close()
+        return years
+
+    def archive(self, cutoff=None):
+        """Move rows dated before cutoff (default: start of the current term); returns {year: {table: rows}}"""
+        if self.db.attendance_store is not None:
+            # CANDIDATES select attendance rows; bitmaps would stay live while
+            # the enrollments they count were moved
+            raise ValueError("Term archiving reads the attendance table and does not support "
+                             "SMS_ATTENDANCE_STORE=bitmap")
+        cutoff = (cutoff or term_start(date.today())).isoformat()
+        os.makedirs(self.archive_dir, exist_ok=True)
+        return {year: self._archive_year(year, cutoff) for year in self._years(cutoff)}
+
+    @staticmethod
+    def _sync_table(cursor, table, key):
+        """Create or widen archive.<table> to the live columns; returns them"""
+        columns = [row[1] for row in cursor.execute(f"PRAGMA main.table_info({table})").fetchall()]
+        existing = [row[1] for row in cursor.execute(f"PRAGMA archive.table_info({table})").fetchall()]
+        if not existing:
+            cursor.execute(f"CREATE TABLE archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+            # A retried run replaces rows instead of duplicating them
+            cursor.execute(f"CREATE UNIQUE INDEX archive.idx_{table}_{key} ON {table}({key})")
+            cursor.execute(f"CREATE INDEX archive.idx_{table}_student ON {table}(student_id)")
+        for column in columns:
+            if column not in existing and existing:
+                cursor.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column}")
+        return columns
+
+    def _archive_year(self, year, cutoff):
+        params = {'cutoff': cutoff, 'year': year}
+        moved = {}
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            # ATTACH and DETACH are not allowed inside a transaction
+            cursor.execute("ATTACH DATABASE ? AS archive", (self.path_for(year),))
+            try:
+                columns = {table: self._sync_table(cursor, table, key) for table, (key, _) in CANDIDATES.items()}
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.row_factory = None
+                cursor.execute(f"SELECT enrollment_id, {', '.join(COUNTER_COLUMNS)} FROM enrollments")
+                counters = {row[0]: row[1:] for row in cursor.fetchall()}
+
+                attendance_keys = f"SELECT row_key FROM ({CANDIDATES['attendance'][1]}) WHERE year = :year"
+                cursor.execute(f"""
+                    INSERT INTO attendance_archived_counts (student_id, course_id, present_count, total_count)
+                    SELECT student_id, course_id, SUM(status IN ('present', 'late')), COUNT(*)
+                    FROM attendance
+                    WHERE attendance_id IN ({attendance_keys})
+                    GROUP BY student_id, course_id
+                    ON CONFLICT(student_id, course_id) DO UPDATE SET
+                        present_count = present_count + excluded.present_count,
+                        total_count = total_count + excluded.total_count
+                """, params)
+                grade_keys = f"SELECT row_key FROM ({CANDIDATES['grades'][1]}) WHERE year = :year"
+                cursor.execute(f"""
+                    INSERT INTO grades_archived_sums (student_id, course_id, weighted_score_sum, weight_sum)
+                    SELECT g.student_id, a.course_id,
+                           SUM(g.marks_obtained * a.weightage / a.total_marks), SUM(a.weightage)
+                    FROM grades g
+                    JOIN assignments a ON g.assignment_id = a.assignment_id
+                    WHERE g.grade_id IN ({grade_keys}) AND a.total_marks > 0
+                    GROUP BY g.student_id, a.course_id
+                    ON CONFLICT(student_id, course_id) DO UPDATE SET
+                        weighted_score_sum = weighted_score_sum + excluded.weighted_score_sum,
+                        weight_sum = weight_sum + excluded.weight_sum
+                """, params)
+                cursor.execute(f"""
+                    INSERT INTO grades_archived_assignments (assignment_id, grade_count)
+                    SELECT assignment_id, COUNT(*)
+                    FROM grades
+                    WHERE grade_id IN ({grade_keys})
+                    GROUP BY assignment_id
+                    ON CONFLICT(assignment_id) DO UPDATE SET
+                        grade_count = grade_count + excluded.grade_count
+                """, params)
+
+                # Copy everything before deleting anything: the delete triggers
+                # would zero the counters of enrollments not yet copied
+                for table, (key, sql) in CANDIDATES.items():
+                    column_list = ', '.join(columns[table])
+                    cursor.execute(f"""
+                        INSERT OR REPLACE INTO archive.{table} ({column_list})
+                        SELECT {column_list} FROM main.{table}
+                        WHERE {key} IN (SELECT row_key FROM ({sql}) WHERE year = :year)
+                    """, params)
+                for table, (key, sql) in CANDIDATES.items():
+                    cursor.execute(f"""
+                        DELETE FROM main.{table}
+                        WHERE {key} IN (SELECT row_key FROM ({sql}) WHERE year = :year)
+                    """, params)
+                    moved[table] = cursor.rowcount
+
+                # The delete triggers subtracted the archived rows; put back the
+                # counters of enrollments that stay live
+                cursor.execute(f"SELECT enrollment_id, {', '.join(COUNTER_COLUMNS)} FROM enrollments")
+                cursor.executemany(f"""
+                    UPDATE enrollments SET {', '.join(f'{c} = ?' for c in COUNTER_COLUMNS)}
+                    WHERE enrollment_id = ?
+                """, [counters[row[0]] + (row[0],) for row in cursor.fetchall() if row[1:] != counters[row[0]]])
+
+                cursor.execute("""
+                    INSERT INTO term_archives (year, path, archived_before, row_count)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(year) DO UPDATE SET
+                        path = excluded.path,
+                        archived_before = MAX(archived_before, excluded.archived_before),
+                        row_count = row_count + excluded.row_count,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (year, self.path_for(year), cutoff, sum(moved.values())))
+                conn.commit()
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                cursor.execute("DETACH DATABASE archive")
+                cursor.close()
+        return moved
+
+    @contextmanager
+    def historical(self):
+        """Read-only connection with the archives attached
+
+        archived_<table> temp views union every attached year, with an
+        archive_year column in front of the live table's columns. SQLite
+        caps attachments per connection, so only the newest years that fit
+        are attached.
+        """
+        archives = [a for a in self.db.get_term_archives() if os.path.exists(a['path'])]
+        conn = sqlite3.connect(f"file:{quote(os.path.abspath(self.db.pool.db_path))}?mode=ro",
+                               uri=True, check_same_thread=False)
+        try:
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            archives = sorted(archives, key=lambda a: a['year'])[-limit:] if limit else []
+            for archive in archives:
+                conn.execute(f"ATTACH DATABASE ? AS archive_{archive['year']}",
+                             (f"file:{quote(os.path.abspath(archive['path']))}?mode=ro",))
+            for table in ARCHIVED_TABLES:
+                columns = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})").fetchall()]
+                parts = []
+                for archive in archives:
+                    schema = f"archive_{archive['year']}"
+                    present = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()}
+                    if present:
+                        select = ', '.join(c if c in present else f"NULL AS {c}" for c in columns)
+                        parts.append(f"SELECT {archive['year']} AS archive_year, {select} FROM {schema}.{table}")
+                if not parts:
+                    parts = [f"SELECT NULL AS archive_year, {', '.join(columns)} FROM main.{table} WHERE 0"]
+                conn.execute(f"CREATE TEMP VIEW archived_{table} AS {' UNION ALL '.join(parts)}")
+            yield conn
+        finally:
+            conn.close()
+
+    def read_frame(self, sql, params=()):
+        """Run a query on the historical connection; returns a DataFrame"""
+        with self.historical() as conn:
+            cursor = conn.execute(sql, params)
+            frame = pd.DataFrame.from_records(cursor.fetchall(), columns=[c[0] for c in cursor.description])
+            cursor.close()
+        return frame
+
+    def history(self, student_id):
+        """A student's archived rows per table, oldest year first"""
+        return {table: self.read_frame(f"""
+                    SELECT * FROM archived_{table} WHERE student_id = ? ORDER BY archive_year
+                """, (student_id,))
+                for table in ARCHIVED_TABLES}
+
+if __name__ == "__main__":
+    from database import Database
+    cutoff = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    archiver = TermArchiver(Database())
+    moved = archiver.archive(cutoff)
+    if not moved:
+        print("✅ Nothing to archive")
+    for year, tables in moved.items():
+        print(f"✅ {year} -> {archiver.path_for(year)}: "
+              + ", ".join(f"{rows} {table}" for table, rows in tables.items()))
@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from config import DatabaseConfig
+
+class AsyncDatabase:
+    """Coroutine facade over Database; every public method runs on a bounded thread pool
+
+    Each worker thread borrows its own read connection from the pool for the
+    duration of a call, so independent reads can be awaited together:
+
+        enrollments, assignments = adb.gather(
+            adb.get_student_enrollments(student_id),
+            adb.get_student_assignments(student_id),
+        )
+    """
+
+    def __init__(self, db, max_workers=DatabaseConfig.ASYNC_WORKERS):
+        self.db = db
+        # One read connection per busy worker; never ask for more than the pool holds
+        self.max_workers = max(1, min(int(max_workers), db.pool.pool_size))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sms-db")
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            # Lets st.error() inside Database methods reach the calling session
+            ctx = get_script_run_ctx(suppress_warning=True)
+            return await loop.run_in_executor(
+                self._executor, functools.partial(self._run, ctx, attr, args, kwargs)
+            )
+        return call
+
+    async def run(self, func, *args, **kwargs):
+        """Await any blocking callable (e.g. an engine method over db) on the same workers"""
+        loop = asyncio.get_running_loop()
+        ctx = get_script_run_ctx(suppress_warning=True)
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._run, ctx, func, args, kwargs)
+        )
+
+    @staticmethod
+    def _run(ctx, method, args, kwargs):
+        thread = threading.current_thread()
+        add_script_run_ctx(thread, ctx)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            add_script_run_ctx(thread, None)
+
+    def gather(self, *coroutines):
+        """Run coroutines concurrently from synchronous code; results come back in order"""
+        async def run_all():
+            return await asyncio.gather(*coroutines)
+        return asyncio.run(run_all())
+
+    def close(self):
+        """Wait for running calls and stop the worker threads"""
+        self._executor.shutdown(wait=True)
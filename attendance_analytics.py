@@ -0,0 +1,137 @@
+import sys
+from datetime import date, timedelta
+import pandas as pd
+from config import AttendanceConfig
+
+# Window counts for every (student, course) pair with attendance in the long
+# window, in one pass over the date index. The window function gives each
+# row its pair's latest present/late date, so the trailing run of absences
+# is a plain conditional SUM.
+ROLLING_QUERY = """
+    SELECT student_id, course_id, :as_of,
+           SUM(date >= :short_start AND status IN ('present', 'late')),
+           SUM(date >= :short_start),
+           SUM(status IN ('present', 'late')),
+           COUNT(*),
+           SUM(status = 'absent' AND date > COALESCE(last_present, '')),
+           MAX(date)
+    FROM (
+        SELECT student_id, course_id, date, status,
+               MAX(CASE WHEN status IN ('present', 'late') THEN date END)
+                   OVER (PARTITION BY student_id, course_id) AS last_present
+        FROM attendance
+        WHERE date >= :long_start AND date <= :as_of {pairs}
+    )
+    GROUP BY student_id, course_id
+"""
+DIRTY_FILTER = "(student_id, course_id) IN (SELECT student_id, course_id FROM attendance_rolling_dirty)"
+ROLLING_COLUMNS = ['student_id', 'course_id', 'as_of', 'present_short', 'total_short',
+                   'present_long', 'total_long', 'absent_streak', 'last_date']
+INSERT_ROLLING = f"INSERT INTO attendance_rolling ({', '.join(ROLLING_COLUMNS)})"
+
+class AttendanceAnalytics:
+    """Rolling short/long window attendance rates and at-risk detection
+
+    Window counts for every student-course pair are stored in
+    attendance_rolling as of one date. Triggers on attendance record which
+    pairs changed; a refresh on the same as-of date recomputes only those,
+    while a new as-of date (the windows moved) recomputes every pair in one
+    set-based statement. Rates and risk flags are vectorized over the
+    stored counts.
+    """
+
+    def __init__(self, db, short_days=AttendanceConfig.SHORT_WINDOW_DAYS,
+                 long_days=AttendanceConfig.LONG_WINDOW_DAYS,
+                 short_threshold=AttendanceConfig.SHORT_WINDOW_THRESHOLD,
+                 long_threshold=AttendanceConfig.LONG_WINDOW_THRESHOLD,
+                 min_sessions=AttendanceConfig.MIN_SESSIONS,
+                 max_absent_streak=AttendanceConfig.MAX_ABSENT_STREAK):
+        self.db = db
+        self.short_days = short_days
+        self.long_days = long_days
+        self.short_threshold = short_threshold
+        self.long_threshold = long_threshold
+        self.min_sessions = min_sessions
+        self.max_absent_streak = max_absent_streak
+
+    def _window_params(self, as_of):
+        as_of = as_of or date.today()
+        return {
+            'as_of': as_of.isoformat(),
+            # Windows include the as-of day
+            'short_start': (as_of - timedelta(days=self.short_days - 1)).isoformat(),
+            'long_start': (as_of - timedelta(days=self.long_days - 1)).isoformat(),
+        }
+
+    def refresh(self, as_of=None, full=False):
+        """Bring the stored window counts up to as_of (default today); returns pairs recomputed"""
+        params = self._window_params(as_of)
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT COUNT(*) FROM attendance_rolling WHERE as_of != ?", (params['as_of'],))
+            if full or cursor.fetchone()[0]:
+                cursor.execute("DELETE FROM attendance_rolling")
+                refreshed = self._insert_counts(conn, cursor, params, "1 = 1")
+            else:
+                cursor.execute(f"DELETE FROM attendance_rolling WHERE {DIRTY_FILTER}")
+                refreshed = self._insert_counts(conn, cursor, params, DIRTY_FILTER)
+            cursor.execute("DELETE FROM attendance_rolling_dirty")
+            conn.commit()
+            cursor.close()
+        return refreshed
+
+    def _insert_counts(self, conn, cursor, params, pairs):
+        """Store window counts of the pairs matching the filter; returns how many"""
+        store = self.db.attendance_store
+        if store is None:
+            cursor.execute(f"{INSERT_ROLLING} {ROLLING_QUERY.format(pairs='AND ' + pairs)}", params)
+            return cursor.rowcount
+        counts = store.window_counts(params['as_of'], self.short_days, self.long_days, pairs, conn)
+        cursor.executemany(f"{INSERT_ROLLING} VALUES ({', '.join('?' * len(ROLLING_COLUMNS))})",
+                           counts[ROLLING_COLUMNS].astype(object).values.tolist())
+        return len(counts)
+
+    def rolling(self, teacher_id=None, as_of=None):
+        """Window counts and rates (percent) per enrolled student and course, refreshed if stale"""
+        params = self._window_params(as_of)
+        state = self.db.get_attendance_rolling_state()
+        if state['dirty'] or state['as_of'] not in (None, params['as_of']):
+            self.refresh(as_of)
+        frame = self.db.get_attendance_rolling(teacher_id)
+        if frame.empty:
+            return frame
+        frame['short_rate'] = (frame['present_short'] * 100 / frame['total_short'].where(frame['total_short'] > 0)).round(1)
+        frame['long_rate'] = (frame['present_long'] * 100 / frame['total_long'].where(frame['total_long'] > 0)).round(1)
+        return frame
+
+    def at_risk(self, teacher_id=None, as_of=None):
+        """Enrolled students below a window threshold or on an absence streak, worst first"""
+        frame = self.rolling(teacher_id, as_of)
+        if frame.empty:
+            return frame
+        short_low = (frame['total_short'] >= self.min_sessions) & (frame['short_rate'] < self.short_threshold)
+        long_low = (frame['total_long'] >= self.min_sessions) & (frame['long_rate'] < self.long_threshold)
+        streak = frame['absent_streak'] >= self.max_absent_streak
+        flagged = frame[short_low | long_low | streak].copy()
+
+        reasons = pd.DataFrame({
+            'short': short_low.map({True: f"{self.short_days}-day below {self.short_threshold:g}%", False: ''}),
+            'long': long_low.map({True: f"{self.long_days}-day below {self.long_threshold:g}%", False: ''}),
+            'streak': frame['absent_streak'].map(lambda n: f"{n} absences in a row")
+                                            .where(streak, ''),
+        }).loc[flagged.index]
+        flagged['reasons'] = reasons.apply(lambda row: '; '.join(r for r in row if r), axis=1)
+        return flagged.sort_values(['long_rate', 'short_rate', 'absent_streak'],
+                                   ascending=[True, True, False], na_position='last')
+
+if __name__ == "__main__":
+    from database import Database
+    analytics = AttendanceAnalytics(Database())
+    as_of = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(f"✅ Recomputed {analytics.refresh(as_of, full=True)} student-course pairs")
+    flagged = analytics.at_risk(as_of=as_of)
+    print(f"⚠️ {len(flagged)} at risk")
+    if not flagged.empty:
+        print(flagged[['roll_number', 'course_code', 'short_rate', 'long_rate', 'absent_streak', 'reasons']]
+              .to_string(index=False))
@@ -0,0 +1,385 @@
+import sys
+from contextlib import contextmanager
+from datetime import date
+import numpy as np
+import pandas as pd
+from config import AttendanceConfig
+
+# 2-bit day codes; any other status (late, excused, ...) is stored as
+# EXCEPTION with the status itself in attendance_exceptions
+UNMARKED, PRESENT, ABSENT, EXCEPTION = 0, 1, 2, 3
+CODES = {'present': PRESENT, 'absent': ABSENT}
+STATUSES = {PRESENT: 'present', ABSENT: 'absent'}
+# Counted as attended, as in the attendance table triggers
+ATTENDED_EXCEPTIONS = ('late',)
+
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def term_start(day, months=AttendanceConfig.TERM_START_MONTHS):
+    """First day of the term containing day"""
+    starts = [date(day.year, month, 1) for month in sorted(months) if date(day.year, month, 1) <= day]
+    return starts[-1] if starts else date(day.year - 1, max(months), 1)
+
+def term_length(start, months=AttendanceConfig.TERM_START_MONTHS):
+    """Days in the term beginning on start"""
+    later = [month for month in sorted(months) if month > start.month]
+    end = date(start.year, later[0], 1) if later else date(start.year + 1, min(months), 1)
+    return (end - start).days
+
+def decode(bits):
+    """Day codes of a packed bitmap (4 days per byte, low bits first) as a uint8 array"""
+    packed = np.frombuffer(bits, dtype=np.uint8)
+    return ((packed[:, None] >> _SHIFTS) & 3).reshape(-1)
+
+def decode_many(blobs):
+    """Day codes of equal-length bitmaps as a 2-D array, one row per bitmap"""
+    packed = np.frombuffer(b''.join(blobs), dtype=np.uint8).reshape(len(blobs), -1)
+    return ((packed[:, :, None] >> _SHIFTS) & 3).reshape(len(blobs), -1)
+
+def encode(codes):
+    """Packed bytes of a day-code array"""
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    return (padded.reshape(-1, 4) << _SHIFTS).sum(axis=1, dtype=np.uint8).tobytes()
+
+class BitmapAttendanceStore:
+    """Attendance as one packed 2-bit-per-day vector per enrollment and term
+
+    A term of ~180 days takes 46 bytes instead of ~180 indexed rows. Marking
+    a day rewrites one byte of one bitmap. Statuses other than present and
+    absent, and any remarks, live sparsely in attendance_exceptions. Rates
+    are computed over decoded day matrices with NumPy. Enrollment counters
+    and the rolling-window dirty list are maintained the same way the
+    attendance table triggers maintain them.
+    """
+
+    def __init__(self, db, term_start_months=AttendanceConfig.TERM_START_MONTHS):
+        self.db = db
+        self.months = list(term_start_months)
+
+    @contextmanager
+    def _reader(self, conn):
+        if conn is not None:
+            yield conn
+        else:
+            with self.db.pool.reader() as conn:
+                yield conn
+
+    @staticmethod
+    def _frame(conn, sql, params=()):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(sql, params)
+        frame = pd.DataFrame.from_records(cursor.fetchall(), columns=[c[0] for c in cursor.description])
+        cursor.close()
+        return frame
+
+    def mark_many(self, rows):
+        """Upsert (student_id, course_id, date, status, remarks) rows in one transaction; returns the count"""
+        rows = list(rows)
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            bitmaps = {}    # (student_id, course_id, term_start) -> bytearray
+            deltas = {}     # (student_id, course_id) -> [attended delta, total delta]
+            for student_id, course_id, day, status, remarks in rows:
+                day = _as_date(day)
+                start = term_start(day, self.months)
+                key = (student_id, course_id, start.isoformat())
+                if key not in bitmaps:
+                    cursor.execute("""
+                        SELECT bits FROM attendance_bitmaps
+                        WHERE student_id = ? AND course_id = ? AND term_start = ?
+                    """, key)
+                    found = cursor.fetchone()
+                    bitmaps[key] = bytearray(found[0] if found else bytes(-(-term_length(start, self.months) // 4)))
+                bits = bitmaps[key]
+
+                byte, shift = divmod((day - start).days, 4)
+                shift *= 2
+                old_code = (bits[byte] >> shift) & 3
+                old_status = STATUSES.get(old_code)
+                if old_code == EXCEPTION:
+                    cursor.execute("""
+                        SELECT status FROM attendance_exceptions
+                        WHERE student_id = ? AND course_id = ? AND date = ?
+                    """, (student_id, course_id, day.isoformat()))
+                    found = cursor.fetchone()
+                    old_status = found[0] if found else None
+
+                new_code = CODES.get(status, EXCEPTION)
+                bits[byte] = (bits[byte] & ~(3 << shift) & 0xFF) | (new_code << shift)
+                if new_code == EXCEPTION or remarks:
+                    cursor.execute("""
+                        INSERT OR REPLACE INTO attendance_exceptions (student_id, course_id, date, status, remarks)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (student_id, course_id, day.isoformat(), status, remarks or ""))
+                elif old_code != UNMARKED:
+                    cursor.execute("""
+                        DELETE FROM attendance_exceptions
+                        WHERE student_id = ? AND course_id = ? AND date = ?
+                    """, (student_id, course_id, day.isoformat()))
+
+                delta = deltas.setdefault((student_id, course_id), [0, 0])
+                delta[0] += (status in ('present',) + ATTENDED_EXCEPTIONS) - (old_status in ('present',) + ATTENDED_EXCEPTIONS)
+                delta[1] += 1 - (old_code != UNMARKED)
+
+            cursor.executemany("""
+                INSERT OR REPLACE INTO attendance_bitmaps (student_id, course_id, term_start, bits)
+                VALUES (?, ?, ?, ?)
+            """, [key + (bytes(bits),) for key, bits in bitmaps.items()])
+            self._apply_counter_deltas(cursor, [
+                (attended, total, student_id, course_id)
+                for (student_id, course_id), (attended, total) in deltas.items()
+            ])
+            conn.commit()
+            cursor.close()
+        return len(rows)
+
+    @staticmethod
+    def _apply_counter_deltas(cursor, deltas):
+        """Same arithmetic as the attendance counter triggers (migration 4)"""
+        cursor.executemany("""
+            UPDATE enrollments SET
+                present_count = present_count + ?1,
+                total_count = total_count + ?2,
+                attendance_percentage = CASE WHEN total_count + ?2 > 0 THEN ROUND(
+                    (present_count + ?1) * 100.0 / (total_count + ?2), 2) ELSE 0 END
+            WHERE student_id = ?3 AND course_id = ?4
+        """, deltas)
+        cursor.executemany("""
+            INSERT OR IGNORE INTO attendance_rolling_dirty (student_id, course_id) VALUES (?, ?)
+        """, [(student_id, course_id) for _, _, student_id, course_id in deltas])
+
+    def records(self, student_id, course_id=None, conn=None):
+        """Marked days of a student, shaped like attendance table rows, newest first"""
+        where, params = "student_id = ?", (student_id,)
+        if course_id:
+            where, params = "student_id = ? AND course_id = ?", (student_id, course_id)
+        with self._reader(conn) as conn:
+            blobs = self._frame(conn, f"SELECT course_id, term_start, bits FROM attendance_bitmaps WHERE {where}", params)
+            exceptions = self._frame(conn, f"""
+                SELECT course_id, date, status, remarks FROM attendance_exceptions WHERE {where}
+            """, params)
+
+        parts = []
+        for row in blobs.itertuples(index=False):
+            codes = decode(row.bits)
+            days = np.flatnonzero(codes)
+            parts.append(pd.DataFrame({
+                'course_id': row.course_id,
+                'date': np.datetime_as_string(np.datetime64(row.term_start, 'D') + days, unit='D'),
+                'code': codes[days],
+            }))
+        columns = ['attendance_id', 'student_id', 'course_id', 'date', 'status', 'remarks']
+        if not parts:
+            return pd.DataFrame(columns=columns).astype({'student_id': 'int64', 'course_id': 'int64'})
+
+        frame = pd.concat(parts, ignore_index=True).merge(exceptions, on=['course_id', 'date'], how='left')
+        frame['status'] = frame['code'].map(STATUSES).where(frame['code'] != EXCEPTION, frame['status'])
+        frame['remarks'] = frame['remarks'].where(frame['remarks'].notna(), "")
+        frame['student_id'] = student_id
+        frame['attendance_id'] = None
+        return frame.sort_values(['date', 'course_id'], ascending=[False, True])[columns].reset_index(drop=True)
+
+    def iter_rows(self, conn, chunk_size=5000):
+        """Every marked day as attendance table rows, chunk_size bitmaps at a time
+
+        Yields DataFrames of student_id, course_id, date, status and
+        remarks, in student, course and date order.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        try:
+            cursor.execute("""
+                SELECT student_id, course_id, term_start, bits FROM attendance_bitmaps
+                ORDER BY student_id, course_id, term_start
+            """)
+            while True:
+                blobs = cursor.fetchmany(chunk_size)
+                if not blobs:
+                    break
+                # Bitmaps are in student order, so a chunk's exceptions are one id range
+                exceptions = self._frame(conn, """
+                    SELECT student_id, course_id, date, status, remarks FROM attendance_exceptions
+                    WHERE student_id BETWEEN ? AND ?
+                """, (blobs[0][0], blobs[-1][0]))
+                parts = []
+                for student_id, course_id, start_text, bits in blobs:
+                    codes = decode(bits)
+                    days = np.flatnonzero(codes)
+                    parts.append(pd.DataFrame({
+                        'student_id': student_id,
+                        'course_id': course_id,
+                        'date': np.datetime_as_string(np.datetime64(start_text, 'D') + days, unit='D'),
+                        'code': codes[days],
+                    }))
+                frame = pd.concat(parts, ignore_index=True).merge(
+                    exceptions, on=['student_id', 'course_id', 'date'], how='left')
+                if frame.empty:
+                    continue
+                frame['status'] = frame['code'].map(STATUSES).where(frame['code'] != EXCEPTION, frame['status'])
+                frame['remarks'] = frame['remarks'].where(frame['remarks'].notna(), "")
+                yield frame[['student_id', 'course_id', 'date', 'status', 'remarks']]
+        finally:
+            cursor.close()
+
+    def day_matrix(self, start, end, where="1 = 1", conn=None):
+        """Day codes of every bitmap pair between start and end (inclusive)
+
+        Returns (pairs, codes, attended): pairs is a DataFrame of student_id
+        and course_id, one per matrix row; codes and attended are
+        pairs x days arrays. where filters attendance_bitmaps.
+        """
+        start, end = _as_date(start), _as_date(end)
+        days = (end - start).days + 1
+        with self._reader(conn) as conn:
+            blobs = self._frame(conn, f"""
+                SELECT student_id, course_id, term_start, bits FROM attendance_bitmaps
+                WHERE term_start >= ? AND term_start <= ? AND {where}
+            """, (term_start(start, self.months).isoformat(), end.isoformat()))
+            exceptions = self._frame(conn, f"""
+                SELECT student_id, course_id, date FROM attendance_exceptions
+                WHERE date >= ? AND date <= ? AND status IN ({', '.join('?' * len(ATTENDED_EXCEPTIONS))}) AND {where}
+            """, (start.isoformat(), end.isoformat()) + ATTENDED_EXCEPTIONS)
+
+        pairs = blobs[['student_id', 'course_id']].drop_duplicates().reset_index(drop=True)
+        row_of = pd.Series(pairs.index, index=pd.MultiIndex.from_frame(pairs))
+        codes = np.zeros((len(pairs), days), dtype=np.uint8)
+        # Every bitmap of a term has the same length, so a term decodes as one matrix
+        for start_text, term in blobs.groupby('term_start'):
+            first = date.fromisoformat(start_text)
+            term_codes = decode_many(term['bits'].tolist())[:, :term_length(first, self.months)]
+            offset = (first - start).days
+            lo, hi = max(0, -offset), min(term_codes.shape[1], days - offset)
+            if lo < hi:
+                rows = row_of.loc[list(zip(term['student_id'], term['course_id']))].to_numpy()
+                codes[rows, offset + lo:offset + hi] = term_codes[:, lo:hi]
+
+        attended = codes == PRESENT
+        if not exceptions.empty:
+            keys = list(zip(exceptions['student_id'], exceptions['course_id']))
+            known = [key in row_of.index for key in keys]
+            exceptions = exceptions[known]
+            if not exceptions.empty:
+                rows = row_of.loc[[key for key, ok in zip(keys, known) if ok]].to_numpy()
+                columns = (pd.to_datetime(exceptions['date']) - pd.Timestamp(start)).dt.days.to_numpy()
+                attended[rows, columns] = True
+        return pairs, codes, attended
+
+    def window_counts(self, as_of, short_days, long_days, where="1 = 1", conn=None):
+        """Rolling-window counts per pair, with the columns of attendance_rolling"""
+        as_of = _as_date(as_of)
+        long_start = pd.Timestamp(as_of) - pd.Timedelta(days=long_days - 1)
+        pairs, codes, attended = self.day_matrix(long_start.date(), as_of, where, conn)
+        marked = codes != UNMARKED
+        short = slice(long_days - short_days, None)
+        days = np.arange(long_days)
+
+        # Last attended day per row (-1 when none); absences after it form the streak
+        last_attended = np.where(attended.any(axis=1), long_days - 1 - np.argmax(attended[:, ::-1], axis=1), -1)
+        last_marked = np.where(marked.any(axis=1), long_days - 1 - np.argmax(marked[:, ::-1], axis=1), -1)
+
+        frame = pairs.assign(
+            as_of=as_of.isoformat(),
+            present_short=attended[:, short].sum(axis=1),
+            total_short=marked[:, short].sum(axis=1),
+            present_long=attended.sum(axis=1),
+            total_long=marked.sum(axis=1),
+            absent_streak=((codes == ABSENT) & (days[None, :] > last_attended[:, None])).sum(axis=1),
+            last_date=[(long_start + pd.Timedelta(days=int(i))).date().isoformat() for i in last_marked],
+        )
+        return frame[frame['total_long'] > 0].reset_index(drop=True)
+
+    def counts(self, conn=None):
+        """Lifetime attended and total days per pair, as kept in the enrollment counters"""
+        with self._reader(conn) as conn:
+            blobs = self._frame(conn, "SELECT student_id, course_id, term_start, bits FROM attendance_bitmaps")
+            late = self._frame(conn, f"""
+                SELECT student_id, course_id, COUNT(*) AS late
+                FROM attendance_exceptions
+                WHERE status IN ({', '.join('?' * len(ATTENDED_EXCEPTIONS))})
+                GROUP BY student_id, course_id
+            """, ATTENDED_EXCEPTIONS)
+
+        parts = []
+        for _, term in blobs.groupby('term_start'):
+            codes = decode_many(term['bits'].tolist())
+            parts.append(term[['student_id', 'course_id']].assign(
+                attended=(codes == PRESENT).sum(axis=1),
+                total=(codes != UNMARKED).sum(axis=1),
+            ))
+        if not parts:
+            return pd.DataFrame(columns=['student_id', 'course_id', 'attended', 'total'])
+        frame = pd.concat(parts).groupby(['student_id', 'course_id'])[['attended', 'total']].sum().reset_index()
+        frame = frame.merge(late, on=['student_id', 'course_id'], how='left')
+        frame['attended'] += frame.pop('late').fillna(0).astype(int)
+        return frame
+
+    def import_table(self, move=False):
+        """Copy every attendance table row into the store; returns rows copied
+
+        With move, the table is emptied afterwards and the enrollment
+        counters are reset from the store, all in the same transaction.
+        """
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            rows = self._frame(conn, "SELECT student_id, course_id, date, status, remarks FROM attendance")
+            existing = self._frame(conn, "SELECT student_id, course_id, term_start, bits FROM attendance_bitmaps")
+            blobs = {(r.student_id, r.course_id, r.term_start): r.bits for r in existing.itertuples(index=False)}
+
+            if not rows.empty:
+                dates = pd.Series({d: _as_date(d) for d in rows['date'].unique()})
+                starts = dates.map(lambda d: term_start(d, self.months))
+                rows['term_start'] = rows['date'].map(starts.map(date.isoformat))
+                rows['day'] = rows['date'].map((dates - starts).map(lambda delta: delta.days))
+                rows['code'] = rows['status'].map(CODES).fillna(EXCEPTION).astype(np.uint8)
+
+                bitmap_rows = []
+                for (student_id, course_id, start_text), group in rows.groupby(['student_id', 'course_id', 'term_start']):
+                    key = (student_id, course_id, start_text)
+                    length = term_length(date.fromisoformat(start_text), self.months)
+                    codes = decode(blobs[key])[:length].copy() if key in blobs else np.zeros(length, dtype=np.uint8)
+                    codes[group['day'].to_numpy()] = group['code'].to_numpy()
+                    bitmap_rows.append((int(student_id), int(course_id), start_text, encode(codes)))
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO attendance_bitmaps (student_id, course_id, term_start, bits)
+                    VALUES (?, ?, ?, ?)
+                """, bitmap_rows)
+
+                sparse = rows[(rows['code'] == EXCEPTION) | (rows['remarks'].fillna("") != "")]
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO attendance_exceptions (student_id, course_id, date, status, remarks)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(int(r.student_id), int(r.course_id), _as_date(r.date).isoformat(), r.status, r.remarks or "")
+                      for r in sparse.itertuples(index=False)])
+
+            if move:
+                # The delete triggers zero the counters; set them back from the store
+                cursor.execute("DELETE FROM attendance")
+                counts = self.counts(conn)
+                cursor.executemany("""
+                    UPDATE enrollments SET present_count = ?1, total_count = ?2,
+                        attendance_percentage = CASE WHEN ?2 > 0 THEN ROUND(?1 * 100.0 / ?2, 2) ELSE 0 END
+                    WHERE student_id = ?3 AND course_id = ?4
+                """, [(int(r.attended), int(r.total), int(r.student_id), int(r.course_id))
+                      for r in counts.itertuples(index=False)])
+            conn.commit()
+            cursor.close()
+        return len(rows)
+
+if __name__ == "__main__":
+    from database import Database
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'move'):
+        print("Usage: python attendance_store.py import|move")
+        print("   import: copy the attendance table into the bitmap store")
+        print("   move:   copy, then empty the attendance table")
+        sys.exit(1)
+    store = BitmapAttendanceStore(Database())
+    copied = store.import_table(move=sys.argv[1] == 'move')
+    print(f"✅ Copied {copied} attendance rows into the bitmap store")
+    print("   Set SMS_ATTENDANCE_STORE=bitmap to read and write attendance through it")
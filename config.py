@@ -7,6 +7,17 @@ class DatabaseConfig:
     DB_NAME = "student_management.db"
     DB_PATH = Path(__file__).parent / DB_NAME
     
+    # Connection pool - read connections shared by all sessions, one writer
+    POOL_SIZE = int(os.environ.get("SMS_DB_POOL_SIZE", 8))
+    BUSY_TIMEOUT_MS = int(os.environ.get("SMS_DB_BUSY_TIMEOUT_MS", 5000))
+    
+    # Read-through result cache in Database (0 entries disables it)
+    CACHE_MAX_ENTRIES = int(os.environ.get("SMS_DB_CACHE_MAX_ENTRIES", 512))
+    CACHE_MAX_BYTES = int(os.environ.get("SMS_DB_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    
+    # Worker threads behind AsyncDatabase (capped at POOL_SIZE)
+    ASYNC_WORKERS = int(os.environ.get("SMS_DB_ASYNC_WORKERS", 4))
+    
     @staticmethod
     def get_connection():
         try:
@@ -18,3 +29,55 @@ class DatabaseConfig:
         except Exception as e:
             print(f"❌ Error connecting to SQLite: {e}")
             return None
+
+class AuthConfig:
+    # bcrypt cost factor; run `python security.py` to benchmark this machine
+    BCRYPT_ROUNDS = int(os.environ.get("SMS_BCRYPT_ROUNDS", 12))
+    
+    # Process pool for hashing - leaves the remaining cores for script reruns
+    HASH_WORKERS = int(os.environ.get("SMS_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+    HASH_MAX_PENDING = int(os.environ.get("SMS_HASH_MAX_PENDING", 16))
+    HASH_QUEUE_TIMEOUT_S = float(os.environ.get("SMS_HASH_QUEUE_TIMEOUT_S", 10))
+    
+    # Login throttling per username and per client IP
+    LOGIN_MAX_FAILURES = int(os.environ.get("SMS_LOGIN_MAX_FAILURES", 5))
+    LOGIN_LOCKOUT_SECONDS = int(os.environ.get("SMS_LOGIN_LOCKOUT_SECONDS", 30))
+    LOGIN_MAX_LOCKOUT_SECONDS = int(os.environ.get("SMS_LOGIN_MAX_LOCKOUT_SECONDS", 900))
+    LOGIN_MAX_INFLIGHT = int(os.environ.get("SMS_LOGIN_MAX_INFLIGHT", 2))
+    # A client IP can be a whole school behind NAT; its limits are far looser
+    LOGIN_IP_MAX_FAILURES = int(os.environ.get("SMS_LOGIN_IP_MAX_FAILURES", 100))
+    LOGIN_IP_MAX_INFLIGHT = int(os.environ.get("SMS_LOGIN_IP_MAX_INFLIGHT", 32))
+    # Concurrent attempts on a busy key wait this long for a slot
+    LOGIN_QUEUE_TIMEOUT_S = float(os.environ.get("SMS_LOGIN_QUEUE_TIMEOUT_S", 10))
+
+class AttendanceConfig:
+    # Rolling windows (days, ending on the as-of date) used for at-risk detection
+    SHORT_WINDOW_DAYS = int(os.environ.get("SMS_ATTENDANCE_SHORT_WINDOW_DAYS", 7))
+    LONG_WINDOW_DAYS = int(os.environ.get("SMS_ATTENDANCE_LONG_WINDOW_DAYS", 30))
+    
+    # A student is at risk in a course when a window's rate falls below its
+    # threshold (percent) over at least MIN_SESSIONS classes, or after
+    # MAX_ABSENT_STREAK consecutive absences
+    SHORT_WINDOW_THRESHOLD = float(os.environ.get("SMS_ATTENDANCE_SHORT_THRESHOLD", 60))
+    LONG_WINDOW_THRESHOLD = float(os.environ.get("SMS_ATTENDANCE_LONG_THRESHOLD", 75))
+    MIN_SESSIONS = int(os.environ.get("SMS_ATTENDANCE_MIN_SESSIONS", 3))
+    MAX_ABSENT_STREAK = int(os.environ.get("SMS_ATTENDANCE_MAX_ABSENT_STREAK", 3))
+    
+    # "table": one attendance row per student, course and day.
+    # "bitmap": packed 2-bit day codes per enrollment and term (attendance_store.py);
+    #           term archiving (archive.py) is not supported in this mode
+    STORE = os.environ.get("SMS_ATTENDANCE_STORE", "table")
+    # Months in which a term starts; a bitmap covers one term
+    TERM_START_MONTHS = [int(m) for m in os.environ.get("SMS_TERM_START_MONTHS", "1,7").split(",")]
+
+class ArchiveConfig:
+    # Closed-term rows move to one SQLite file per year in this directory
+    DIR = os.environ.get("SMS_ARCHIVE_DIR", "archive")
+    FILE_PATTERN = "sms_archive_{year}.db"
+
+class StorageConfig:
+    # Content-addressed submission files (file_store.py)
+    ROOT = os.environ.get("SMS_SUBMISSION_STORE", "submissions")
+    CHUNK_SIZE = int(os.environ.get("SMS_UPLOAD_CHUNK_BYTES", 1024 * 1024))
+    # Unreferenced blobs younger than this are kept: the upload may not be recorded yet
+    GC_GRACE_SECONDS = int(os.environ.get("SMS_FILE_GC_GRACE_SECONDS", 3600))
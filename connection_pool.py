@@ -0,0 +1,173 @@
+import sqlite3
+import threading
+import queue
+from contextlib import contextmanager
+
+class ConnectionPool:
+    """SQLite connection manager: one guarded writer, a bounded pool of readers"""
+
+    def __init__(self, db_path, pool_size=5, busy_timeout=5000):
+        self.db_path = db_path
+        self.pool_size = max(1, int(pool_size))
+        self.busy_timeout = int(busy_timeout)
+        self._trace_callback = None
+        self._write_listener = None
+
+        self._write_lock = threading.RLock()
+        # No statement cache: the authorizer only sees statements as they are prepared
+        self._writer = self._connect(cached_statements=0)
+        self._writer.execute("PRAGMA journal_mode = WAL")
+        self._writer.execute("PRAGMA synchronous = NORMAL")
+        # Tables modified through the writer (trigger bodies included) since the last commit
+        self._written_tables = set()
+        self._writer.set_authorizer(self._authorize_write)
+
+        # Idle read connections; created lazily up to pool_size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._created_lock = threading.Lock()
+        # Lets a thread re-enter reader() without taking a second connection
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self, cached_statements=128):
+        """Open a connection with the shared pragmas applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000.0,
+            check_same_thread=False,
+            cached_statements=cached_statements
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout}")
+        # INSERT OR REPLACE must fire delete triggers so counter deltas stay correct
+        conn.execute("PRAGMA recursive_triggers = ON")
+        conn.set_trace_callback(self._trace_callback)
+        return conn
+
+    def _authorize_write(self, action, arg1, arg2, db_name, trigger):
+        """Authorizer on the writer: records which tables are modified, never denies"""
+        if action in (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE):
+            if db_name in (None, 'main'):
+                self._written_tables.add(arg1)
+        elif action in (sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_DROP_TABLE,
+                        sqlite3.SQLITE_ALTER_TABLE, sqlite3.SQLITE_CREATE_TRIGGER,
+                        sqlite3.SQLITE_DROP_TRIGGER):
+            # Schema changes can affect any result
+            self._written_tables.add('*')
+        return sqlite3.SQLITE_OK
+
+    def _checkout(self):
+        """Take an idle read connection, opening a new one while under pool_size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._created_lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                conn = self._connect()
+                conn.execute("PRAGMA query_only = ON")
+                return conn
+
+        # Pool exhausted - wait for another session to hand one back
+        try:
+            return self._idle.get(timeout=self.busy_timeout / 1000.0)
+        except queue.Empty:
+            raise sqlite3.OperationalError("connection pool exhausted: no read connection available")
+
+    @contextmanager
+    def reader(self):
+        """Borrow a read-only connection for the current thread"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # Nested use from the same thread shares the connection it already holds
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._checkout()
+        # Read connections pick up the current trace callback on every checkout
+        conn.set_trace_callback(self._trace_callback)
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection; rolls back on error"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+
+        with self._write_lock:
+            try:
+                yield self._writer
+            except Exception:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+                raise
+            finally:
+                # Never leave a transaction open for the next holder of the lock
+                if self._writer.in_transaction:
+                    self._writer.commit()
+                # Notify only once the changes are visible to readers
+                if self._written_tables and not self._writer.in_transaction:
+                    tables, self._written_tables = self._written_tables, set()
+                    if self._write_listener is not None:
+                        self._write_listener(tables)
+
+    def set_trace_callback(self, callback):
+        """Install a statement trace callback on every current and future connection"""
+        self._trace_callback = callback
+        with self._write_lock:
+            self._writer.set_trace_callback(callback)
+
+    def set_write_listener(self, listener):
+        """Call listener(tables) after each writer session that modified tables
+
+        tables contains '*' when the schema changed.
+        """
+        self._write_listener = listener
+
+    def data_version(self):
+        """PRAGMA data_version as seen by the writer, or None while a write is in progress
+
+        The writer is the only connection in this process that commits, so a
+        change in this value means another process wrote to the database.
+        """
+        if not self._write_lock.acquire(blocking=False):
+            return None
+        try:
+            if self._closed:
+                return None
+            return self._writer.execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self._write_lock.release()
+
+    def close(self):
+        """Close every connection owned by the pool"""
+        self._closed = True
+        with self._write_lock:
+            self._writer.close()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -1,295 +1,532 @@
 import sqlite3
-import bcrypt
 import streamlit as st
 import os
+import threading
+import functools
+import inspect
+import pandas as pd
+from contextlib import contextmanager
+from config import DatabaseConfig, AuthConfig, AttendanceConfig
+from connection_pool import ConnectionPool
+from attendance_store import BitmapAttendanceStore
+from migrations import run_migrations, ADMIN_SEED_VERSION
+from query_cache import QueryCache
+from security import PasswordHasher, LoginThrottle, HasherBusy
+
+def cached(*tables):
+    """Memoize a read method in Database.cache; tables are every table its queries read"""
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not self.cache.enabled or getattr(self._local, 'bypass_cache', False):
+                return method(self, *args, **kwargs)
+            if not self._check_data_version():
+                # A write is in progress; read straight through
+                return method(self, *args, **kwargs)
+            
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__name__,) + tuple(bound.arguments.values())[1:]
+            try:
+                found, value = self.cache.get(key)
+            except TypeError:
+                # Unhashable argument
+                return method(self, *args, **kwargs)
+            if found:
+                return value
+            
+            generation = self.cache.generation
+            outer_failed = getattr(self._local, 'query_failed', False)
+            self._local.query_failed = False
+            try:
+                value = method(self, *args, **kwargs)
+                # Getters swallow errors and return a fallback; never cache that
+                if not self._local.query_failed:
+                    self.cache.put(key, value, tables, generation)
+            finally:
+                self._local.query_failed = outer_failed or self._local.query_failed
+            return value
+        return wrapper
+    return decorator
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect('student_management.db', check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+    def __init__(self, db_path=DatabaseConfig.DB_NAME, pool_size=DatabaseConfig.POOL_SIZE,
+                 busy_timeout=DatabaseConfig.BUSY_TIMEOUT_MS,
+                 cache_entries=DatabaseConfig.CACHE_MAX_ENTRIES, cache_bytes=DatabaseConfig.CACHE_MAX_BYTES):
+        # WAL-mode pool: concurrent readers per session thread, one guarded writer
+        self.pool = ConnectionPool(db_path, pool_size=pool_size, busy_timeout=busy_timeout)
+        # Read-through cache: writes through the pool invalidate the tables they touch,
+        # PRAGMA data_version catches writes from other processes
+        self.cache = QueryCache(max_entries=cache_entries, max_bytes=cache_bytes)
+        self._data_version = None
+        self._local = threading.local()
+        self.pool.set_write_listener(self._on_write)
+        # Optional packed per-term attendance store in place of one row per day
+        self.attendance_store = BitmapAttendanceStore(self) if AttendanceConfig.STORE == "bitmap" else None
+        # bcrypt runs in worker processes; logins are throttled per username and IP
+        self.hasher = PasswordHasher(
+            rounds=AuthConfig.BCRYPT_ROUNDS,
+            workers=AuthConfig.HASH_WORKERS,
+            max_pending=AuthConfig.HASH_MAX_PENDING,
+            queue_timeout=AuthConfig.HASH_QUEUE_TIMEOUT_S
+        )
+        self.login_throttle = LoginThrottle(
+            max_failures=AuthConfig.LOGIN_MAX_FAILURES,
+            lockout_seconds=AuthConfig.LOGIN_LOCKOUT_SECONDS,
+            max_lockout_seconds=AuthConfig.LOGIN_MAX_LOCKOUT_SECONDS,
+            max_inflight=AuthConfig.LOGIN_MAX_INFLIGHT,
+            ip_max_failures=AuthConfig.LOGIN_IP_MAX_FAILURES,
+            ip_max_inflight=AuthConfig.LOGIN_IP_MAX_INFLIGHT,
+            queue_timeout=AuthConfig.LOGIN_QUEUE_TIMEOUT_S
+        )
         self.create_tables()
         
     def create_tables(self):
-        """Create all required tables"""
+        """Bring the schema up to date via the migration runner"""
         try:
-            cursor = self.conn.cursor()
-            
-            # Users table WITHOUT is_active column
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS users (
-                    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    full_name TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Students table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS students (
-                    student_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER UNIQUE,
-                    roll_number TEXT UNIQUE NOT NULL,
-                    class_name TEXT NOT NULL,
-                    section TEXT NOT NULL,
-                    dob TEXT,
-                    phone TEXT,
-                    address TEXT,
-                    guardian_name TEXT,
-                    guardian_phone TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Teachers table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS teachers (
-                    teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER UNIQUE,
-                    employee_id TEXT UNIQUE NOT NULL,
-                    department TEXT,
-                    qualification TEXT,
-                    specialization TEXT,
-                    experience INTEGER DEFAULT 0,
-                    phone TEXT,
-                    address TEXT,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Courses table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS courses (
-                    course_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    course_code TEXT UNIQUE NOT NULL,
-                    course_name TEXT NOT NULL,
-                    description TEXT,
-                    credits INTEGER DEFAULT 3,
-                    department TEXT,
-                    semester INTEGER,
-                    max_students INTEGER DEFAULT 50,
-                    teacher_id INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE SET NULL
-                )
-            ''')
-            
-            # Enrollments table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS enrollments (
-                    enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    course_id INTEGER NOT NULL,
-                    enrollment_date TEXT DEFAULT CURRENT_DATE,
-                    status TEXT DEFAULT 'enrolled',
-                    grade TEXT,
-                    marks REAL DEFAULT 0,
-                    attendance_percentage REAL DEFAULT 0,
-                    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-                    UNIQUE(student_id, course_id)
-                )
-            ''')
-            
-            # Attendance table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS attendance (
-                    attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    course_id INTEGER NOT NULL,
-                    date TEXT NOT NULL,
-                    status TEXT DEFAULT 'absent',
-                    remarks TEXT,
-                    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-                    UNIQUE(student_id, course_id, date)
-                )
-            ''')
-            
-            # Assignments table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS assignments (
-                    assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    course_id INTEGER NOT NULL,
-                    teacher_id INTEGER NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    total_marks REAL NOT NULL,
-                    weightage REAL DEFAULT 100,
-                    due_date TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-                    FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Grades table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS grades (
-                    grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    student_id INTEGER NOT NULL,
-                    assignment_id INTEGER NOT NULL,
-                    marks_obtained REAL DEFAULT 0,
-                    remarks TEXT,
-                    graded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id) ON DELETE CASCADE,
-                    UNIQUE(student_id, assignment_id)
-                )
-            ''')
-            
-            # Assignment Submissions table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS assignment_submissions (
-                    submission_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id INTEGER NOT NULL,
-                    student_id INTEGER NOT NULL,
-                    submission_file TEXT,
-                    submission_text TEXT,
-                    submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status TEXT DEFAULT 'submitted',
-                    marks_obtained REAL,
-                    feedback TEXT,
-                    graded_by INTEGER,
-                    graded_at TIMESTAMP,
-                    FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id) ON DELETE CASCADE,
-                    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-                    FOREIGN KEY (graded_by) REFERENCES teachers(teacher_id) ON DELETE SET NULL,
-                    UNIQUE(assignment_id, student_id)
-                )
-            ''')
-            
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                applied = run_migrations(conn)
             
-            # Create default admin if not exists
-            cursor.execute("SELECT * FROM users WHERE username = 'admin'")
-            if not cursor.fetchone():
-                hashed_password = bcrypt.hashpw("admin123".encode(), bcrypt.gensalt()).decode()
-                cursor.execute(
-                    "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
-                    ('admin', hashed_password, 'admin', 'admin@sms.com', 'System Administrator')
-                )
-                self.conn.commit()
+            if ADMIN_SEED_VERSION in applied:
                 st.success("✅ Default admin user created: username='admin', password='admin123'")
             
             # Create assignments directory if not exists
             os.makedirs("assignments", exist_ok=True)
-            
-            cursor.close()
             return True
             
         except Exception as e:
             st.error(f"❌ Error creating tables: {str(e)}")
             return False
     
+    # Result cache
+    def _on_write(self, tables):
+        """Pool write listener: drop cached results that read the modified tables"""
+        self.cache.invalidate(None if '*' in tables else tables)
+    
+    def _check_data_version(self):
+        """Clear the cache if another process wrote; False while a local write is running"""
+        version = self.pool.data_version()
+        if version is None:
+            return False
+        if version != self._data_version:
+            if self._data_version is not None:
+                self.cache.clear()
+            self._data_version = version
+        return True
+    
+    @contextmanager
+    def uncached(self):
+        """Run reads in this thread against the database, bypassing the result cache"""
+        previous = getattr(self._local, 'bypass_cache', False)
+        self._local.bypass_cache = True
+        try:
+            yield self
+        finally:
+            self._local.bypass_cache = previous
+    
+    def cache_stats(self):
+        """Hit/miss counters and size of the result cache"""
+        return self.cache.stats()
+    
+    # Query helpers
+    def _query(self, query, params=(), as_frame=False):
+        """Run a read query; return a list of dicts, or a DataFrame when as_frame is set"""
+        try:
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                if as_frame:
+                    # Plain tuples: the DataFrame is built column-wise without per-row dicts
+                    cursor.row_factory = None
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                columns = [column[0] for column in cursor.description]
+                cursor.close()
+        except Exception:
+            # Tells @cached not to store the caller's fallback value
+            self._local.query_failed = True
+            raise
+        
+        if not as_frame:
+            return [dict(row) for row in rows]
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        # Queries like "e.*, e.marks" repeat a column; keep the last one as dict() would
+        return df.loc[:, ~df.columns.duplicated(keep='last')]
+    
+    def _query_page(self, query, keys, params=(), after=None, limit=50, as_frame=False):
+        """Run a keyset-paginated read query
+        
+        query uses {keys} in its select list, {where} as the last WHERE
+        condition and {order} as its ORDER BY. keys are the sort
+        expressions, ending in a unique one. Returns (rows, next_after);
+        next_after is None on the last page.
+        """
+        key_columns = [f"page_key_{i}" for i in range(len(keys))]
+        if after is None:
+            where, key_params = "1 = 1", ()
+        else:
+            where = f"({', '.join(keys)}) > ({', '.join('?' * len(keys))})"
+            key_params = tuple(after)
+        sql = query.format(
+            keys=", ".join(f"{k} AS {c}" for k, c in zip(keys, key_columns)),
+            where=where,
+            order=", ".join(keys)
+        ) + " LIMIT ?"
+        # One extra row tells us whether another page exists
+        rows = self._query(sql, tuple(params) + key_params + (limit + 1,), as_frame=as_frame)
+        
+        has_more = len(rows) > limit
+        if as_frame:
+            page = rows.iloc[:limit]
+            next_after = tuple(page.iloc[-1][key_columns].tolist()) if has_more else None
+            return page.drop(columns=key_columns).reset_index(drop=True), next_after
+        page = rows[:limit]
+        next_after = tuple(page[-1][c] for c in key_columns) if has_more else None
+        for row in page:
+            for c in key_columns:
+                del row[c]
+        return page, next_after
+    
+    @staticmethod
+    def _empty_result(as_frame):
+        """Empty result in the requested shape"""
+        return pd.DataFrame() if as_frame else []
+    
+    # Dashboard statistics
+    def get_system_stats(self, recent_limit=5):
+        """Get entity totals and the most recently added students and teachers"""
+        try:
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                # Totals come from counter rows kept current by triggers (migration 7)
+                cursor.execute("SELECT entity, total FROM entity_counts")
+                totals = {row['entity']: row['total'] for row in cursor.fetchall()}
+                
+                cursor.execute("""
+                    SELECT s.student_id, s.roll_number, s.class_name, s.section, u.full_name
+                    FROM students s
+                    JOIN users u ON s.user_id = u.user_id
+                    ORDER BY s.student_id DESC
+                    LIMIT ?
+                """, (recent_limit,))
+                recent_students = [dict(row) for row in cursor.fetchall()]
+                
+                cursor.execute("""
+                    SELECT t.teacher_id, t.employee_id, t.department, u.full_name
+                    FROM teachers t
+                    JOIN users u ON t.user_id = u.user_id
+                    ORDER BY t.teacher_id DESC
+                    LIMIT ?
+                """, (recent_limit,))
+                recent_teachers = [dict(row) for row in cursor.fetchall()]
+                cursor.close()
+            
+            return {
+                'total_users': totals.get('users', 0),
+                'total_students': totals.get('students', 0),
+                'total_teachers': totals.get('teachers', 0),
+                'total_courses': totals.get('courses', 0),
+                'recent_students': recent_students,
+                'recent_teachers': recent_teachers,
+            }
+        except Exception as e:
+            st.error(f"❌ Error fetching system stats: {str(e)}")
+            return {
+                'total_users': 0, 'total_students': 0, 'total_teachers': 0, 'total_courses': 0,
+                'recent_students': [], 'recent_teachers': [],
+            }
+
+    # Analytics and transcripts
+    @cached('analytics_dirty')
+    def get_analytics_pending(self):
+        """Number of courses whose analytics cube cells are stale"""
+        try:
+            return self._query("SELECT COUNT(*) AS pending FROM analytics_dirty")[0]['pending']
+        except Exception as e:
+            st.error(f"❌ Error checking analytics state: {str(e)}")
+            return 0
+
+    @cached('analytics_cube')
+    def get_analytics_cells(self):
+        """Every analytics cube cell as a DataFrame; see analytics.AnalyticsCube"""
+        try:
+            return self._query("SELECT * FROM analytics_cube", as_frame=True)
+        except Exception as e:
+            st.error(f"❌ Error fetching analytics: {str(e)}")
+            return pd.DataFrame()
+
+    @cached('transcript_summary')
+    def get_transcript_summaries(self, student_ids):
+        """Stored cumulative GPA rows for a tuple of student ids; see transcript.TranscriptEngine"""
+        try:
+            return self._query(f"""
+                SELECT student_id, courses, credits, quality_points, gpa
+                FROM transcript_summary
+                WHERE student_id IN ({', '.join('?' * len(student_ids))})
+            """, tuple(student_ids), as_frame=True)
+        except Exception as e:
+            st.error(f"❌ Error fetching GPA summaries: {str(e)}")
+            return pd.DataFrame(columns=['student_id', 'courses', 'credits', 'quality_points', 'gpa'])
+
+    @cached('transcript_semesters')
+    def get_transcript_semesters(self, student_id):
+        """Stored per-semester and running GPA rows of a student, oldest semester first"""
+        try:
+            return self._query("""
+                SELECT semester, courses, credits, quality_points, gpa, cumulative_credits, cumulative_gpa
+                FROM transcript_semesters
+                WHERE student_id = ?
+                ORDER BY semester
+            """, (student_id,), as_frame=True)
+        except Exception as e:
+            st.error(f"❌ Error fetching transcript: {str(e)}")
+            return pd.DataFrame()
+
+    @cached('attendance_rolling', 'attendance_rolling_dirty')
+    def get_attendance_rolling_state(self):
+        """As-of date of the stored attendance windows (None when empty) and pending pair count"""
+        try:
+            return self._query("""
+                SELECT (SELECT MAX(as_of) FROM attendance_rolling) AS as_of,
+                       (SELECT COUNT(*) FROM attendance_rolling_dirty) AS dirty
+            """)[0]
+        except Exception as e:
+            st.error(f"❌ Error checking attendance analytics: {str(e)}")
+            return {'as_of': None, 'dirty': 0}
+
+    @cached('attendance_rolling', 'enrollments', 'students', 'users', 'courses')
+    def get_attendance_rolling(self, teacher_id=None):
+        """Stored attendance window counts of enrolled students, optionally one teacher's courses"""
+        try:
+            return self._query("""
+                SELECT r.*, s.roll_number, u.full_name as student_name, s.class_name, s.section,
+                       c.course_code, c.course_name, e.attendance_percentage
+                FROM attendance_rolling r
+                JOIN enrollments e ON e.student_id = r.student_id AND e.course_id = r.course_id
+                JOIN students s ON r.student_id = s.student_id
+                JOIN users u ON s.user_id = u.user_id
+                JOIN courses c ON r.course_id = c.course_id
+                WHERE e.status = 'enrolled' AND (? IS NULL OR c.teacher_id = ?)
+                ORDER BY c.course_code, s.roll_number
+            """, (teacher_id, teacher_id), as_frame=True)
+        except Exception as e:
+            st.error(f"❌ Error fetching attendance analytics: {str(e)}")
+            return pd.DataFrame()
+
+    @cached('term_archives')
+    def get_term_archives(self):
+        """Archive files written by the term archiver, oldest year first"""
+        try:
+            return self._query("SELECT * FROM term_archives ORDER BY year")
+        except Exception as e:
+            st.error(f"❌ Error fetching term archives: {str(e)}")
+            return []
+
     # User Management
-    def authenticate_user(self, username, password):
+    def authenticate_user(self, username, password, client_ip=None):
         """Authenticate user login - WITHOUT is_active check"""
+        keys = self.login_throttle.keys_for(username, client_ip)
+        if not self.login_throttle.admit(keys):
+            wait = self.login_throttle.retry_after(keys)
+            if wait > 0:
+                st.error(f"🔒 Too many failed attempts. Try again in {wait:.0f} seconds.")
+            else:
+                st.error("⏳ The server is busy with other logins. Please try again shortly.")
+            return None
+        
+        success = False
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
-            user = cursor.fetchone()
-            cursor.close()
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
+                user = cursor.fetchone()
+                cursor.close()
             
+            # Verify outside the pool so the read connection is not held during bcrypt
             if user:
                 user_dict = dict(user)
-                if bcrypt.checkpw(password.encode(), user_dict['password'].encode()):
+                if self.hasher.verify(password, user_dict['password']):
+                    success = True
+                    if self.hasher.needs_rehash(user_dict['password']):
+                        self._rehash_password(user_dict['user_id'], password)
                     return user_dict
             return None
+        except HasherBusy:
+            # Overload is not the user's fault; record no outcome for it
+            success = None
+            st.error("⏳ The server is busy with other logins. Please try again shortly.")
+            return None
         except Exception as e:
             st.error(f"❌ Authentication error: {str(e)}")
             return None
+        finally:
+            self.login_throttle.release(keys, success)
+    
+    def _rehash_password(self, user_id, password):
+        """Re-hash a password at the current cost factor after a successful login"""
+        hashed_password = self.hasher.hash(password)
+        with self.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE users SET password = ? WHERE user_id = ?", (hashed_password, user_id))
+            conn.commit()
+            cursor.close()
     
     def create_user(self, username, password, role, email, full_name):
         """Create new user"""
         try:
-            hashed_password = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
-                (username, hashed_password, role, email, full_name)
-            )
-            user_id = cursor.lastrowid
-            self.conn.commit()
-            cursor.close()
-            return user_id
+            hashed_password = self.hasher.hash(password)
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
+                    (username, hashed_password, role, email, full_name)
+                )
+                user_id = cursor.lastrowid
+                conn.commit()
+                cursor.close()
+                return user_id
         except Exception as e:
             st.error(f"❌ Error creating user: {str(e)}")
             return None
     
-    def get_all_users(self):
+    @cached('users')
+    def get_all_users(self, as_frame=False):
         """Get all users"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT * FROM users ORDER BY role, username")
-            users = cursor.fetchall()
-            cursor.close()
-            return [dict(user) for user in users]
+            return self._query("SELECT * FROM users ORDER BY role, username", as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching users: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
+    
+    @cached('users')
+    def get_all_users_page(self, after=None, limit=50, role=None, search=None, as_frame=False):
+        """Get one page of users in (role, username) order, optionally filtered"""
+        try:
+            filters, params = [], []
+            if role:
+                filters.append("role = ?")
+                params.append(role)
+            if search:
+                filters.append("(username LIKE ? OR email LIKE ? OR full_name LIKE ?)")
+                params.extend([f"%{search}%"] * 3)
+            return self._query_page(
+                "SELECT *, {keys} FROM users WHERE " + " AND ".join(filters + ["{where}"]) + " ORDER BY {order}",
+                ["role", "username"], params, after, limit, as_frame
+            )
+        except Exception as e:
+            st.error(f"❌ Error fetching users: {str(e)}")
+            return self._empty_result(as_frame), None
+    
+    @cached('users')
+    def get_user_by_id(self, user_id):
+        """Get a user by ID"""
+        try:
+            rows = self._query("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            return rows[0] if rows else None
+        except Exception as e:
+            st.error(f"❌ Error fetching user: {str(e)}")
+            return None
+    
+    def delete_user(self, user_id):
+        """Delete a user account"""
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+                conn.commit()
+                cursor.close()
+                return True
+        except Exception as e:
+            st.error(f"❌ Error deleting user: {str(e)}")
+            return False
     
     # Student Management
     def create_student(self, user_id, roll_number, class_name, section, dob, phone, address, guardian_name, guardian_phone):
         """Create student profile"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """INSERT INTO students (user_id, roll_number, class_name, section, 
-                dob, phone, address, guardian_name, guardian_phone) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (user_id, roll_number, class_name, section, dob, phone, 
-                 address, guardian_name, guardian_phone)
-            )
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """INSERT INTO students (user_id, roll_number, class_name, section, 
+                    dob, phone, address, guardian_name, guardian_phone) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (user_id, roll_number, class_name, section, dob, phone, 
+                     address, guardian_name, guardian_phone)
+                )
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error creating student: {str(e)}")
             return False
     
-    def get_all_students(self):
+    @cached('students', 'users')
+    def get_all_students(self, as_frame=False):
         """Get all students with user details"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT s.*, u.username, u.email, u.full_name, u.role
                 FROM students s 
                 JOIN users u ON s.user_id = u.user_id
                 ORDER BY s.class_name, s.section, s.roll_number
-            """)
-            students = cursor.fetchall()
-            cursor.close()
-            return [dict(student) for student in students]
+                """, as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching students: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
+    @cached('students', 'users')
+    def get_all_students_page(self, after=None, limit=50, as_frame=False):
+        """Get one page of students in (class, section, roll number) order"""
+        try:
+            return self._query_page("""
+                SELECT s.*, u.username, u.email, u.full_name, u.role, {keys}
+                FROM students s 
+                JOIN users u ON s.user_id = u.user_id
+                WHERE {where}
+                ORDER BY {order}
+                """, ["s.class_name", "s.section", "s.roll_number"], (), after, limit, as_frame)
+        except Exception as e:
+            st.error(f"❌ Error fetching students: {str(e)}")
+            return self._empty_result(as_frame), None
+    
+    @cached('students', 'users')
     def get_student_by_user_id(self, user_id):
         """Get student by user ID"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            rows = self._query("""
                 SELECT s.*, u.username, u.email, u.full_name
                 FROM students s 
                 JOIN users u ON s.user_id = u.user_id
                 WHERE s.user_id = ?
             """, (user_id,))
-            student = cursor.fetchone()
-            cursor.close()
-            return dict(student) if student else None
+            return rows[0] if rows else None
         except Exception as e:
             st.error(f"❌ Error fetching student: {str(e)}")
             return None
     
-    def get_student_enrollments(self, student_id):
+    def update_student_profile(self, student_id, phone, address, guardian_name, guardian_phone):
+        """Update a student's contact details"""
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE students 
+                    SET phone = ?, address = ?, guardian_name = ?, guardian_phone = ?
+                    WHERE student_id = ?
+                """, (phone, address, guardian_name, guardian_phone, student_id))
+                conn.commit()
+                cursor.close()
+                return True
+        except Exception as e:
+            st.error(f"❌ Error updating profile: {str(e)}")
+            return False
+    
+    @cached('enrollments', 'courses', 'teachers', 'users')
+    def get_student_enrollments(self, student_id, as_frame=False):
         """Get all courses a student is enrolled in"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT e.*, c.course_code, c.course_name, c.credits, 
                        u.full_name as teacher_name,
                        t.teacher_id
@@ -299,72 +536,81 @@ class Database:
                 LEFT JOIN users u ON t.user_id = u.user_id
                 WHERE e.student_id = ? AND e.status = 'enrolled'
                 ORDER BY c.semester, c.course_code
-            """, (student_id,))
-            enrollments = cursor.fetchall()
-            cursor.close()
-            return [dict(enrollment) for enrollment in enrollments]
+                """, (student_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching enrollments: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     # Teacher Management
     def create_teacher(self, user_id, employee_id, department, qualification, specialization, experience, phone, address):
         """Create teacher profile"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """INSERT INTO teachers (user_id, employee_id, department, 
-                qualification, specialization, experience, phone, address) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (user_id, employee_id, department, qualification, 
-                 specialization, experience, phone, address)
-            )
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """INSERT INTO teachers (user_id, employee_id, department, 
+                    qualification, specialization, experience, phone, address) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (user_id, employee_id, department, qualification, 
+                     specialization, experience, phone, address)
+                )
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error creating teacher: {str(e)}")
             return False
     
-    def get_all_teachers(self):
+    @cached('teachers', 'users')
+    def get_all_teachers(self, as_frame=False):
         """Get all teachers with user details"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT t.*, u.username, u.email, u.full_name, u.role
                 FROM teachers t 
                 JOIN users u ON t.user_id = u.user_id
                 ORDER BY t.department, t.employee_id
-            """)
-            teachers = cursor.fetchall()
-            cursor.close()
-            return [dict(teacher) for teacher in teachers]
+                """, as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching teachers: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
+    
+    @cached('teachers', 'users')
+    def get_all_teachers_page(self, after=None, limit=50, as_frame=False):
+        """Get one page of teachers in (department, employee ID) order"""
+        try:
+            # COALESCE keeps NULL departments first, as in get_all_teachers
+            return self._query_page("""
+                SELECT t.*, u.username, u.email, u.full_name, u.role, {keys}
+                FROM teachers t 
+                JOIN users u ON t.user_id = u.user_id
+                WHERE {where}
+                ORDER BY {order}
+                """, ["COALESCE(t.department, '')", "t.employee_id"], (), after, limit, as_frame)
+        except Exception as e:
+            st.error(f"❌ Error fetching teachers: {str(e)}")
+            return self._empty_result(as_frame), None
     
+    @cached('teachers', 'users')
     def get_teacher_by_user_id(self, user_id):
         """Get teacher by user ID"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            rows = self._query("""
                 SELECT t.*, u.username, u.email, u.full_name
                 FROM teachers t 
                 JOIN users u ON t.user_id = u.user_id
                 WHERE t.user_id = ?
             """, (user_id,))
-            teacher = cursor.fetchone()
-            cursor.close()
-            return dict(teacher) if teacher else None
+            return rows[0] if rows else None
         except Exception as e:
             st.error(f"❌ Error fetching teacher: {str(e)}")
             return None
     
-    def get_courses_by_teacher(self, teacher_id):
+    @cached('courses', 'enrollments', 'teachers', 'users')
+    def get_courses_by_teacher(self, teacher_id, as_frame=False):
         """Get courses assigned to a teacher"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     c.*,
                     ut.full_name as teacher_name,
@@ -376,38 +622,36 @@ class Database:
                 WHERE c.teacher_id = ?
                 GROUP BY c.course_id
                 ORDER BY c.semester, c.course_code
-            """, (teacher_id,))
-            courses = cursor.fetchall()
-            cursor.close()
-            return [dict(course) for course in courses]
+                """, (teacher_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching teacher courses: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     # Course Management
     def create_course(self, course_code, course_name, description, credits, department, semester, max_students, teacher_id=None):
         """Create new course"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute(
-                """INSERT INTO courses (course_code, course_name, description, 
-                credits, department, semester, max_students, teacher_id) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (course_code, course_name, description, credits, 
-                 department, semester, max_students, teacher_id)
-            )
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """INSERT INTO courses (course_code, course_name, description, 
+                    credits, department, semester, max_students, teacher_id) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (course_code, course_name, description, credits, 
+                     department, semester, max_students, teacher_id)
+                )
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error creating course: {str(e)}")
             return False
     
-    def get_all_courses(self):
+    @cached('courses', 'enrollments', 'teachers', 'users')
+    def get_all_courses(self, as_frame=False):
         """Get all courses with teacher details"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     c.*, 
                     t.employee_id, 
@@ -419,20 +663,42 @@ class Database:
                 LEFT JOIN enrollments e ON c.course_id = e.course_id AND e.status = 'enrolled'
                 GROUP BY c.course_id
                 ORDER BY c.department, c.semester, c.course_code
-            """)
-            courses = cursor.fetchall()
-            cursor.close()
-            return [dict(course) for course in courses]
+                """, as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching courses: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
-    def get_available_courses_for_student(self, student_id):
+    @cached('courses', 'enrollments', 'teachers', 'users')
+    def get_all_courses_page(self, after=None, limit=50, as_frame=False):
+        """Get one page of courses in (department, semester, code) order"""
+        try:
+            # COALESCE keeps NULL department/semester first, as in get_all_courses
+            # The correlated count avoids GROUP BY so the page reads in index order
+            return self._query_page("""
+                SELECT 
+                    c.*, 
+                    t.employee_id, 
+                    u.full_name as teacher_name, 
+                    (SELECT COUNT(*) FROM enrollments e 
+                     WHERE e.course_id = c.course_id AND e.status = 'enrolled') as enrolled_students,
+                    {keys}
+                FROM courses c 
+                LEFT JOIN teachers t ON c.teacher_id = t.teacher_id
+                LEFT JOIN users u ON t.user_id = u.user_id
+                WHERE {where}
+                ORDER BY {order}
+                """, ["COALESCE(c.department, '')", "COALESCE(c.semester, -1)", "c.course_code"],
+                (), after, limit, as_frame)
+        except Exception as e:
+            st.error(f"❌ Error fetching courses: {str(e)}")
+            return self._empty_result(as_frame), None
+    
+    @cached('courses', 'enrollments', 'teachers', 'users')
+    def get_available_courses_for_student(self, student_id, as_frame=False):
         """Get courses available for a student to enroll"""
         try:
-            cursor = self.conn.cursor()
             # Get all courses not enrolled in
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     c.*,
                     u.full_name as teacher_name
@@ -444,54 +710,52 @@ class Database:
                     WHERE student_id = ? AND status = 'enrolled'
                 )
                 ORDER BY c.course_code
-            """, (student_id,))
-            courses = cursor.fetchall()
-            cursor.close()
-            return [dict(course) for course in courses]
+                """, (student_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching available courses: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     def enroll_student_in_course(self, student_id, course_id):
         """Enroll student in a course"""
         try:
-            cursor = self.conn.cursor()
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
             
-            # Check if course exists and has a teacher assigned
-            cursor.execute("SELECT teacher_id FROM courses WHERE course_id = ?", (course_id,))
-            course = cursor.fetchone()
-            if not course:
-                st.error("❌ Course not found")
-                return False
+                # Check if course exists and has a teacher assigned
+                cursor.execute("SELECT teacher_id FROM courses WHERE course_id = ?", (course_id,))
+                course = cursor.fetchone()
+                if not course:
+                    st.error("❌ Course not found")
+                    return False
             
-            # Check if already enrolled
-            cursor.execute("""
-                SELECT * FROM enrollments 
-                WHERE student_id = ? AND course_id = ?
-            """, (student_id, course_id))
-            if cursor.fetchone():
-                st.warning("⚠️ Student is already enrolled in this course")
-                return False
+                # Check if already enrolled
+                cursor.execute("""
+                    SELECT * FROM enrollments 
+                    WHERE student_id = ? AND course_id = ?
+                """, (student_id, course_id))
+                if cursor.fetchone():
+                    st.warning("⚠️ Student is already enrolled in this course")
+                    return False
             
-            # Enroll the student
-            cursor.execute("""
-                INSERT INTO enrollments (student_id, course_id, enrollment_date, status) 
-                VALUES (?, ?, DATE('now'), 'enrolled')
-            """, (student_id, course_id))
-            self.conn.commit()
+                # Enroll the student
+                cursor.execute("""
+                    INSERT INTO enrollments (student_id, course_id, enrollment_date, status) 
+                    VALUES (?, ?, DATE('now'), 'enrolled')
+                """, (student_id, course_id))
+                conn.commit()
             
-            st.success(f"✅ Student successfully enrolled in course!")
-            cursor.close()
-            return True
+                st.success(f"✅ Student successfully enrolled in course!")
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error enrolling student: {str(e)}")
             return False
     
-    def get_course_enrollments(self, course_id):
+    @cached('enrollments', 'students', 'users')
+    def get_course_enrollments(self, course_id, as_frame=False):
         """Get all students enrolled in a course"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     e.*, 
                     s.roll_number, 
@@ -505,19 +769,38 @@ class Database:
                 JOIN users u ON s.user_id = u.user_id
                 WHERE e.course_id = ? AND e.status = 'enrolled'
                 ORDER BY s.roll_number
-            """, (course_id,))
-            enrollments = cursor.fetchall()
-            cursor.close()
-            return [dict(enrollment) for enrollment in enrollments]
+                """, (course_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching course enrollments: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
+    
+    @cached('enrollments', 'students', 'users')
+    def get_course_enrollments_page(self, course_id, after=None, limit=50, as_frame=False):
+        """Get one page of a course's enrolled students in roll number order"""
+        try:
+            return self._query_page("""
+                SELECT 
+                    e.*, 
+                    s.roll_number, 
+                    s.class_name, 
+                    s.section, 
+                    u.full_name as student_name,
+                    {keys}
+                FROM enrollments e
+                JOIN students s ON e.student_id = s.student_id
+                JOIN users u ON s.user_id = u.user_id
+                WHERE e.course_id = ? AND e.status = 'enrolled' AND {where}
+                ORDER BY {order}
+                """, ["s.roll_number"], (course_id,), after, limit, as_frame)
+        except Exception as e:
+            st.error(f"❌ Error fetching course enrollments: {str(e)}")
+            return self._empty_result(as_frame), None
     
-    def get_students_by_teacher(self, teacher_id):
+    @cached('enrollments', 'students', 'courses', 'teachers', 'users')
+    def get_students_by_teacher(self, teacher_id, as_frame=False):
         """Get all students taught by a specific teacher"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT DISTINCT
                     s.student_id,
                     s.roll_number,
@@ -536,125 +819,314 @@ class Database:
                 LEFT JOIN users ut ON t.user_id = ut.user_id
                 WHERE c.teacher_id = ?
                 ORDER BY s.roll_number, c.course_code
-            """, (teacher_id,))
-            students = cursor.fetchall()
-            cursor.close()
-            return [dict(student) for student in students]
+                """, (teacher_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching students by teacher: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     # Attendance
     def mark_attendance(self, student_id, course_id, date, status, remarks=""):
         """Mark attendance for a student"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO attendance 
-                (student_id, course_id, date, status, remarks)
-                VALUES (?, ?, ?, ?, ?)
-            """, (student_id, course_id, date, status, remarks))
-            self.conn.commit()
+            if self.attendance_store is not None:
+                self.attendance_store.mark_many([(student_id, course_id, date, status, remarks)])
+                return True
             
-            # Update attendance percentage in enrollments
-            cursor.execute("""
-                UPDATE enrollments 
-                SET attendance_percentage = (
-                    SELECT 
-                        ROUND((COUNT(CASE WHEN status IN ('present', 'late') THEN 1 END) * 100.0 / COUNT(*)), 2)
-                    FROM attendance 
-                    WHERE student_id = ? AND course_id = ?
-                )
-                WHERE student_id = ? AND course_id = ?
-            """, (student_id, course_id, student_id, course_id))
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                # Enrollment counters and attendance_percentage are kept
+                # up to date by the attendance triggers (migration 4)
+                cursor.execute("""
+                    INSERT INTO attendance 
+                    (student_id, course_id, date, status, remarks)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(student_id, course_id, date) 
+                    DO UPDATE SET status = excluded.status, remarks = excluded.remarks
+                """, (student_id, course_id, date, status, remarks))
+                conn.commit()
             
-            cursor.close()
-            return True
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error marking attendance: {str(e)}")
             return False
     
-    def get_student_attendance(self, student_id, course_id=None):
+    def mark_attendance_bulk(self, course_id, date, records):
+        """Mark attendance for a whole roster in one transaction
+        
+        records: iterable of (student_id, status, remarks) tuples.
+        Returns the number of students marked (0 on failure).
+        """
+        try:
+            rows = [(student_id, course_id, date, status, remarks or "")
+                    for student_id, status, remarks in records]
+            if not rows:
+                return 0
+            if self.attendance_store is not None:
+                return self.attendance_store.mark_many(rows)
+            
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                # The attendance triggers apply each row's counter delta, so
+                # no recompute over the attendance table is needed here
+                cursor.executemany("""
+                    INSERT INTO attendance 
+                    (student_id, course_id, date, status, remarks)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(student_id, course_id, date) 
+                    DO UPDATE SET status = excluded.status, remarks = excluded.remarks
+                """, rows)
+                conn.commit()
+                
+                cursor.close()
+                return len(rows)
+        except Exception as e:
+            st.error(f"❌ Error marking attendance: {str(e)}")
+            return 0
+    
+    def verify_attendance_counters(self, repair=False):
+        """Compare enrollment attendance counters with a full recompute
+        
+        Returns the mismatching enrollments; with repair=True they are
+        reset to the recomputed values.
+        """
+        try:
+            if self.attendance_store is not None:
+                mismatches = self._store_counter_mismatches()
+            else:
+                mismatches = self._table_counter_mismatches()
+            
+            if repair and mismatches:
+                with self.pool.writer() as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany("""
+                        UPDATE enrollments SET present_count = ?, total_count = ?,
+                            attendance_percentage = CASE WHEN ? > 0 THEN ROUND(? * 100.0 / ?, 2) ELSE 0 END
+                        WHERE enrollment_id = ?
+                    """, [(m['actual_present'], m['actual_total'], m['actual_total'],
+                           m['actual_present'], m['actual_total'], m['enrollment_id'])
+                          for m in mismatches])
+                    conn.commit()
+                    cursor.close()
+            return mismatches
+        except Exception as e:
+            st.error(f"❌ Error verifying attendance counters: {str(e)}")
+            return []
+    
+    def _table_counter_mismatches(self):
+        """Enrollments whose counters differ from an aggregate over the attendance table"""
+        with self.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT e.enrollment_id, e.student_id, e.course_id,
+                       e.present_count, e.total_count, e.attendance_percentage,
+                       COALESCE(a.actual_present, 0) as actual_present,
+                       COALESCE(a.actual_total, 0) as actual_total
+                FROM enrollments e
+                LEFT JOIN (
+                    SELECT student_id, course_id,
+                           SUM(present) as actual_present,
+                           SUM(total) as actual_total
+                    FROM (
+                        SELECT student_id, course_id, status IN ('present', 'late') as present, 1 as total
+                        FROM attendance
+                        UNION ALL
+                        -- Rows moved to term archives (archive.py)
+                        SELECT student_id, course_id, present_count, total_count
+                        FROM attendance_archived_counts
+                    )
+                    GROUP BY student_id, course_id
+                ) a ON a.student_id = e.student_id AND a.course_id = e.course_id
+                WHERE e.present_count != COALESCE(a.actual_present, 0)
+                   OR e.total_count != COALESCE(a.actual_total, 0)
+            """)
+            mismatches = [dict(row) for row in cursor.fetchall()]
+            cursor.close()
+        return mismatches
+    
+    def _store_counter_mismatches(self):
+        """Enrollments whose counters differ from the days held in the bitmap store"""
+        with self.pool.reader() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            enrollments = self._query("""
+                SELECT enrollment_id, student_id, course_id,
+                       present_count, total_count, attendance_percentage
+                FROM enrollments
+                """, as_frame=True)
+            counts = self.attendance_store.counts(conn)
+            archived = self._query("""
+                SELECT student_id, course_id, present_count as attended, total_count as total
+                FROM attendance_archived_counts
+                """, as_frame=True)
+        
+        counts = (pd.concat([counts, archived]).astype('int64')
+                  .groupby(['student_id', 'course_id'], as_index=False).sum())
+        frame = enrollments.merge(counts, on=['student_id', 'course_id'], how='left')
+        frame['actual_present'] = frame.pop('attended').fillna(0).astype(int)
+        frame['actual_total'] = frame.pop('total').fillna(0).astype(int)
+        frame = frame[(frame['present_count'] != frame['actual_present'])
+                      | (frame['total_count'] != frame['actual_total'])]
+        return frame.astype(object).to_dict('records')
+    
+    @cached('attendance', 'attendance_bitmaps', 'attendance_exceptions', 'courses')
+    def get_student_attendance(self, student_id, course_id=None, as_frame=False):
         """Get attendance records for a student"""
         try:
-            cursor = self.conn.cursor()
+            if self.attendance_store is not None:
+                frame = self._stored_attendance(student_id, course_id)
+                return frame if as_frame else frame.astype(object).to_dict('records')
             if course_id:
-                cursor.execute("""
+                return self._query("""
                     SELECT a.*, c.course_code, c.course_name
                     FROM attendance a
                     JOIN courses c ON a.course_id = c.course_id
                     WHERE a.student_id = ? AND a.course_id = ?
                     ORDER BY a.date DESC
-                """, (student_id, course_id))
+                """, (student_id, course_id), as_frame=as_frame)
             else:
-                cursor.execute("""
+                return self._query("""
                     SELECT a.*, c.course_code, c.course_name
                     FROM attendance a
                     JOIN courses c ON a.course_id = c.course_id
                     WHERE a.student_id = ?
                     ORDER BY a.date DESC
-                """, (student_id,))
-            
-            attendance = cursor.fetchall()
-            cursor.close()
-            return [dict(record) for record in attendance]
+                """, (student_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching attendance: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
+    
+    def _stored_attendance(self, student_id, course_id=None):
+        """Attendance records from the bitmap store with course code and name, newest first"""
+        with self.pool.reader() as conn:
+            records = self.attendance_store.records(student_id, course_id, conn)
+            courses = self._query("SELECT course_id, course_code, course_name FROM courses", as_frame=True)
+        return records.merge(courses, on='course_id')
     
     # Assignments and Grades
+    @cached('enrollments', 'students', 'users', 'assignments', 'grades', 'assignment_submissions')
+    def get_course_gradebook(self, course_id):
+        """Student x assignment marks for a course in one query, with aggregates
+        
+        Returns a dict of DataFrames:
+        students    - one row per enrolled student, plus graded_count,
+                      total_obtained, total_possible and assignment_average
+        assignments - one row per assignment, plus graded_count,
+                      submitted_count, average, highest, lowest, average_pct
+        marks       - marks_obtained indexed by student_id with one column
+                      per assignment_id (NaN where not graded)
+        submissions - submission_id/status/feedback per (student_id, assignment_id)
+        """
+        try:
+            cells = self._query("""
+                SELECT e.student_id, s.roll_number, u.full_name as student_name,
+                       s.class_name, s.section, e.status, e.grade, e.marks, e.attendance_percentage,
+                       a.assignment_id, a.title, a.due_date, a.total_marks, a.weightage,
+                       g.marks_obtained, g.remarks,
+                       sub.submission_id, sub.status as submission_status, sub.feedback
+                FROM enrollments e
+                JOIN students s ON e.student_id = s.student_id
+                JOIN users u ON s.user_id = u.user_id
+                LEFT JOIN assignments a ON a.course_id = e.course_id
+                LEFT JOIN grades g ON g.assignment_id = a.assignment_id AND g.student_id = e.student_id
+                LEFT JOIN assignment_submissions sub
+                    ON sub.assignment_id = a.assignment_id AND sub.student_id = e.student_id
+                WHERE e.course_id = ? AND e.status = 'enrolled'
+                ORDER BY s.roll_number, a.due_date, a.assignment_id
+                """, (course_id,), as_frame=True)
+            
+            students = cells.drop_duplicates('student_id')[[
+                'student_id', 'roll_number', 'student_name', 'class_name', 'section',
+                'status', 'grade', 'marks', 'attendance_percentage'
+            ]].reset_index(drop=True)
+            cells = cells.dropna(subset=['assignment_id']).astype({'assignment_id': 'int64'})
+            assignments = cells.drop_duplicates('assignment_id')[[
+                'assignment_id', 'title', 'due_date', 'total_marks', 'weightage'
+            ]].reset_index(drop=True)
+            
+            # Pivot the long (student, assignment) cells into the matrix
+            marks = cells.pivot(index='student_id', columns='assignment_id', values='marks_obtained')
+            marks = marks.reindex(index=students['student_id'], columns=assignments['assignment_id'])
+            
+            graded = cells.dropna(subset=['marks_obtained'])
+            per_assignment = graded.groupby('assignment_id')['marks_obtained'].agg(
+                graded_count='count', average='mean', highest='max', lowest='min'
+            )
+            per_assignment['submitted_count'] = cells.dropna(subset=['submission_id']).groupby('assignment_id').size()
+            assignments = assignments.join(per_assignment, on='assignment_id')
+            assignments[['graded_count', 'submitted_count']] = (
+                assignments[['graded_count', 'submitted_count']].fillna(0).astype('int64')
+            )
+            assignments['average_pct'] = assignments['average'] / assignments['total_marks'] * 100
+            
+            per_student = graded.groupby('student_id').agg(
+                graded_count=('marks_obtained', 'count'),
+                total_obtained=('marks_obtained', 'sum'),
+                total_possible=('total_marks', 'sum')
+            )
+            students = students.join(per_student, on='student_id')
+            students['graded_count'] = students['graded_count'].fillna(0).astype('int64')
+            students['assignment_average'] = students['total_obtained'] / students['total_possible'] * 100
+            
+            submissions = cells.dropna(subset=['submission_id'])[[
+                'student_id', 'assignment_id', 'submission_id', 'submission_status', 'marks_obtained', 'feedback'
+            ]].astype({'submission_id': 'int64'}).reset_index(drop=True)
+            
+            return {'students': students, 'assignments': assignments, 'marks': marks, 'submissions': submissions}
+        except Exception as e:
+            st.error(f"❌ Error fetching gradebook: {str(e)}")
+            return {'students': pd.DataFrame(), 'assignments': pd.DataFrame(),
+                    'marks': pd.DataFrame(), 'submissions': pd.DataFrame()}
+    
     def create_assignment(self, course_id, teacher_id, title, description, total_marks, weightage, due_date):
         """Create new assignment"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO assignments 
-                (course_id, teacher_id, title, description, total_marks, weightage, due_date)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (course_id, teacher_id, title, description, total_marks, weightage, due_date))
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO assignments 
+                    (course_id, teacher_id, title, description, total_marks, weightage, due_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (course_id, teacher_id, title, description, total_marks, weightage, due_date))
             
-            assignment_id = cursor.lastrowid
+                assignment_id = cursor.lastrowid
             
-            # Auto-create grade entries for all enrolled students
-            cursor.execute("""
-                INSERT INTO grades (student_id, assignment_id, marks_obtained, remarks)
-                SELECT e.student_id, ?, 0, ''
-                FROM enrollments e
-                WHERE e.course_id = ? AND e.status = 'enrolled'
-            """, (assignment_id, course_id))
+                # Auto-create grade entries for all enrolled students
+                cursor.execute("""
+                    INSERT INTO grades (student_id, assignment_id, marks_obtained, remarks)
+                    SELECT e.student_id, ?, 0, ''
+                    FROM enrollments e
+                    WHERE e.course_id = ? AND e.status = 'enrolled'
+                """, (assignment_id, course_id))
             
-            self.conn.commit()
-            cursor.close()
-            return assignment_id
+                conn.commit()
+                cursor.close()
+                return assignment_id
         except Exception as e:
             st.error(f"❌ Error creating assignment: {str(e)}")
             return None
     
-    def get_assignments_by_course(self, course_id):
+    @cached('assignments', 'teachers', 'users')
+    def get_assignments_by_course(self, course_id, as_frame=False):
         """Get all assignments for a course"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT a.*, u.full_name as teacher_name
                 FROM assignments a
                 JOIN teachers t ON a.teacher_id = t.teacher_id
                 JOIN users u ON t.user_id = u.user_id
                 WHERE a.course_id = ?
                 ORDER BY a.due_date
-            """, (course_id,))
-            assignments = cursor.fetchall()
-            cursor.close()
-            return [dict(assignment) for assignment in assignments]
+                """, (course_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching assignments: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
-    def get_assignment_grades(self, assignment_id):
+    @cached('grades', 'assignments', 'courses', 'students', 'users')
+    def get_assignment_grades(self, assignment_id, as_frame=False):
         """Get all grades for an assignment"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     g.*, 
                     s.roll_number, 
@@ -669,104 +1141,223 @@ class Database:
                 JOIN courses c ON a.course_id = c.course_id
                 WHERE g.assignment_id = ?
                 ORDER BY s.roll_number
-            """, (assignment_id,))
-            grades = cursor.fetchall()
-            cursor.close()
-            return [dict(grade) for grade in grades]
+                """, (assignment_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching assignment grades: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     def update_grade(self, student_id, assignment_id, marks_obtained, remarks=""):
         """Update grade for a student"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO grades 
-                (student_id, assignment_id, marks_obtained, remarks)
-                VALUES (?, ?, ?, ?)
-            """, (student_id, assignment_id, marks_obtained, remarks))
-            
-            # Calculate course marks average
-            cursor.execute("""
-                SELECT a.course_id
-                FROM assignments a
-                WHERE a.assignment_id = ?
-            """, (assignment_id,))
-            course = cursor.fetchone()
-            
-            if course:
-                course_id = course[0]
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                # enrollments.marks is maintained by the weighted grade triggers (migration 5)
                 cursor.execute("""
-                    UPDATE enrollments 
-                    SET marks = (
-                        SELECT ROUND(AVG(g.marks_obtained * 100.0 / a.total_marks), 2)
-                        FROM grades g
-                        JOIN assignments a ON g.assignment_id = a.assignment_id
-                        WHERE g.student_id = ? AND a.course_id = ?
-                    )
-                    WHERE student_id = ? AND course_id = ?
-                """, (student_id, course_id, student_id, course_id))
+                    INSERT INTO grades 
+                    (student_id, assignment_id, marks_obtained, remarks)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(student_id, assignment_id) 
+                    DO UPDATE SET marks_obtained = excluded.marks_obtained, remarks = excluded.remarks,
+                        graded_at = CURRENT_TIMESTAMP
+                """, (student_id, assignment_id, marks_obtained, remarks))
             
-            self.conn.commit()
-            cursor.close()
-            return True
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error updating grade: {str(e)}")
             return False
     
-    def get_student_grades(self, student_id, course_id=None):
+    def update_grades_bulk(self, assignment_id, records):
+        """Grade a whole assignment in one transaction
+        
+        records: iterable of (student_id, marks_obtained, remarks) tuples.
+        Returns one {'student_id', 'success', 'error'} dict per record, in order.
+        """
+        records = list(records)
+        outcomes = [{'student_id': r[0], 'success': False, 'error': None} for r in records]
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT course_id, total_marks FROM assignments WHERE assignment_id = ?
+                """, (assignment_id,))
+                assignment = cursor.fetchone()
+                if not assignment:
+                    for outcome in outcomes:
+                        outcome['error'] = "Assignment not found"
+                    return outcomes
+                
+                cursor.execute("""
+                    SELECT student_id FROM enrollments 
+                    WHERE course_id = ? AND status = 'enrolled'
+                """, (assignment['course_id'],))
+                enrolled = {row['student_id'] for row in cursor.fetchall()}
+                
+                rows = []
+                for outcome, (student_id, marks_obtained, remarks) in zip(outcomes, records):
+                    if student_id not in enrolled:
+                        outcome['error'] = "Student is not enrolled in this course"
+                        continue
+                    try:
+                        marks_obtained = float(marks_obtained)
+                    except (TypeError, ValueError):
+                        outcome['error'] = "Marks must be a number"
+                        continue
+                    if not 0 <= marks_obtained <= assignment['total_marks']:
+                        outcome['error'] = f"Marks must be between 0 and {assignment['total_marks']}"
+                    else:
+                        rows.append((student_id, assignment_id, marks_obtained, remarks or ""))
+                        outcome['success'] = True
+                
+                # Each row's weighted delta is applied to its enrollment by the grade triggers
+                cursor.executemany("""
+                    INSERT INTO grades 
+                    (student_id, assignment_id, marks_obtained, remarks)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(student_id, assignment_id) 
+                    DO UPDATE SET marks_obtained = excluded.marks_obtained, remarks = excluded.remarks,
+                        graded_at = CURRENT_TIMESTAMP
+                """, rows)
+                conn.commit()
+                cursor.close()
+                return outcomes
+        except Exception as e:
+            st.error(f"❌ Error updating grades: {str(e)}")
+            for outcome in outcomes:
+                outcome['success'] = False
+                outcome['error'] = outcome['error'] or str(e)
+            return outcomes
+    
+    def update_assignment_weightage(self, assignment_id, weightage, total_marks=None):
+        """Change an assignment's weightage (and optionally total marks)"""
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                # The assignment trigger re-scales this assignment's grades in every enrollment
+                cursor.execute("""
+                    UPDATE assignments 
+                    SET weightage = ?, total_marks = COALESCE(?, total_marks)
+                    WHERE assignment_id = ?
+                """, (weightage, total_marks, assignment_id))
+                conn.commit()
+                cursor.close()
+                return True
+        except Exception as e:
+            st.error(f"❌ Error updating assignment weightage: {str(e)}")
+            return False
+    
+    def verify_grade_sums(self, repair=False):
+        """Compare enrollment weighted grade sums with a full recompute
+        
+        Returns the mismatching enrollments; with repair=True their sums
+        and marks are reset to the recomputed values.
+        """
+        try:
+            with self.pool.reader() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT e.enrollment_id, e.student_id, e.course_id,
+                           e.weighted_score_sum, e.weight_sum, e.marks,
+                           COALESCE(g.actual_score_sum, 0) as actual_score_sum,
+                           COALESCE(g.actual_weight_sum, 0) as actual_weight_sum
+                    FROM enrollments e
+                    LEFT JOIN (
+                        SELECT student_id, course_id,
+                               SUM(score) as actual_score_sum,
+                               SUM(weight) as actual_weight_sum
+                        FROM (
+                            SELECT g.student_id, a.course_id,
+                                   g.marks_obtained * a.weightage / a.total_marks as score,
+                                   a.weightage as weight
+                            FROM grades g
+                            JOIN assignments a ON g.assignment_id = a.assignment_id
+                            WHERE a.total_marks > 0
+                            UNION ALL
+                            -- Grades moved to term archives (archive.py)
+                            SELECT student_id, course_id, weighted_score_sum, weight_sum
+                            FROM grades_archived_sums
+                        )
+                        GROUP BY student_id, course_id
+                    ) g ON g.student_id = e.student_id AND g.course_id = e.course_id
+                    WHERE ABS(e.weighted_score_sum - COALESCE(g.actual_score_sum, 0)) > 1e-6
+                       OR ABS(e.weight_sum - COALESCE(g.actual_weight_sum, 0)) > 1e-6
+                """)
+                mismatches = [dict(row) for row in cursor.fetchall()]
+                cursor.close()
+            
+            if repair and mismatches:
+                with self.pool.writer() as conn:
+                    cursor = conn.cursor()
+                    cursor.executemany("""
+                        UPDATE enrollments SET weighted_score_sum = ?, weight_sum = ?,
+                            marks = CASE WHEN ? > 0 THEN ROUND(? * 100.0 / ?, 2) ELSE 0 END
+                        WHERE enrollment_id = ?
+                    """, [(m['actual_score_sum'], m['actual_weight_sum'], m['actual_weight_sum'],
+                           m['actual_score_sum'], m['actual_weight_sum'], m['enrollment_id'])
+                          for m in mismatches])
+                    conn.commit()
+                    cursor.close()
+            return mismatches
+        except Exception as e:
+            st.error(f"❌ Error verifying grade sums: {str(e)}")
+            return []
+    
+    @cached('grades', 'assignments', 'courses')
+    def get_student_grades(self, student_id, course_id=None, as_frame=False):
         """Get grades for a student"""
         try:
-            cursor = self.conn.cursor()
             if course_id:
-                cursor.execute("""
+                return self._query("""
                     SELECT g.*, a.title, a.total_marks, c.course_code, c.course_name
                     FROM grades g
                     JOIN assignments a ON g.assignment_id = a.assignment_id
                     JOIN courses c ON a.course_id = c.course_id
                     WHERE g.student_id = ? AND a.course_id = ?
                     ORDER BY a.due_date
-                """, (student_id, course_id))
+                """, (student_id, course_id), as_frame=as_frame)
             else:
-                cursor.execute("""
+                return self._query("""
                     SELECT g.*, a.title, a.total_marks, c.course_code, c.course_name
                     FROM grades g
                     JOIN assignments a ON g.assignment_id = a.assignment_id
                     JOIN courses c ON a.course_id = c.course_id
                     WHERE g.student_id = ?
                     ORDER BY c.course_code, a.due_date
-                """, (student_id,))
-            
-            grades = cursor.fetchall()
-            cursor.close()
-            return [dict(grade) for grade in grades]
+                """, (student_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching grades: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     # Assignment Submission Methods
-    def submit_assignment(self, assignment_id, student_id, submission_text="", submission_file=""):
-        """Submit an assignment"""
+    def submit_assignment(self, assignment_id, student_id, submission_text="", submission_file="",
+                          file_hash=None, file_size=None):
+        """Submit an assignment
+        
+        submission_file is the uploaded file's name; file_hash and file_size
+        come from SubmissionFileStore.put().
+        """
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO assignment_submissions 
-                (assignment_id, student_id, submission_text, submission_file, submission_date, status)
-                VALUES (?, ?, ?, ?, DATETIME('now'), 'submitted')
-            """, (assignment_id, student_id, submission_text, submission_file))
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT OR REPLACE INTO assignment_submissions 
+                    (assignment_id, student_id, submission_text, submission_file, file_hash, file_size,
+                     submission_date, status)
+                    VALUES (?, ?, ?, ?, ?, ?, DATETIME('now'), 'submitted')
+                """, (assignment_id, student_id, submission_text, submission_file, file_hash, file_size))
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error submitting assignment: {str(e)}")
             return False
     
-    def get_student_assignments(self, student_id):
+    @cached('assignments', 'assignment_submissions', 'courses', 'enrollments', 'teachers', 'users')
+    def get_student_assignments(self, student_id, as_frame=False):
         """Get all assignments for a student with submission status"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     a.*,
                     c.course_code,
@@ -775,6 +1366,8 @@ class Database:
                     s.submission_id,
                     s.submission_text,
                     s.submission_file,
+                    s.file_hash,
+                    s.file_size,
                     s.submission_date,
                     s.status as submission_status,
                     s.marks_obtained,
@@ -788,19 +1381,120 @@ class Database:
                 LEFT JOIN assignment_submissions s ON a.assignment_id = s.assignment_id AND s.student_id = ?
                 WHERE e.student_id = ?
                 ORDER BY a.due_date DESC
-            """, (student_id, student_id, student_id))
-            assignments = cursor.fetchall()
-            cursor.close()
-            return [dict(assignment) for assignment in assignments]
+                """, (student_id, student_id, student_id), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching student assignments: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
-    def get_assignment_submissions(self, assignment_id):
+    @cached('enrollments', 'courses', 'teachers', 'users', 'attendance', 'attendance_bitmaps',
+            'attendance_exceptions', 'grades', 'assignments', 'assignment_submissions')
+    def get_student_overview(self, student_id):
+        """Everything the student pages show, from one set-based query per kind
+        
+        Returns a dict with:
+        enrollments         - list of dicts, as get_student_enrollments
+        attendance          - DataFrame of every attendance record (newest first)
+        attendance_summary  - DataFrame per course_id: total, present, percentage
+        grades              - DataFrame of every grade with its course_id
+        assignments         - list of dicts, as get_student_assignments
+        pending_assignments - assignments without a submission, by due date
+        """
+        try:
+            with self.pool.reader() as conn:
+                # One read transaction so all parts come from the same snapshot
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                
+                enrollments = self._query("""
+                    SELECT e.*, c.course_code, c.course_name, c.credits, 
+                           u.full_name as teacher_name,
+                           t.teacher_id
+                    FROM enrollments e
+                    JOIN courses c ON e.course_id = c.course_id
+                    LEFT JOIN teachers t ON c.teacher_id = t.teacher_id
+                    LEFT JOIN users u ON t.user_id = u.user_id
+                    WHERE e.student_id = ? AND e.status = 'enrolled'
+                    ORDER BY c.semester, c.course_code
+                    """, (student_id,))
+                
+                if self.attendance_store is not None:
+                    attendance = self._stored_attendance(student_id)
+                else:
+                    attendance = self._query("""
+                        SELECT a.*, c.course_code, c.course_name
+                        FROM attendance a
+                        JOIN courses c ON a.course_id = c.course_id
+                        WHERE a.student_id = ?
+                        ORDER BY a.date DESC
+                        """, (student_id,), as_frame=True)
+                
+                grades = self._query("""
+                    SELECT g.*, a.course_id, a.title, a.total_marks, c.course_code, c.course_name
+                    FROM grades g
+                    JOIN assignments a ON g.assignment_id = a.assignment_id
+                    JOIN courses c ON a.course_id = c.course_id
+                    WHERE g.student_id = ?
+                    ORDER BY c.course_code, a.due_date
+                    """, (student_id,), as_frame=True)
+                
+                assignments = self._query("""
+                    SELECT 
+                        a.*,
+                        c.course_code,
+                        c.course_name,
+                        u.full_name as teacher_name,
+                        s.submission_id,
+                        s.submission_text,
+                        s.submission_file,
+                        s.file_hash,
+                        s.file_size,
+                        s.submission_date,
+                        s.status as submission_status,
+                        s.marks_obtained,
+                        s.feedback,
+                        s.graded_at
+                    FROM assignments a
+                    JOIN courses c ON a.course_id = c.course_id
+                    JOIN teachers t ON a.teacher_id = t.teacher_id
+                    JOIN users u ON t.user_id = u.user_id
+                    JOIN enrollments e ON a.course_id = e.course_id AND e.student_id = ?
+                    LEFT JOIN assignment_submissions s ON a.assignment_id = s.assignment_id AND s.student_id = ?
+                    ORDER BY a.due_date DESC
+                    """, (student_id, student_id))
+            
+            if attendance.empty:
+                attendance_summary = pd.DataFrame(columns=['course_id', 'total', 'present', 'percentage'])
+            else:
+                attendance_summary = attendance.assign(
+                    present=attendance['status'].isin(['present', 'late'])
+                ).groupby('course_id').agg(total=('status', 'size'), present=('present', 'sum')).reset_index()
+                attendance_summary['percentage'] = attendance_summary['present'] / attendance_summary['total'] * 100
+            
+            pending = sorted(
+                (a for a in assignments if not a['submission_id']),
+                key=lambda a: a['due_date'] or ''
+            )
+            
+            return {
+                'enrollments': enrollments,
+                'attendance': attendance,
+                'attendance_summary': attendance_summary,
+                'grades': grades,
+                'assignments': assignments,
+                'pending_assignments': pending,
+            }
+        except Exception as e:
+            st.error(f"❌ Error fetching student overview: {str(e)}")
+            return {
+                'enrollments': [], 'attendance': pd.DataFrame(), 'attendance_summary': pd.DataFrame(),
+                'grades': pd.DataFrame(), 'assignments': [], 'pending_assignments': [],
+            }
+    
+    @cached('assignment_submissions', 'assignments', 'students', 'users')
+    def get_assignment_submissions(self, assignment_id, as_frame=False):
         """Get all submissions for an assignment"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            return self._query("""
                 SELECT 
                     s.*,
                     st.roll_number,
@@ -815,52 +1509,53 @@ class Database:
                 JOIN assignments a ON s.assignment_id = a.assignment_id
                 WHERE s.assignment_id = ?
                 ORDER BY s.submission_date DESC
-            """, (assignment_id,))
-            submissions = cursor.fetchall()
-            cursor.close()
-            return [dict(submission) for submission in submissions]
+                """, (assignment_id,), as_frame=as_frame)
         except Exception as e:
             st.error(f"❌ Error fetching assignment submissions: {str(e)}")
-            return []
+            return self._empty_result(as_frame)
     
     def grade_submission(self, submission_id, marks_obtained, feedback, graded_by):
         """Grade a submission"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE assignment_submissions 
-                SET marks_obtained = ?, feedback = ?, graded_by = ?, 
-                    graded_at = DATETIME('now'), status = 'graded'
-                WHERE submission_id = ?
-            """, (marks_obtained, feedback, graded_by, submission_id))
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    UPDATE assignment_submissions 
+                    SET marks_obtained = ?, feedback = ?, graded_by = ?, 
+                        graded_at = DATETIME('now'), status = 'graded'
+                    WHERE submission_id = ?
+                """, (marks_obtained, feedback, graded_by, submission_id))
             
-            # Also update the grades table
-            cursor.execute("""
-                SELECT assignment_id, student_id 
-                FROM assignment_submissions 
-                WHERE submission_id = ?
-            """, (submission_id,))
-            result = cursor.fetchone()
-            if result:
-                assignment_id, student_id = result
+                # Also update the grades table
                 cursor.execute("""
-                    INSERT OR REPLACE INTO grades 
-                    (student_id, assignment_id, marks_obtained, remarks)
-                    VALUES (?, ?, ?, ?)
-                """, (student_id, assignment_id, marks_obtained, feedback))
+                    SELECT assignment_id, student_id 
+                    FROM assignment_submissions 
+                    WHERE submission_id = ?
+                """, (submission_id,))
+                result = cursor.fetchone()
+                if result:
+                    assignment_id, student_id = result
+                    cursor.execute("""
+                        INSERT INTO grades 
+                        (student_id, assignment_id, marks_obtained, remarks)
+                        VALUES (?, ?, ?, ?)
+                        ON CONFLICT(student_id, assignment_id) 
+                        DO UPDATE SET marks_obtained = excluded.marks_obtained, remarks = excluded.remarks,
+                            graded_at = CURRENT_TIMESTAMP
+                    """, (student_id, assignment_id, marks_obtained, feedback))
             
-            self.conn.commit()
-            cursor.close()
-            return True
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error grading submission: {str(e)}")
             return False
     
+    @cached('assignment_submissions', 'assignments', 'students', 'users')
     def get_submission_by_id(self, submission_id):
         """Get a specific submission by ID"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
+            rows = self._query("""
                 SELECT s.*, st.roll_number, u.full_name as student_name,
                        a.title as assignment_title, a.total_marks
                 FROM assignment_submissions s
@@ -869,9 +1564,7 @@ class Database:
                 JOIN assignments a ON s.assignment_id = a.assignment_id
                 WHERE s.submission_id = ?
             """, (submission_id,))
-            submission = cursor.fetchone()
-            cursor.close()
-            return dict(submission) if submission else None
+            return rows[0] if rows else None
         except Exception as e:
             st.error(f"❌ Error fetching submission: {str(e)}")
             return None
@@ -879,11 +1572,12 @@ class Database:
     def delete_assignment(self, assignment_id):
         """Delete an assignment"""
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM assignments WHERE assignment_id = ?", (assignment_id,))
-            self.conn.commit()
-            cursor.close()
-            return True
+            with self.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM assignments WHERE assignment_id = ?", (assignment_id,))
+                conn.commit()
+                cursor.close()
+                return True
         except Exception as e:
             st.error(f"❌ Error deleting assignment: {str(e)}")
             return False
\ No newline at end of file
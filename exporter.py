@@ -0,0 +1,304 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sqlite3
+import sys
+import zipfile
+from contextlib import contextmanager
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# One query per dataset, in primary-key order so rows stream without a sort
+EXPORT_QUERIES = {
+    'users': """
+        SELECT user_id, username, role, email, full_name, created_at
+        FROM users ORDER BY user_id
+    """,
+    'students': """
+        SELECT s.*, u.username, u.email, u.full_name
+        FROM students s JOIN users u ON s.user_id = u.user_id
+        ORDER BY s.student_id
+    """,
+    'teachers': """
+        SELECT t.*, u.username, u.email, u.full_name
+        FROM teachers t JOIN users u ON t.user_id = u.user_id
+        ORDER BY t.teacher_id
+    """,
+    'courses': """
+        SELECT c.*, u.full_name as teacher_name
+        FROM courses c
+        LEFT JOIN teachers t ON c.teacher_id = t.teacher_id
+        LEFT JOIN users u ON t.user_id = u.user_id
+        ORDER BY c.course_id
+    """,
+    'enrollments': """
+        SELECT e.enrollment_id, e.student_id, s.roll_number, e.course_id, c.course_code,
+               e.enrollment_date, e.status, e.grade, e.marks, e.attendance_percentage,
+               e.present_count, e.total_count
+        FROM enrollments e
+        JOIN students s ON e.student_id = s.student_id
+        JOIN courses c ON e.course_id = c.course_id
+        ORDER BY e.enrollment_id
+    """,
+    'attendance': """
+        SELECT a.attendance_id, a.student_id, s.roll_number, a.course_id, c.course_code,
+               a.date, a.status, a.remarks
+        FROM attendance a
+        JOIN students s ON a.student_id = s.student_id
+        JOIN courses c ON a.course_id = c.course_id
+        ORDER BY a.attendance_id
+    """,
+    'grades': """
+        SELECT g.grade_id, g.student_id, s.roll_number, g.assignment_id, a.title as assignment_title,
+               c.course_code, g.marks_obtained, a.total_marks, a.weightage, g.remarks, g.graded_at
+        FROM grades g
+        JOIN students s ON g.student_id = s.student_id
+        JOIN assignments a ON g.assignment_id = a.assignment_id
+        JOIN courses c ON a.course_id = c.course_id
+        ORDER BY g.grade_id
+    """,
+    'submissions': """
+        SELECT sub.submission_id, sub.assignment_id, a.title as assignment_title, sub.student_id,
+               s.roll_number, sub.submission_file, sub.file_hash, sub.file_size, sub.submission_text, sub.submission_date,
+               sub.status, sub.marks_obtained, sub.feedback, sub.graded_by, sub.graded_at
+        FROM assignment_submissions sub
+        JOIN students s ON sub.student_id = s.student_id
+        JOIN assignments a ON sub.assignment_id = a.assignment_id
+        ORDER BY sub.submission_id
+    """,
+}
+
+# format -> (file extension, mime type)
+EXPORT_FORMATS = {
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+}
+if PARQUET_AVAILABLE:
+    EXPORT_FORMATS['parquet'] = ('.parquet', 'application/vnd.apache.parquet')
+
+class DataExporter:
+    """Streams datasets from a cursor, chunk_size rows at a time, into file objects
+
+    Everything written inside one snapshot() block comes from the same
+    read transaction, so a multi-dataset export is consistent even while
+    other sessions keep writing.
+    """
+
+    def __init__(self, db, chunk_size=5000):
+        self.db = db
+        self.chunk_size = max(1, int(chunk_size))
+
+    @contextmanager
+    def snapshot(self):
+        """Hold one read transaction; the first query pins the WAL snapshot"""
+        with self.db.pool.reader() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            yield conn
+
+    def iter_chunks(self, conn, dataset):
+        """Yield (columns, rows) chunks of a dataset"""
+        if dataset == 'attendance' and self.db.attendance_store is not None:
+            yield from self._stored_attendance_chunks(conn)
+            return
+        cursor = conn.cursor()
+        # Plain tuples; no per-row dict or Row objects
+        cursor.row_factory = None
+        try:
+            cursor.execute(EXPORT_QUERIES[dataset])
+            columns = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                yield columns, rows
+        finally:
+            cursor.close()
+
+    def _stored_attendance_chunks(self, conn):
+        """The attendance dataset decoded from the bitmap store, in its columns"""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        roll_numbers = dict(cursor.execute("SELECT student_id, roll_number FROM students").fetchall())
+        course_codes = dict(cursor.execute("SELECT course_id, course_code FROM courses").fetchall())
+        cursor.close()
+        columns = ['attendance_id', 'student_id', 'roll_number', 'course_id', 'course_code',
+                   'date', 'status', 'remarks']
+        # A bitmap holds up to a term of days
+        for frame in self.db.attendance_store.iter_rows(conn, max(1, self.chunk_size // 100)):
+            frame = frame.assign(
+                attendance_id=None,
+                roll_number=frame['student_id'].map(roll_numbers),
+                course_code=frame['course_id'].map(course_codes),
+            )
+            # Same filter as the table query's inner joins
+            frame = frame[frame['roll_number'].notna() & frame['course_code'].notna()]
+            if not frame.empty:
+                yield columns, list(frame[columns].astype(object).itertuples(index=False, name=None))
+
+    def write(self, conn, dataset, fmt, fileobj):
+        """Write one dataset to a binary file object; returns the row count"""
+        if fmt == 'csv.gz':
+            return self._write_csv_gz(conn, dataset, fileobj)
+        if fmt == 'jsonl':
+            return self._write_jsonl(conn, dataset, fileobj)
+        if fmt == 'parquet' and PARQUET_AVAILABLE:
+            return self._write_parquet(conn, dataset, fileobj)
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    def _write_csv_gz(self, conn, dataset, fileobj):
+        count = 0
+        with gzip.GzipFile(fileobj=fileobj, mode='wb') as gz:
+            text = io.TextIOWrapper(gz, encoding='utf-8', newline='')
+            writer = csv.writer(text)
+            header_written = False
+            for columns, rows in self.iter_chunks(conn, dataset):
+                if not header_written:
+                    writer.writerow(columns)
+                    header_written = True
+                writer.writerows(rows)
+                count += len(rows)
+            if not header_written:
+                cursor = conn.execute(EXPORT_QUERIES[dataset] + " LIMIT 0")
+                writer.writerow([column[0] for column in cursor.description])
+            text.flush()
+            text.detach()
+        return count
+
+    def _write_jsonl(self, conn, dataset, fileobj):
+        count = 0
+        for columns, rows in self.iter_chunks(conn, dataset):
+            lines = [json.dumps(dict(zip(columns, row)), default=str) for row in rows]
+            fileobj.write(("\n".join(lines) + "\n").encode('utf-8'))
+            count += len(rows)
+        return count
+
+    def declared_types(self, dataset):
+        """Declared SQLite type of each column of a dataset ('' for expressions)
+
+        A view keeps the declared types of the columns it selects, but the
+        pool's readers are query_only; the view is made on a scratch
+        connection with the database attached read-only.
+        """
+        scratch = sqlite3.connect("file::memory:", uri=True)
+        try:
+            scratch.execute("ATTACH DATABASE ? AS source",
+                            (f"file:{quote(os.path.abspath(self.db.pool.db_path))}?mode=ro",))
+            scratch.execute(f"CREATE TEMP VIEW export AS {EXPORT_QUERIES[dataset]}")
+            return {row[1]: row[2] for row in scratch.execute("PRAGMA temp.table_info(export)")}
+        finally:
+            scratch.close()
+
+    @staticmethod
+    def _arrow_type(declared):
+        """Arrow type for a declared column type, by SQLite's affinity rules (None: infer)"""
+        declared = (declared or '').upper()
+        if not declared:
+            return None
+        if 'INT' in declared or 'BOOL' in declared:
+            return pa.int64()
+        if any(name in declared for name in ('CHAR', 'CLOB', 'TEXT', 'DATE', 'TIME')):
+            return pa.string()
+        if 'BLOB' in declared:
+            return pa.binary()
+        return pa.float64()
+
+    def _write_parquet(self, conn, dataset, fileobj):
+        count = 0
+        writer = None
+        types = {name: self._arrow_type(declared) for name, declared in self.declared_types(dataset).items()}
+        schema = None
+        try:
+            for columns, rows in self.iter_chunks(conn, dataset):
+                batch = self._chunk_table(dataset, columns, rows)
+                if writer is None:
+                    # Declared types; expression columns take the first chunk's, text if all NULL
+                    schema = pa.schema([
+                        pa.field(f.name, types.get(f.name)
+                                 or (pa.string() if pa.types.is_null(f.type) else f.type))
+                        for f in batch.schema
+                    ])
+                    writer = pq.ParquetWriter(fileobj, schema, compression='snappy')
+                # One row group per chunk; a value that does not fit its column raises
+                writer.write_table(self._cast_chunk(dataset, batch, schema))
+                count += len(rows)
+            if writer is None:
+                cursor = conn.execute(EXPORT_QUERIES[dataset] + " LIMIT 0")
+                empty = pa.schema([pa.field(c[0], types.get(c[0]) or pa.string()) for c in cursor.description])
+                pq.write_table(empty.empty_table(), fileobj)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    @staticmethod
+    def _chunk_table(dataset, columns, rows):
+        """A chunk of rows as an Arrow table with inferred types; names a column whose values mix types"""
+        arrays = {}
+        for name, values in zip(columns, zip(*rows)):
+            try:
+                arrays[name] = pa.array(values)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Cannot export {dataset}.{name}: {e}") from e
+        return pa.Table.from_pydict(arrays)
+
+    @staticmethod
+    def _cast_chunk(dataset, batch, schema):
+        """A chunk cast to the file's schema; names the dataset and column of a value that does not fit
+
+        The schema is fixed once the first row group is written, so a
+        column cannot fall back to another type part-way through the file.
+        """
+        try:
+            return batch.cast(schema, safe=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            for field in schema:
+                try:
+                    batch.column(field.name).cast(field.type, safe=True)
+                except (pa.ArrowInvalid, pa.ArrowTypeError) as column_error:
+                    raise ValueError(f"Cannot export {dataset}.{field.name} as {field.type}: {column_error}") from e
+            raise
+
+    def export_bundle(self, datasets, fmt, fileobj):
+        """Write several datasets from one snapshot into a zip; returns {dataset: rows}"""
+        extension = EXPORT_FORMATS[fmt][0]
+        counts = {}
+        with self.snapshot() as conn, zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_STORED) as bundle:
+            for dataset in datasets:
+                info = zipfile.ZipInfo(dataset + extension)
+                # Members are already compressed (gzip/parquet) except JSON Lines
+                info.compress_type = zipfile.ZIP_DEFLATED if fmt == 'jsonl' else zipfile.ZIP_STORED
+                with bundle.open(info, 'w', force_zip64=True) as member:
+                    counts[dataset] = self.write(conn, dataset, fmt, member)
+        return counts
+
+    def export_to_directory(self, datasets, fmt, directory):
+        """Write each dataset to its own file from one snapshot; returns {path: rows}"""
+        os.makedirs(directory, exist_ok=True)
+        extension = EXPORT_FORMATS[fmt][0]
+        written = {}
+        with self.snapshot() as conn:
+            for dataset in datasets:
+                path = os.path.join(directory, dataset + extension)
+                with open(path, 'wb') as f:
+                    written[path] = self.write(conn, dataset, fmt, f)
+        return written
+
+if __name__ == "__main__":
+    from database import Database
+    fmt = sys.argv[1] if len(sys.argv) > 1 else 'csv.gz'
+    directory = sys.argv[2] if len(sys.argv) > 2 else 'exports'
+    if fmt not in EXPORT_FORMATS:
+        print(f"Usage: python exporter.py [{'|'.join(EXPORT_FORMATS)}] [directory]")
+        sys.exit(1)
+    written = DataExporter(Database()).export_to_directory(list(EXPORT_QUERIES), fmt, directory)
+    for path, rows in written.items():
+        print(f"✅ {path}: {rows} rows")
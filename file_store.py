@@ -0,0 +1,319 @@
+import csv
+import hashlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from config import StorageConfig
+
+MANIFEST_COLUMNS = ['roll_number', 'student_name', 'class_name', 'section', 'submission_date',
+                    'file_name', 'file_size', 'file_hash', 'file_member', 'text_member']
+
+def _member_name(name):
+    """A file name safe to use as a flat ZIP member name"""
+    name = os.path.basename(str(name).replace("\\", "/"))
+    return "".join(c if c.isalnum() or c in "._- " else "_" for c in name) or "file"
+
+def _zip_time(timestamp):
+    """ZIP date_time tuple for a SQLite timestamp (1980-01-01 when missing)"""
+    try:
+        return datetime.fromisoformat(str(timestamp)).timetuple()[:6]
+    except ValueError:
+        return (1980, 1, 1, 0, 0, 0)
+
+def format_size(size):
+    """Human-readable byte count"""
+    if size is None:
+        return "unknown size"
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+class SubmissionFileStore:
+    """Content-addressed store for submission files
+
+    A file lives at <root>/<h[0:2]>/<h[2:4]>/<h>, where h is the SHA-256
+    of its contents, so no directory holds more than a few hundred
+    entries. Uploads are copied in chunks into a temp file while being
+    hashed, then renamed into place; identical uploads are stored once.
+    assignment_submissions records the hash and size; gc() removes blobs
+    no submission (live or archived) refers to any more.
+    """
+
+    def __init__(self, db, root=StorageConfig.ROOT, chunk_size=StorageConfig.CHUNK_SIZE):
+        self.db = db
+        self.root = root
+        self.chunk_size = max(1, int(chunk_size))
+        # Same filesystem as the blobs so the final rename is atomic
+        self.tmp_dir = os.path.join(root, "tmp")
+        # Cached per-assignment ZIPs; not blobs, so gc() leaves them alone
+        self.bundle_dir = os.path.join(root, "bundles")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        os.makedirs(self.bundle_dir, exist_ok=True)
+
+    def path(self, file_hash):
+        """Where the blob with this hash is (or would be) stored"""
+        return os.path.join(self.root, file_hash[:2], file_hash[2:4], file_hash)
+
+    def exists(self, file_hash):
+        return bool(file_hash) and os.path.exists(self.path(file_hash))
+
+    def submission_path(self, submission, legacy_dir="assignments"):
+        """Path of a submission row's file: its blob, or its name in the pre-store layout"""
+        if submission.get('file_hash'):
+            return self.path(submission['file_hash'])
+        return os.path.join(legacy_dir, f"{submission['roll_number']}_{submission['assignment_id']}_{submission['submission_file']}")
+
+    def put(self, source):
+        """Store the contents of a binary file object; returns (hash, size)"""
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = source.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+
+            file_hash = digest.hexdigest()
+            target = self.path(file_hash)
+            if os.path.exists(target):
+                # Duplicate content: keep the stored copy, refresh its age for gc()
+                os.utime(target)
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+            return file_hash, size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_path(self, path):
+        """Store a file from disk; returns (hash, size)"""
+        with open(path, "rb") as source:
+            return self.put(source)
+
+    def download(self, path):
+        """Zero-argument callable for st.download_button's deferred data
+
+        Nothing is read when the page renders. On click it returns the
+        file's bytes, read under a with block so the descriptor is closed
+        before Streamlit serves them; this Streamlit version reads deferred
+        data whole anyway and has no streaming downloads.
+        """
+        def read():
+            with open(path, "rb") as f:
+                return f.read()
+        return read
+
+    def bundle(self, assignment_id, submissions=None, keep_seconds=StorageConfig.GC_GRACE_SECONDS):
+        """ZIP of every submission of an assignment; returns its path
+
+        Members are <roll>_<file name> for uploads, <roll>.txt for text
+        answers and manifest.csv. The archive is written member by member,
+        each file copied in chunks, into a temp file on disk. It is kept
+        under a key derived from the submission ids and dates, so the same
+        set of submissions is zipped once and a new submission builds a
+        fresh archive. Superseded archives are only removed after
+        keep_seconds without use, so a session still sending one keeps it.
+        """
+        if submissions is None:
+            submissions = self.db.get_assignment_submissions(assignment_id)
+        key = hashlib.sha256(repr(sorted(
+            (s['submission_id'], s['submission_date']) for s in submissions
+        )).encode()).hexdigest()[:16]
+        prefix = f"assignment_{assignment_id}_"
+        path = os.path.join(self.bundle_dir, f"{prefix}{key}.zip")
+        if os.path.exists(path):
+            # Being served again: restart its keep_seconds
+            os.utime(path)
+        else:
+            self._write_bundle(path, submissions)
+
+        # Archives of earlier submission sets are superseded
+        cutoff = time.time() - keep_seconds
+        for name in os.listdir(self.bundle_dir):
+            old_path = os.path.join(self.bundle_dir, name)
+            if name.startswith(prefix) and old_path != path:
+                try:
+                    if os.path.getmtime(old_path) < cutoff:
+                        os.remove(old_path)
+                except FileNotFoundError:
+                    pass  # pruned by a concurrent call
+        return path
+
+    def _write_bundle(self, path, submissions):
+        """Write the ZIP of submissions to path through a temp file"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as out, zipfile.ZipFile(out, "w") as archive:
+                manifest = []
+                for submission in sorted(submissions, key=lambda s: s['roll_number']):
+                    roll = _member_name(submission['roll_number'])
+                    stamp = _zip_time(submission.get('submission_date'))
+                    entry = {
+                        'roll_number': submission['roll_number'],
+                        'student_name': submission.get('student_name'),
+                        'class_name': submission.get('class_name'),
+                        'section': submission.get('section'),
+                        'submission_date': submission.get('submission_date'),
+                        'file_name': submission.get('submission_file') or "",
+                        'file_size': submission.get('file_size'),
+                        'file_hash': submission.get('file_hash'),
+                        'file_member': "",
+                        'text_member': "",
+                    }
+                    if submission.get('submission_text'):
+                        entry['text_member'] = f"{roll}.txt"
+                        info = zipfile.ZipInfo(entry['text_member'], date_time=stamp)
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        archive.writestr(info, submission['submission_text'].encode("utf-8"))
+                    if submission.get('submission_file'):
+                        source = self.submission_path(submission)
+                        if os.path.exists(source):
+                            entry['file_member'] = f"{roll}_{_member_name(submission['submission_file'])}"
+                            if entry['file_size'] is None:
+                                entry['file_size'] = os.path.getsize(source)
+                            info = zipfile.ZipInfo(entry['file_member'], date_time=stamp)
+                            # Uploads (PDF, DOCX, images, archives) are mostly compressed already
+                            info.compress_type = zipfile.ZIP_STORED
+                            with open(source, "rb") as blob, archive.open(info, "w", force_zip64=True) as member:
+                                shutil.copyfileobj(blob, member, self.chunk_size)
+                        else:
+                            entry['file_member'] = "(missing)"
+                    manifest.append(entry)
+
+                text = io.StringIO()
+                writer = csv.DictWriter(text, fieldnames=list(MANIFEST_COLUMNS))
+                writer.writeheader()
+                writer.writerows(manifest)
+                info = zipfile.ZipInfo("manifest.csv", date_time=time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, text.getvalue().encode("utf-8"))
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read_bundle(self, assignment_id, submissions=None):
+        """The assignment's ZIP as bytes, for st.download_button
+
+        Rebuilt once if another session pruned it between bundle() and
+        open(); once open, the read finishes even if the file is removed.
+        """
+        try:
+            f = open(self.bundle(assignment_id, submissions), "rb")
+        except FileNotFoundError:
+            f = open(self.bundle(assignment_id, submissions), "rb")
+        with f:
+            return f.read()
+
+    def _referenced(self):
+        """Hashes referenced by live or archived submissions"""
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT file_hash FROM assignment_submissions WHERE file_hash IS NOT NULL")
+            hashes = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+        if self.db.get_term_archives():
+            from archive import TermArchiver
+            archived = TermArchiver(self.db).read_frame(
+                "SELECT DISTINCT file_hash FROM archived_assignment_submissions WHERE file_hash IS NOT NULL")
+            hashes.update(archived['file_hash'])
+        return hashes
+
+    def gc(self, grace_seconds=StorageConfig.GC_GRACE_SECONDS, dry_run=False):
+        """Delete unreferenced blobs and abandoned temp files older than grace_seconds
+
+        The grace period covers uploads stored but not yet recorded in
+        assignment_submissions. Returns (files removed, bytes freed).
+        """
+        referenced = self._referenced()
+        cutoff = time.time() - grace_seconds
+        removed = freed = 0
+        for directory, subdirs, names in os.walk(self.root):
+            subdirs[:] = [d for d in subdirs
+                          if os.path.abspath(os.path.join(directory, d)) != os.path.abspath(self.bundle_dir)]
+            in_tmp = os.path.abspath(directory) == os.path.abspath(self.tmp_dir)
+            for name in names:
+                if not in_tmp and name in referenced:
+                    continue
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                if not dry_run:
+                    os.remove(path)
+                removed += 1
+                freed += stat.st_size
+        return removed, freed
+
+    def import_legacy(self, legacy_dir="assignments"):
+        """Copy files saved as <legacy_dir>/<roll>_<assignment_id>_<name> into the store
+
+        Returns the number of submissions updated; the legacy files are left in place.
+        """
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT sub.submission_id, sub.assignment_id, sub.submission_file, s.roll_number
+                FROM assignment_submissions sub
+                JOIN students s ON sub.student_id = s.student_id
+                WHERE sub.file_hash IS NULL AND COALESCE(sub.submission_file, '') != ''
+            """)
+            rows = [dict(row) for row in cursor.fetchall()]
+            cursor.close()
+
+        updates = []
+        for row in rows:
+            prefix = f"{row['roll_number']}_{row['assignment_id']}_"
+            # submission_file held either the whole legacy name or just the upload name
+            for name in (row['submission_file'], prefix + row['submission_file']):
+                legacy_path = os.path.join(legacy_dir, name)
+                if os.path.isfile(legacy_path):
+                    file_hash, size = self.put_path(legacy_path)
+                    display_name = name[len(prefix):] if name.startswith(prefix) else name
+                    updates.append((file_hash, size, display_name, row['submission_id']))
+                    break
+        if updates:
+            with self.db.pool.writer() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    """
+                    UPDATE assignment_submissions SET file_hash = ?, file_size = ?, submission_file = ?
+                    WHERE submission_id = ?
+                    """,
+                    updates
+                )
+                conn.commit()
+                cursor.close()
+        return len(updates)
+
+if __name__ == "__main__":
+    from database import Database
+    if len(sys.argv) < 2 or sys.argv[1] not in ('gc', 'import'):
+        print("Usage: python file_store.py gc [--dry-run] | import [legacy_dir]")
+        sys.exit(1)
+    store = SubmissionFileStore(Database())
+    if sys.argv[1] == 'import':
+        count = store.import_legacy(sys.argv[2] if len(sys.argv) > 2 else "assignments")
+        print(f"✅ Copied {count} submission files into {store.root}")
+    else:
+        dry_run = '--dry-run' in sys.argv
+        removed, freed = store.gc(dry_run=dry_run)
+        print(f"{'🔎 Would remove' if dry_run else '🗑️ Removed'} {removed} files ({freed / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,123 @@
+import inspect
+import sqlite3
+import sys
+from database import Database
+
+# One representative id per parameter name, used to call every getter
+SAMPLE_ID_QUERIES = {
+    'user_id': "SELECT MIN(user_id) FROM users",
+    'student_id': "SELECT MIN(student_id) FROM students",
+    'teacher_id': "SELECT MIN(teacher_id) FROM teachers",
+    'course_id': "SELECT MIN(course_id) FROM courses",
+    'assignment_id': "SELECT MIN(assignment_id) FROM assignments",
+    'submission_id': "SELECT MIN(submission_id) FROM assignment_submissions",
+}
+
+class IndexAdvisor:
+    """Runs EXPLAIN QUERY PLAN over every read query issued by Database"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def sample_arguments(self):
+        """Pick an existing id for each known parameter name (1 when the table is empty)"""
+        samples = {}
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            for name, query in SAMPLE_ID_QUERIES.items():
+                cursor.execute(query)
+                value = cursor.fetchone()[0]
+                samples[name] = value if value is not None else 1
+            cursor.close()
+        return samples
+
+    def getter_methods(self):
+        """All public read methods on Database"""
+        return [
+            (name, method) for name, method in inspect.getmembers(self.db, inspect.ismethod)
+            if name.startswith('get_')
+        ]
+
+    def capture_queries(self):
+        """Call each getter once and record the SQL it executes"""
+        samples = self.sample_arguments()
+        captured = []
+        skipped = []
+        statements = []
+
+        self.db.pool.set_trace_callback(statements.append)
+        # Cache hits run no SQL, so read straight through the result cache
+        with self.db.uncached():
+            try:
+                for name, method in self.getter_methods():
+                    kwargs = {}
+                    missing = []
+                    for param in inspect.signature(method).parameters.values():
+                        if param.name in samples:
+                            kwargs[param.name] = samples[param.name]
+                        elif param.default is inspect.Parameter.empty:
+                            missing.append(param.name)
+                    if missing:
+                        skipped.append((name, f"no sample value for {', '.join(missing)}"))
+                        continue
+
+                    statements.clear()
+                    method(**kwargs)
+                    for sql in statements:
+                        if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                            captured.append((name, sql))
+            finally:
+                self.db.pool.set_trace_callback(None)
+        return captured, skipped
+
+    def explain(self, sql):
+        """Return the EXPLAIN QUERY PLAN detail lines for a statement"""
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+            plan = [row['detail'] for row in cursor.fetchall()]
+            cursor.close()
+        return plan
+
+    @staticmethod
+    def is_full_scan(detail):
+        """A SCAN step that is not driven by an index reads the whole table"""
+        return detail.startswith('SCAN') and 'INDEX' not in detail
+
+    def analyze(self):
+        """Explain every captured query and flag full scans and temp B-trees"""
+        captured, skipped = self.capture_queries()
+        findings = []
+        for method, sql in captured:
+            try:
+                plan = self.explain(sql)
+            except sqlite3.Error as e:
+                skipped.append((method, f"could not explain: {e}"))
+                continue
+            findings.append({
+                'method': method,
+                'full_scans': [d for d in plan if self.is_full_scan(d)],
+                'temp_btrees': [d for d in plan if 'TEMP B-TREE' in d],
+                'plan': plan,
+                'query': ' '.join(sql.split()),
+            })
+        return findings, skipped
+
+def print_report(findings, skipped):
+    """Print the advisor report to stdout"""
+    flagged = [f for f in findings if f['full_scans'] or f['temp_btrees']]
+    print(f"🔍 Explained {len(findings)} queries, {len(flagged)} with scans or temp B-trees\n")
+    for finding in findings:
+        marker = "⚠️ " if finding in flagged else "✅"
+        print(f"{marker} {finding['method']}")
+        for detail in finding['plan']:
+            print(f"     {detail}")
+    if skipped:
+        print("\nSkipped:")
+        for method, reason in skipped:
+            print(f"   {method}: {reason}")
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "student_management.db"
+    advisor = IndexAdvisor(Database(db_path))
+    print_report(*advisor.analyze())
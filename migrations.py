@@ -0,0 +1,687 @@
+import bcrypt
+
+# Ordered schema migrations. Each entry is (version, description, steps) where a
+# step is either a SQL string or a callable taking a cursor. Append new entries;
+# never edit one that has already shipped.
+
+def _seed_default_admin(cursor):
+    """Create the default admin account if it does not exist yet"""
+    cursor.execute("SELECT 1 FROM users WHERE username = 'admin'")
+    if not cursor.fetchone():
+        hashed_password = bcrypt.hashpw("admin123".encode(), bcrypt.gensalt()).decode()
+        cursor.execute(
+            "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
+            ('admin', hashed_password, 'admin', 'admin@sms.com', 'System Administrator')
+        )
+
+def _grade_delta_sql(row, sign):
+    """UPDATE applying (sign=+1) or removing (sign=-1) one grade's weighted contribution"""
+    return f'''
+            UPDATE enrollments SET
+                weighted_score_sum = weighted_score_sum {'+' if sign > 0 else '-'} COALESCE((
+                    SELECT {row}.marks_obtained * a.weightage / a.total_marks
+                    FROM assignments a
+                    WHERE a.assignment_id = {row}.assignment_id AND a.total_marks > 0
+                ), 0),
+                weight_sum = weight_sum {'+' if sign > 0 else '-'} COALESCE((
+                    SELECT a.weightage
+                    FROM assignments a
+                    WHERE a.assignment_id = {row}.assignment_id AND a.total_marks > 0
+                ), 0)
+            WHERE student_id = {row}.student_id
+              AND course_id = (SELECT course_id FROM assignments WHERE assignment_id = {row}.assignment_id);'''
+
+def _refresh_marks_sql(student_filter, course_filter):
+    """UPDATE deriving enrollments.marks from the weighted running sums"""
+    return f'''
+            UPDATE enrollments SET marks = 
+                CASE WHEN weight_sum > 0 THEN ROUND(weighted_score_sum * 100.0 / weight_sum, 2) ELSE 0 END
+            WHERE {student_filter} AND {course_filter};'''
+
+def _mark_courses_dirty_sql(select):
+    """INSERT recording the course ids produced by select in analytics_dirty
+    
+    Not INSERT OR IGNORE: inside a trigger fired by an upsert, the outer
+    statement's conflict handling replaces the trigger's, so duplicates
+    are filtered explicitly.
+    """
+    return f'''
+            INSERT INTO analytics_dirty (course_id)
+            SELECT DISTINCT course_id FROM ({select})
+            WHERE course_id IS NOT NULL AND course_id NOT IN (SELECT course_id FROM analytics_dirty);'''
+
+def _invalidate_transcripts_sql(student_filter):
+    """DELETEs dropping the cached transcript rows of the students matched by student_filter"""
+    return f'''
+            DELETE FROM transcript_summary WHERE {student_filter};
+            DELETE FROM transcript_semesters WHERE {student_filter};'''
+
+MIGRATIONS = [
+    (1, "initial schema", [
+        # Users table WITHOUT is_active column
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            full_name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS students (
+            student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE,
+            roll_number TEXT UNIQUE NOT NULL,
+            class_name TEXT NOT NULL,
+            section TEXT NOT NULL,
+            dob TEXT,
+            phone TEXT,
+            address TEXT,
+            guardian_name TEXT,
+            guardian_phone TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS teachers (
+            teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE,
+            employee_id TEXT UNIQUE NOT NULL,
+            department TEXT,
+            qualification TEXT,
+            specialization TEXT,
+            experience INTEGER DEFAULT 0,
+            phone TEXT,
+            address TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS courses (
+            course_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_code TEXT UNIQUE NOT NULL,
+            course_name TEXT NOT NULL,
+            description TEXT,
+            credits INTEGER DEFAULT 3,
+            department TEXT,
+            semester INTEGER,
+            max_students INTEGER DEFAULT 50,
+            teacher_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE SET NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS enrollments (
+            enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            enrollment_date TEXT DEFAULT CURRENT_DATE,
+            status TEXT DEFAULT 'enrolled',
+            grade TEXT,
+            marks REAL DEFAULT 0,
+            attendance_percentage REAL DEFAULT 0,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
+            UNIQUE(student_id, course_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS attendance (
+            attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            status TEXT DEFAULT 'absent',
+            remarks TEXT,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
+            UNIQUE(student_id, course_id, date)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS assignments (
+            assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_id INTEGER NOT NULL,
+            teacher_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            total_marks REAL NOT NULL,
+            weightage REAL DEFAULT 100,
+            due_date TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
+            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS grades (
+            grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            student_id INTEGER NOT NULL,
+            assignment_id INTEGER NOT NULL,
+            marks_obtained REAL DEFAULT 0,
+            remarks TEXT,
+            graded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id) ON DELETE CASCADE,
+            UNIQUE(student_id, assignment_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS assignment_submissions (
+            submission_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assignment_id INTEGER NOT NULL,
+            student_id INTEGER NOT NULL,
+            submission_file TEXT,
+            submission_text TEXT,
+            submission_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'submitted',
+            marks_obtained REAL,
+            feedback TEXT,
+            graded_by INTEGER,
+            graded_at TIMESTAMP,
+            FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id) ON DELETE CASCADE,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (graded_by) REFERENCES teachers(teacher_id) ON DELETE SET NULL,
+            UNIQUE(assignment_id, student_id)
+        )
+        ''',
+    ]),
+    (2, "default admin user", [
+        _seed_default_admin,
+    ]),
+    (3, "secondary indexes for hot join and filter paths", [
+        # Course rosters and teacher lookups
+        "CREATE INDEX IF NOT EXISTS idx_enrollments_course_status ON enrollments(course_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_courses_teacher ON courses(teacher_id)",
+        # Assignment lists are filtered by course and ordered by due date
+        "CREATE INDEX IF NOT EXISTS idx_assignments_course_due ON assignments(course_id, due_date)",
+        "CREATE INDEX IF NOT EXISTS idx_assignments_teacher ON assignments(teacher_id)",
+        # UNIQUE(student_id, assignment_id) only serves student-first lookups
+        "CREATE INDEX IF NOT EXISTS idx_grades_assignment ON grades(assignment_id)",
+        "CREATE INDEX IF NOT EXISTS idx_submissions_student ON assignment_submissions(student_id)",
+        # Per-course daily rosters; UNIQUE(student_id, course_id, date) covers student lookups
+        "CREATE INDEX IF NOT EXISTS idx_attendance_course_date ON attendance(course_id, date)",
+        # Match the ORDER BY of the list pages so they read in index order
+        "CREATE INDEX IF NOT EXISTS idx_students_class_section_roll ON students(class_name, section, roll_number)",
+        "CREATE INDEX IF NOT EXISTS idx_teachers_department_employee ON teachers(department, employee_id)",
+        "CREATE INDEX IF NOT EXISTS idx_users_role_username ON users(role, username)",
+        "CREATE INDEX IF NOT EXISTS idx_courses_department_semester_code ON courses(department, semester, course_code)",
+    ]),
+    (4, "incremental attendance counters on enrollments", [
+        "ALTER TABLE enrollments ADD COLUMN present_count INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE enrollments ADD COLUMN total_count INTEGER NOT NULL DEFAULT 0",
+        # Backfill from existing attendance once
+        '''
+        UPDATE enrollments SET
+            present_count = (
+                SELECT COUNT(CASE WHEN a.status IN ('present', 'late') THEN 1 END)
+                FROM attendance a
+                WHERE a.student_id = enrollments.student_id AND a.course_id = enrollments.course_id
+            ),
+            total_count = (
+                SELECT COUNT(*)
+                FROM attendance a
+                WHERE a.student_id = enrollments.student_id AND a.course_id = enrollments.course_id
+            )
+        ''',
+        '''
+        UPDATE enrollments SET attendance_percentage = 
+            CASE WHEN total_count > 0 THEN ROUND(present_count * 100.0 / total_count, 2) ELSE 0 END
+        ''',
+        # Apply per-row deltas from now on; UPDATE SET uses the pre-update column values
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_counters_insert
+        AFTER INSERT ON attendance
+        BEGIN
+            UPDATE enrollments SET
+                present_count = present_count + (NEW.status IN ('present', 'late')),
+                total_count = total_count + 1,
+                attendance_percentage = ROUND(
+                    (present_count + (NEW.status IN ('present', 'late'))) * 100.0 / (total_count + 1), 2)
+            WHERE student_id = NEW.student_id AND course_id = NEW.course_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_counters_delete
+        AFTER DELETE ON attendance
+        BEGIN
+            UPDATE enrollments SET
+                present_count = present_count - (OLD.status IN ('present', 'late')),
+                total_count = total_count - 1,
+                attendance_percentage = CASE WHEN total_count - 1 > 0 THEN ROUND(
+                    (present_count - (OLD.status IN ('present', 'late'))) * 100.0 / (total_count - 1), 2)
+                    ELSE 0 END
+            WHERE student_id = OLD.student_id AND course_id = OLD.course_id;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_counters_update
+        AFTER UPDATE OF status, student_id, course_id ON attendance
+        BEGIN
+            UPDATE enrollments SET
+                present_count = present_count - (OLD.status IN ('present', 'late')),
+                total_count = total_count - 1
+            WHERE student_id = OLD.student_id AND course_id = OLD.course_id;
+            UPDATE enrollments SET
+                present_count = present_count + (NEW.status IN ('present', 'late')),
+                total_count = total_count + 1
+            WHERE student_id = NEW.student_id AND course_id = NEW.course_id;
+            UPDATE enrollments SET attendance_percentage = 
+                CASE WHEN total_count > 0 THEN ROUND(present_count * 100.0 / total_count, 2) ELSE 0 END
+            WHERE (student_id = OLD.student_id AND course_id = OLD.course_id)
+               OR (student_id = NEW.student_id AND course_id = NEW.course_id);
+        END
+        ''',
+    ]),
+    (5, "weighted incremental course marks", [
+        "ALTER TABLE enrollments ADD COLUMN weighted_score_sum REAL NOT NULL DEFAULT 0",
+        "ALTER TABLE enrollments ADD COLUMN weight_sum REAL NOT NULL DEFAULT 0",
+        # Backfill sums of weightage * marks / total_marks over each enrollment's grades
+        '''
+        UPDATE enrollments SET
+            weighted_score_sum = COALESCE((
+                SELECT SUM(g.marks_obtained * a.weightage / a.total_marks)
+                FROM grades g
+                JOIN assignments a ON g.assignment_id = a.assignment_id
+                WHERE g.student_id = enrollments.student_id AND a.course_id = enrollments.course_id
+                  AND a.total_marks > 0
+            ), 0),
+            weight_sum = COALESCE((
+                SELECT SUM(a.weightage)
+                FROM grades g
+                JOIN assignments a ON g.assignment_id = a.assignment_id
+                WHERE g.student_id = enrollments.student_id AND a.course_id = enrollments.course_id
+                  AND a.total_marks > 0
+            ), 0)
+        ''',
+        '''
+        UPDATE enrollments SET marks = ROUND(weighted_score_sum * 100.0 / weight_sum, 2)
+        WHERE weight_sum > 0
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_weighted_insert
+        AFTER INSERT ON grades
+        BEGIN{_grade_delta_sql('NEW', +1)}{_refresh_marks_sql(
+            'student_id = NEW.student_id',
+            'course_id = (SELECT course_id FROM assignments WHERE assignment_id = NEW.assignment_id)')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_weighted_delete
+        AFTER DELETE ON grades
+        BEGIN{_grade_delta_sql('OLD', -1)}{_refresh_marks_sql(
+            'student_id = OLD.student_id',
+            'course_id = (SELECT course_id FROM assignments WHERE assignment_id = OLD.assignment_id)')}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_grades_weighted_update
+        AFTER UPDATE OF marks_obtained, student_id, assignment_id ON grades
+        BEGIN{_grade_delta_sql('OLD', -1)}{_grade_delta_sql('NEW', +1)}{_refresh_marks_sql(
+            'student_id IN (OLD.student_id, NEW.student_id)',
+            'course_id IN (SELECT course_id FROM assignments WHERE assignment_id IN (OLD.assignment_id, NEW.assignment_id))')}
+        END
+        ''',
+        # A weight or total change re-scales that assignment's grades for every
+        # student in the course - independent of how many other assignments exist
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_assignments_weight_update
+        AFTER UPDATE OF weightage, total_marks ON assignments
+        BEGIN
+            UPDATE enrollments SET
+                weighted_score_sum = weighted_score_sum + (
+                    SELECT COALESCE(g.marks_obtained, 0) * (
+                        CASE WHEN NEW.total_marks > 0 THEN NEW.weightage / NEW.total_marks ELSE 0 END -
+                        CASE WHEN OLD.total_marks > 0 THEN OLD.weightage / OLD.total_marks ELSE 0 END)
+                    FROM grades g
+                    WHERE g.student_id = enrollments.student_id AND g.assignment_id = NEW.assignment_id
+                ),
+                weight_sum = weight_sum
+                    + CASE WHEN NEW.total_marks > 0 THEN NEW.weightage ELSE 0 END
+                    - CASE WHEN OLD.total_marks > 0 THEN OLD.weightage ELSE 0 END
+            WHERE course_id = NEW.course_id
+              AND student_id IN (SELECT student_id FROM grades WHERE assignment_id = NEW.assignment_id);
+            UPDATE enrollments SET marks = 
+                CASE WHEN weight_sum > 0 THEN ROUND(weighted_score_sum * 100.0 / weight_sum, 2) ELSE 0 END
+            WHERE course_id = NEW.course_id
+              AND student_id IN (SELECT student_id FROM grades WHERE assignment_id = NEW.assignment_id);
+        END
+        ''',
+        # Remove an assignment's grades first so their contributions are subtracted
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_assignments_delete_grades
+        BEFORE DELETE ON assignments
+        BEGIN
+            DELETE FROM grades WHERE assignment_id = OLD.assignment_id;
+        END
+        ''',
+    ]),
+    (6, "keyset pagination indexes", [
+        # Keyset cursors compare row values, so nullable sort columns are
+        # paged through COALESCE expressions; index the same expressions
+        "CREATE INDEX IF NOT EXISTS idx_teachers_page ON teachers(COALESCE(department, ''), employee_id)",
+        "CREATE INDEX IF NOT EXISTS idx_courses_page ON courses(COALESCE(department, ''), COALESCE(semester, -1), course_code)",
+    ]),
+    (7, "entity counter rows for dashboard stats", [
+        '''
+        CREATE TABLE IF NOT EXISTS entity_counts (
+            entity TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        INSERT OR REPLACE INTO entity_counts (entity, total)
+        SELECT 'users', COUNT(*) FROM users
+        UNION ALL SELECT 'students', COUNT(*) FROM students
+        UNION ALL SELECT 'teachers', COUNT(*) FROM teachers
+        UNION ALL SELECT 'courses', COUNT(*) FROM courses
+        ''',
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{table}_count_{event.lower()}
+        AFTER {event} ON {table}
+        BEGIN
+            UPDATE entity_counts SET total = total {'+' if event == 'INSERT' else '-'} 1 WHERE entity = '{table}';
+        END
+        '''
+        for table in ('users', 'students', 'teachers', 'courses')
+        for event in ('INSERT', 'DELETE')
+    ]),
+    (8, "analytics cube with dirty-course tracking", [
+        # One cell per course and class/section, holding additive measures only
+        # so any roll-up is a plain SUM; see analytics.py
+        '''
+        CREATE TABLE IF NOT EXISTS analytics_cube (
+            course_id INTEGER NOT NULL,
+            class_name TEXT NOT NULL,
+            section TEXT NOT NULL,
+            department TEXT,
+            semester INTEGER,
+            enrolled INTEGER NOT NULL DEFAULT 0,
+            graded INTEGER NOT NULL DEFAULT 0,
+            marks_sum REAL NOT NULL DEFAULT 0,
+            present_count INTEGER NOT NULL DEFAULT 0,
+            total_count INTEGER NOT NULL DEFAULT 0,
+            assignments_due INTEGER NOT NULL DEFAULT 0,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (course_id, class_name, section)
+        )
+        ''',
+        # Courses whose cells are out of date; the refresh rebuilds only these
+        '''
+        CREATE TABLE IF NOT EXISTS analytics_dirty (
+            course_id INTEGER PRIMARY KEY
+        )
+        ''',
+        "INSERT OR IGNORE INTO analytics_dirty (course_id) SELECT course_id FROM courses",
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_analytics_{name}
+        AFTER {event} ON {table}
+        BEGIN{_mark_courses_dirty_sql(select)}
+        END
+        '''
+        for name, event, table, select in [
+            # Attendance and grade triggers update the enrollment counters, so
+            # enrollment changes cover marks and attendance as well
+            ('enrollments_insert', 'INSERT', 'enrollments', 'SELECT NEW.course_id AS course_id'),
+            ('enrollments_delete', 'DELETE', 'enrollments', 'SELECT OLD.course_id AS course_id'),
+            ('enrollments_update', 'UPDATE', 'enrollments',
+             'SELECT OLD.course_id AS course_id UNION SELECT NEW.course_id'),
+            ('assignments_insert', 'INSERT', 'assignments', 'SELECT NEW.course_id AS course_id'),
+            ('assignments_delete', 'DELETE', 'assignments', 'SELECT OLD.course_id AS course_id'),
+            ('assignments_update', 'UPDATE OF course_id', 'assignments',
+             'SELECT OLD.course_id AS course_id UNION SELECT NEW.course_id'),
+            # The assignment may already be gone when its submissions cascade
+            ('submissions_insert', 'INSERT', 'assignment_submissions',
+             'SELECT course_id FROM assignments WHERE assignment_id = NEW.assignment_id'),
+            ('submissions_delete', 'DELETE', 'assignment_submissions',
+             'SELECT course_id FROM assignments WHERE assignment_id = OLD.assignment_id'),
+            ('courses_update', 'UPDATE OF department, semester', 'courses', 'SELECT NEW.course_id AS course_id'),
+            ('courses_delete', 'DELETE', 'courses', 'SELECT OLD.course_id AS course_id'),
+            ('students_update', 'UPDATE OF class_name, section', 'students',
+             'SELECT course_id FROM enrollments WHERE student_id = NEW.student_id'),
+        ]
+    ]),
+    (9, "cached transcript GPA rows", [
+        # One row per student that has been computed, even with no graded credits,
+        # so "missing" always means "stale"; see transcript.py
+        '''
+        CREATE TABLE IF NOT EXISTS transcript_summary (
+            student_id INTEGER PRIMARY KEY,
+            courses INTEGER NOT NULL DEFAULT 0,
+            credits REAL NOT NULL DEFAULT 0,
+            quality_points REAL NOT NULL DEFAULT 0,
+            gpa REAL,
+            computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS transcript_semesters (
+            student_id INTEGER NOT NULL,
+            semester INTEGER NOT NULL,
+            courses INTEGER NOT NULL DEFAULT 0,
+            credits REAL NOT NULL DEFAULT 0,
+            quality_points REAL NOT NULL DEFAULT 0,
+            gpa REAL,
+            cumulative_credits REAL NOT NULL DEFAULT 0,
+            cumulative_gpa REAL,
+            PRIMARY KEY (student_id, semester),
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+        )
+        ''',
+    ] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_transcript_{name}
+        AFTER {event} ON {table}
+        BEGIN{_invalidate_transcripts_sql(student_filter)}
+        END
+        '''
+        for name, event, table, student_filter in [
+            # Attendance counter updates touch other columns and leave transcripts alone
+            ('enrollments_insert', 'INSERT', 'enrollments', 'student_id = NEW.student_id'),
+            ('enrollments_delete', 'DELETE', 'enrollments', 'student_id = OLD.student_id'),
+            ('enrollments_update', 'UPDATE OF marks, grade, status, student_id, course_id', 'enrollments',
+             'student_id IN (OLD.student_id, NEW.student_id)'),
+            ('courses_update', 'UPDATE OF credits, semester', 'courses',
+             'student_id IN (SELECT student_id FROM enrollments WHERE course_id = NEW.course_id)'),
+            ('students_delete', 'DELETE', 'students', 'student_id = OLD.student_id'),
+        ]
+    ]),
+    (10, "rolling attendance windows with dirty-pair tracking", [
+        # Window counts per student and course as of one date; see attendance_analytics.py
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_rolling (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            as_of TEXT NOT NULL,
+            present_short INTEGER NOT NULL DEFAULT 0,
+            total_short INTEGER NOT NULL DEFAULT 0,
+            present_long INTEGER NOT NULL DEFAULT 0,
+            total_long INTEGER NOT NULL DEFAULT 0,
+            absent_streak INTEGER NOT NULL DEFAULT 0,
+            last_date TEXT,
+            PRIMARY KEY (student_id, course_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_rolling_dirty (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            PRIMARY KEY (student_id, course_id)
+        )
+        ''',
+        # Window scans across every course read a date range
+        "CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date)",
+        # Existing attendance gets picked up by the first refresh
+        "INSERT OR IGNORE INTO attendance_rolling_dirty (student_id, course_id) SELECT DISTINCT student_id, course_id FROM attendance",
+    ] + [
+        # Explicit NOT EXISTS rather than OR IGNORE, as in _mark_courses_dirty_sql
+        f'''
+        CREATE TRIGGER IF NOT EXISTS trg_attendance_rolling_{event.lower()}
+        AFTER {event} ON attendance
+        BEGIN
+            INSERT INTO attendance_rolling_dirty (student_id, course_id)
+            SELECT {row}.student_id, {row}.course_id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM attendance_rolling_dirty
+                WHERE student_id = {row}.student_id AND course_id = {row}.course_id
+            );
+        END
+        '''
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD'))
+    ]),
+    (11, "compact bitmap attendance store", [
+        # 2 bits per day of a term: 0 unmarked, 1 present, 2 absent, 3 see
+        # attendance_exceptions; see attendance_store.py
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_bitmaps (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            term_start TEXT NOT NULL,
+            bits BLOB NOT NULL,
+            PRIMARY KEY (student_id, course_id, term_start)
+        ) WITHOUT ROWID
+        ''',
+        # Days with another status (late, excused, ...) or with remarks
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_exceptions (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            status TEXT NOT NULL,
+            remarks TEXT,
+            PRIMARY KEY (student_id, course_id, date)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (12, "term archive registry", [
+        # One row per archive file written by archive.py
+        '''
+        CREATE TABLE IF NOT EXISTS term_archives (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            archived_before TEXT NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        # Attendance moved to archives, so counters can still be verified live
+        '''
+        CREATE TABLE IF NOT EXISTS attendance_archived_counts (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            present_count INTEGER NOT NULL DEFAULT 0,
+            total_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, course_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (13, "content-addressed submission files", [
+        # SHA-256 of the stored blob (see file_store.py); submission_file keeps the upload name
+        "ALTER TABLE assignment_submissions ADD COLUMN file_hash TEXT",
+        "ALTER TABLE assignment_submissions ADD COLUMN file_size INTEGER",
+        "CREATE INDEX IF NOT EXISTS idx_submissions_file_hash ON assignment_submissions(file_hash)",
+    ]),
+    (14, "archived grade sums", [
+        # Weighted contributions of grades moved to archives, so grade sums
+        # can still be verified live
+        '''
+        CREATE TABLE IF NOT EXISTS grades_archived_sums (
+            student_id INTEGER NOT NULL,
+            course_id INTEGER NOT NULL,
+            weighted_score_sum REAL NOT NULL DEFAULT 0,
+            weight_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (student_id, course_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS grades_archived_assignments (
+            assignment_id INTEGER PRIMARY KEY,
+            grade_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        # The weight and delete triggers only see live grades; rescaling or
+        # deleting an assignment with archived grades would leave the sums
+        # out of step, so it is refused
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_assignments_archived_weight
+        BEFORE UPDATE OF weightage, total_marks ON assignments
+        WHEN (NEW.weightage IS NOT OLD.weightage OR NEW.total_marks IS NOT OLD.total_marks)
+          AND EXISTS (SELECT 1 FROM grades_archived_assignments WHERE assignment_id = OLD.assignment_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'assignment has archived grades; its weightage and total marks are fixed');
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_assignments_archived_delete
+        BEFORE DELETE ON assignments
+        WHEN EXISTS (SELECT 1 FROM grades_archived_assignments WHERE assignment_id = OLD.assignment_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'assignment has archived grades and cannot be deleted');
+        END
+        ''',
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+ADMIN_SEED_VERSION = 2
+
+def get_schema_version(conn):
+    """Return the highest applied migration version (0 for a fresh database)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if not cursor.fetchone():
+        cursor.close()
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    version = cursor.fetchone()[0]
+    cursor.close()
+    return version
+
+def run_migrations(conn):
+    """Apply pending migrations in order; returns the list of versions applied"""
+    if get_schema_version(conn) >= LATEST_VERSION:
+        return []
+
+    applied = []
+    cursor = conn.cursor()
+    # IMMEDIATE takes the write lock up front so two processes cannot migrate at once
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = cursor.fetchone()[0]
+
+        for version, description, steps in MIGRATIONS:
+            if version <= current:
+                continue
+            for step in steps:
+                if callable(step):
+                    step(cursor)
+                else:
+                    cursor.execute(step)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            applied.append(version)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return applied
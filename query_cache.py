@@ -0,0 +1,128 @@
+import sys
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+def estimate_size(value):
+    """Approximate memory footprint of a cached result in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+def copy_result(value):
+    """Shallow copy so callers can modify results without touching the cache"""
+    if isinstance(value, pd.DataFrame):
+        return value.copy()
+    if isinstance(value, dict):
+        return {k: copy_result(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [copy_result(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(copy_result(v) for v in value)
+    return value
+
+class QueryCache:
+    """LRU cache of read results, bounded by entry count and bytes, invalidated per table"""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()   # key -> (value, tables, size)
+        self._keys_by_table = {}
+        self._bytes = 0
+        # Bumped by every invalidation; results read before a bump are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def get(self, key):
+        """Return (True, copy of value) on a hit, (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[0]
+        return True, copy_result(value)
+
+    def put(self, key, value, tables, generation):
+        """Store a result read while the cache was at the given generation"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        value = copy_result(value)
+        with self._lock:
+            if generation != self._generation:
+                # A write landed while the result was being read; it may be stale
+                return
+            self._remove(key)
+            self._entries[key] = (value, tables, size)
+            self._bytes += size
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        value, tables, size = entry
+        self._bytes -= size
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def invalidate(self, tables=None):
+        """Drop entries that read any of the given tables; None drops everything"""
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if tables is None:
+                self._entries.clear()
+                self._keys_by_table.clear()
+                self._bytes = 0
+                return
+            for table in tables:
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._remove(key)
+
+    def clear(self):
+        """Drop every entry"""
+        self.invalidate(None)
+
+    def stats(self):
+        """Counters for monitoring the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
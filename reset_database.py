@@ -1,156 +1,25 @@
 import os
 import sqlite3
-import bcrypt
+from migrations import run_migrations
 
 def complete_reset():
     print("🔄 Performing complete system reset...")
     
-    # Remove old database file
-    if os.path.exists('student_management.db'):
-        os.remove('student_management.db')
-        print("✅ Old database removed")
+    # Remove old database file, with the WAL and shared-memory files it
+    # leaves behind, so no old pages are replayed into the new database
+    for path in ('student_management.db', 'student_management.db-wal', 'student_management.db-shm'):
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"✅ Removed {path}")
     
     # Create new database
     conn = sqlite3.connect('student_management.db')
-    cursor = conn.cursor()
     
-    # Create all tables
+    # Create all tables and the default admin from the shared migrations
     print("Creating database tables...")
-    
-    # Users table
-    cursor.execute('''
-        CREATE TABLE users (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password TEXT NOT NULL,
-            role TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            full_name TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Students table
-    cursor.execute('''
-        CREATE TABLE students (
-            student_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER UNIQUE,
-            roll_number TEXT UNIQUE NOT NULL,
-            class_name TEXT NOT NULL,
-            section TEXT NOT NULL,
-            dob TEXT,
-            phone TEXT,
-            address TEXT,
-            guardian_name TEXT,
-            guardian_phone TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Teachers table
-    cursor.execute('''
-        CREATE TABLE teachers (
-            teacher_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER UNIQUE,
-            employee_id TEXT UNIQUE NOT NULL,
-            department TEXT,
-            qualification TEXT,
-            specialization TEXT,
-            experience INTEGER DEFAULT 0,
-            phone TEXT,
-            address TEXT,
-            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Courses table
-    cursor.execute('''
-        CREATE TABLE courses (
-            course_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_code TEXT UNIQUE NOT NULL,
-            course_name TEXT NOT NULL,
-            description TEXT,
-            credits INTEGER DEFAULT 3,
-            department TEXT,
-            semester INTEGER,
-            max_students INTEGER DEFAULT 50,
-            teacher_id INTEGER,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE SET NULL
-        )
-    ''')
-    
-    # Enrollments table
-    cursor.execute('''
-        CREATE TABLE enrollments (
-            enrollment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            course_id INTEGER NOT NULL,
-            enrollment_date TEXT DEFAULT CURRENT_DATE,
-            status TEXT DEFAULT 'enrolled',
-            grade TEXT,
-            marks REAL DEFAULT 0,
-            attendance_percentage REAL DEFAULT 0,
-            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-            UNIQUE(student_id, course_id)
-        )
-    ''')
-    
-    # Attendance table
-    cursor.execute('''
-        CREATE TABLE attendance (
-            attendance_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            course_id INTEGER NOT NULL,
-            date TEXT NOT NULL,
-            status TEXT DEFAULT 'absent',
-            remarks TEXT,
-            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-            UNIQUE(student_id, course_id, date)
-        )
-    ''')
-    
-    # Assignments table
-    cursor.execute('''
-        CREATE TABLE assignments (
-            assignment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            course_id INTEGER NOT NULL,
-            teacher_id INTEGER NOT NULL,
-            title TEXT NOT NULL,
-            description TEXT,
-            total_marks REAL NOT NULL,
-            weightage REAL DEFAULT 100,
-            due_date TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
-            FOREIGN KEY (teacher_id) REFERENCES teachers(teacher_id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Grades table
-    cursor.execute('''
-        CREATE TABLE grades (
-            grade_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            student_id INTEGER NOT NULL,
-            assignment_id INTEGER NOT NULL,
-            marks_obtained REAL DEFAULT 0,
-            remarks TEXT,
-            graded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
-            FOREIGN KEY (assignment_id) REFERENCES assignments(assignment_id) ON DELETE CASCADE,
-            UNIQUE(student_id, assignment_id)
-        )
-    ''')
-    
-    # Create default admin
-    print("Creating default admin user...")
-    hashed_password = bcrypt.hashpw("admin123".encode(), bcrypt.gensalt()).decode()
-    cursor.execute(
-        "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
-        ('admin', hashed_password, 'admin', 'admin@sms.com', 'System Administrator')
-    )
+    applied = run_migrations(conn)
+    print(f"✅ Applied schema migrations: {', '.join(str(v) for v in applied)}")
+    cursor = conn.cursor()
     
     # Create sample courses
     print("Creating sample courses...")
@@ -0,0 +1,233 @@
+import sys
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+
+# Worker-side functions; kept at module level so the process pool can pickle them
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+def _check_password(password, hashed):
+    return bcrypt.checkpw(password.encode(), hashed.encode())
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue stays full for longer than the queue timeout"""
+
+class PasswordHasher:
+    """bcrypt on a dedicated, size-limited process pool
+
+    Hashing never runs on the Streamlit script thread, so a login storm is
+    bounded to `workers` cores. At most `max_pending` jobs are queued or
+    running; callers beyond that wait up to `queue_timeout` seconds and then
+    get HasherBusy.
+    """
+
+    def __init__(self, rounds=12, workers=2, max_pending=16, queue_timeout=10.0):
+        self.rounds = int(rounds)
+        self.workers = max(1, int(workers))
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max(self.workers, int(max_pending)))
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self):
+        # Started lazily; spawn because forking the multi-threaded server is unsafe
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _submit(self, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusy("password hashing queue is full")
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """bcrypt hash of password at the configured cost"""
+        return self._submit(_hash_password, password, self.rounds)
+
+    def hash_many(self, passwords):
+        """Hash a batch across all workers, in input order
+
+        A batch never holds more than `workers` queue slots at once, so
+        logins arriving during a bulk import still get through.
+        """
+        batch_slots = threading.Semaphore(self.workers)
+        futures = []
+
+        def release(_future):
+            self._slots.release()
+            batch_slots.release()
+
+        try:
+            for password in passwords:
+                batch_slots.acquire()
+                self._slots.acquire()
+                try:
+                    future = self._get_executor().submit(_hash_password, password, self.rounds)
+                except BaseException:
+                    release(None)
+                    raise
+                future.add_done_callback(release)
+                futures.append(future)
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def verify(self, password, hashed):
+        """True when password matches the stored hash"""
+        return self._submit(_check_password, password, hashed)
+
+    def needs_rehash(self, hashed):
+        """True when a stored hash was made with a different cost factor"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def close(self):
+        """Stop the worker processes"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+class LoginThrottle:
+    """Admission control for logins, keyed by username and client IP
+
+    A username is locked out after max_failures consecutive failures, for
+    lockout_seconds doubling with every further failure (capped at
+    max_lockout_seconds). At most max_inflight attempts per username are
+    verified at once; further concurrent attempts wait up to queue_timeout
+    seconds for a slot. A client IP may be shared by a whole school behind
+    NAT, so it has its own, much higher ip_max_inflight and
+    ip_max_failures. Failures are forgotten once a key has been unlocked
+    and quiet for max_lockout_seconds, so keys tried once by a credential
+    spray do not stay in memory.
+    """
+
+    def __init__(self, max_failures=5, lockout_seconds=30, max_lockout_seconds=900, max_inflight=2,
+                 ip_max_failures=100, ip_max_inflight=32, queue_timeout=10.0):
+        self.max_failures = int(max_failures)
+        self.lockout_seconds = lockout_seconds
+        self.max_lockout_seconds = max_lockout_seconds
+        self.max_inflight = int(max_inflight)
+        self.ip_max_failures = int(ip_max_failures)
+        self.ip_max_inflight = int(ip_max_inflight)
+        self.queue_timeout = queue_timeout
+        self._failures = {}     # key -> (consecutive failures, locked until, last failure)
+        self._inflight = {}
+        self._next_prune = 0
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+
+    @staticmethod
+    def keys_for(username, client_ip=None):
+        keys = [f"user:{(username or '').strip().lower()}"]
+        if client_ip:
+            keys.append(f"ip:{client_ip}")
+        return keys
+
+    def _limits(self, key):
+        """(max in flight, failures before lockout) for a key"""
+        if key.startswith("ip:"):
+            return self.ip_max_inflight, self.ip_max_failures
+        return self.max_inflight, self.max_failures
+
+    def retry_after(self, keys):
+        """Seconds until every key may attempt again (0 when not locked out)"""
+        now = time.monotonic()
+        with self._lock:
+            return max([0] + [
+                self._failures[key][1] - now for key in keys if key in self._failures
+            ])
+
+    def _expired(self, entry, now):
+        _, locked_until, last_failure = entry
+        return now >= max(locked_until, last_failure + self.max_lockout_seconds)
+
+    def _prune(self, now):
+        """Drop expired failure records; runs at most once per lockout_seconds"""
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.lockout_seconds
+        for key in [k for k, entry in self._failures.items() if self._expired(entry, now)]:
+            del self._failures[key]
+
+    def admit(self, keys, timeout=None):
+        """Reserve an in-flight slot for every key, waiting up to timeout (default
+        queue_timeout) for busy keys; False if locked out or still saturated"""
+        deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+        with self._slot_freed:
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if any(key in self._failures and self._failures[key][1] > now for key in keys):
+                    return False
+                if all(self._inflight.get(key, 0) < self._limits(key)[0] for key in keys):
+                    for key in keys:
+                        self._inflight[key] = self._inflight.get(key, 0) + 1
+                    return True
+                if now >= deadline:
+                    return False
+                self._slot_freed.wait(deadline - now)
+
+    def release(self, keys, success):
+        """Free the in-flight slots and record the outcome (None: no outcome, e.g. overload)"""
+        with self._slot_freed:
+            now = time.monotonic()
+            for key in keys:
+                remaining = self._inflight.get(key, 0) - 1
+                if remaining > 0:
+                    self._inflight[key] = remaining
+                else:
+                    self._inflight.pop(key, None)
+
+                if success is None:
+                    continue
+                if success:
+                    self._failures.pop(key, None)
+                    continue
+                max_failures = self._limits(key)[1]
+                entry = self._failures.get(key)
+                count = 1 if entry is None or self._expired(entry, now) else entry[0] + 1
+                locked_until = 0
+                if count >= max_failures:
+                    delay = self.lockout_seconds * 2 ** (count - max_failures)
+                    locked_until = now + min(delay, self.max_lockout_seconds)
+                self._failures[key] = (count, locked_until, now)
+            self._slot_freed.notify_all()
+
+def benchmark(rounds_range=range(10, 15), samples=3):
+    """Average seconds per bcrypt hash for each cost factor on this machine"""
+    results = {}
+    for rounds in rounds_range:
+        start = time.perf_counter()
+        for _ in range(samples):
+            _hash_password("benchmark-password", rounds)
+        results[rounds] = (time.perf_counter() - start) / samples
+    return results
+
+def recommend_rounds(results, target_seconds=0.25):
+    """Highest cost factor whose hash time stays within target_seconds"""
+    within = [rounds for rounds, seconds in results.items() if seconds <= target_seconds]
+    return max(within) if within else min(results)
+
+if __name__ == "__main__":
+    target_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250
+    results = benchmark()
+    print("⏱️ bcrypt cost benchmark (single core)")
+    for rounds, seconds in results.items():
+        print(f"   rounds={rounds}: {seconds * 1000:.0f} ms")
+    print(f"\n✅ Recommended SMS_BCRYPT_ROUNDS for a {target_ms:.0f} ms target: "
+          f"{recommend_rounds(results, target_ms / 1000)}")
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+from migrations import run_migrations, MIGRATIONS
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """A Database on a freshly migrated temp file
+
+    No test creates users through Database.create_user, so the spawn-based
+    PasswordHasher pool never starts and never re-imports this module.
+    """
+    # Database() creates ./assignments
+    monkeypatch.chdir(tmp_path)
+    path = str(tmp_path / "sms.db")
+    conn = sqlite3.connect(path)
+    assert run_migrations(conn) == [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(conn) == []
+    conn.close()
+
+    database = Database(db_path=path)
+    yield database
+    database.hasher.close()
+    database.pool.close()
+
+@pytest.fixture
+def school(db):
+    """One teacher, two courses and three students enrolled in both"""
+    with db.pool.writer() as conn:
+        cursor = conn.cursor()
+        user_ids = []
+        for username, role in [('teacher', 'teacher'), ('s1', 'student'), ('s2', 'student'), ('s3', 'student')]:
+            cursor.execute(
+                "INSERT INTO users (username, password, role, email, full_name) VALUES (?, 'x', ?, ?, ?)",
+                (username, role, f"{username}@sms.test", username.title())
+            )
+            user_ids.append(cursor.lastrowid)
+        conn.commit()
+        cursor.close()
+
+    teacher_user, *student_users = user_ids
+    db.create_teacher(teacher_user, 'E001', 'Math', 'MSc', 'Algebra', 5, '', '')
+    teacher_id = db.get_teacher_by_user_id(teacher_user)['teacher_id']
+    db.create_course('MATH101', 'Algebra', '', 3, 'Math', 1, 50, teacher_id)
+    db.create_course('MATH102', 'Geometry', '', 4, 'Math', 1, 50, teacher_id)
+    course_ids = [course['course_id'] for course in db.get_courses_by_teacher(teacher_id)]
+
+    student_ids = []
+    for index, user_id in enumerate(student_users):
+        db.create_student(user_id, f"R{index + 1:03}", '10', 'A', '2008-01-01', '', '', '', '')
+        student_ids.append(db.get_student_by_user_id(user_id)['student_id'])
+        for course_id in course_ids:
+            db.enroll_student_in_course(student_ids[-1], course_id)
+
+    return {'teacher_id': teacher_id, 'course_ids': course_ids, 'student_ids': student_ids,
+            'student_user_ids': student_users}
+
+def enrollment(db, student_id, course_id):
+    """An enrollment row read past the result cache"""
+    with db.uncached():
+        return next(e for e in db.get_course_enrollments(course_id) if e['student_id'] == student_id)
@@ -0,0 +1,74 @@
+import pytest
+from attendance_store import BitmapAttendanceStore
+from conftest import enrollment
+
+@pytest.fixture(params=["table", "bitmap"])
+def store_db(request, db):
+    """The same database in table and in bitmap attendance mode"""
+    if request.param == "bitmap":
+        db.attendance_store = BitmapAttendanceStore(db)
+    return db
+
+def counters(db, student_id, course_id):
+    row = enrollment(db, student_id, course_id)
+    return row['present_count'], row['total_count'], row['attendance_percentage']
+
+def test_marks_and_upserts_keep_counters_in_sync(store_db, school):
+    db = store_db
+    s1, s2, s3 = school['student_ids']
+    course_id = school['course_ids'][0]
+
+    assert db.mark_attendance(s1, course_id, '2026-09-01', 'present')
+    assert db.mark_attendance(s1, course_id, '2026-09-02', 'absent')
+    assert db.mark_attendance(s1, course_id, '2026-09-03', 'late', 'bus')
+    assert counters(db, s1, course_id) == (2, 3, 66.67)
+
+    # Re-marking a day changes its status, not the number of days
+    assert db.mark_attendance(s1, course_id, '2026-09-02', 'present')
+    assert db.mark_attendance(s1, course_id, '2026-09-03', 'excused')
+    assert counters(db, s1, course_id) == (2, 3, 66.67)
+
+    assert db.mark_attendance_bulk(course_id, '2026-09-04', [
+        (s1, 'present', ''), (s2, 'absent', ''), (s3, 'late', ''),
+    ]) == 3
+    assert db.mark_attendance_bulk(course_id, '2026-09-04', [(s2, 'present', '')]) == 1
+    assert counters(db, s1, course_id) == (3, 4, 75.0)
+    assert counters(db, s2, course_id) == (1, 1, 100.0)
+    assert counters(db, s3, course_id) == (1, 1, 100.0)
+
+    # Other courses are untouched
+    assert counters(db, s1, school['course_ids'][1]) == (0, 0, 0)
+    assert db.verify_attendance_counters() == []
+
+def test_deleting_attendance_rows_updates_counters(db, school):
+    s1, s2, _ = school['student_ids']
+    course_id = school['course_ids'][0]
+    for day, status in [('2026-09-01', 'present'), ('2026-09-02', 'absent'), ('2026-09-03', 'present')]:
+        db.mark_attendance(s1, course_id, day, status)
+        db.mark_attendance(s2, course_id, day, status)
+
+    with db.pool.writer() as conn:
+        conn.execute("DELETE FROM attendance WHERE student_id = ? AND date = '2026-09-01'", (s1,))
+        conn.execute("DELETE FROM attendance WHERE student_id = ?", (s2,))
+        conn.commit()
+
+    assert counters(db, s1, course_id) == (1, 2, 50.0)
+    assert counters(db, s2, course_id) == (0, 0, 0)
+    assert db.verify_attendance_counters() == []
+
+def test_verify_repairs_drifted_counters(store_db, school):
+    db = store_db
+    s1 = school['student_ids'][0]
+    course_id = school['course_ids'][0]
+    db.mark_attendance(s1, course_id, '2026-09-01', 'present')
+    db.mark_attendance(s1, course_id, '2026-09-02', 'absent')
+
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE enrollments SET present_count = 7, total_count = 9 WHERE student_id = ?", (s1,))
+        conn.commit()
+
+    mismatches = db.verify_attendance_counters(repair=True)
+    assert [(m['student_id'], m['actual_present'], m['actual_total']) for m in mismatches if m['course_id'] == course_id] \
+        == [(s1, 1, 2)]
+    assert counters(db, s1, course_id) == (1, 2, 50.0)
+    assert db.verify_attendance_counters() == []
@@ -0,0 +1,86 @@
+from datetime import date
+from archive import TermArchiver
+from conftest import enrollment
+
+def marks(db, student_id, course_id):
+    return enrollment(db, student_id, course_id)['marks']
+
+def create_assignment(db, school, title, total_marks, weightage, due_date='2026-12-01'):
+    course_id = school['course_ids'][0]
+    db.create_assignment(course_id, school['teacher_id'], title, '', total_marks, weightage, due_date)
+    with db.uncached():
+        return next(a['assignment_id'] for a in db.get_assignments_by_course(course_id) if a['title'] == title)
+
+def test_grades_and_rescaling_keep_weighted_sums_in_sync(db, school):
+    s1, s2, s3 = school['student_ids']
+    course_id = school['course_ids'][0]
+    quiz = create_assignment(db, school, 'Quiz', 50, 30)
+    exam = create_assignment(db, school, 'Exam', 100, 70)
+
+    assert db.update_grade(s1, quiz, 40)
+    assert db.update_grade(s1, exam, 90)
+    # 40/50 * 30 + 90/100 * 70 = 87 out of 100
+    assert marks(db, s1, course_id) == 87.0
+    assert db.verify_grade_sums() == []
+
+    # Upsert replaces the old contribution
+    assert db.update_grade(s1, quiz, 25)
+    assert marks(db, s1, course_id) == 78.0
+
+    outcomes = db.update_grades_bulk(exam, [(s2, 50, ''), (s3, '80', ''), (s1, 'n/a', '')])
+    assert [o['success'] for o in outcomes] == [True, True, False]
+    assert marks(db, s2, course_id) == 35.0
+    assert marks(db, s3, course_id) == 56.0
+    assert db.verify_grade_sums() == []
+
+    # Weightage and total changes rescale every student's grade for the assignment
+    assert db.update_assignment_weightage(quiz, 50)
+    assert marks(db, s1, course_id) == round(88 * 100 / 120, 2)
+    assert db.update_assignment_weightage(quiz, 50, total_marks=100)
+    assert marks(db, s1, course_id) == round(75.5 * 100 / 120, 2)
+    assert db.verify_grade_sums() == []
+
+    with db.pool.writer() as conn:
+        conn.execute("DELETE FROM grades WHERE student_id = ? AND assignment_id = ?", (s1, exam))
+        conn.commit()
+    assert marks(db, s1, course_id) == 25.0
+
+    # Deleting the assignment removes its grades' contributions first
+    assert db.delete_assignment(quiz)
+    assert marks(db, s1, course_id) == 0
+    assert marks(db, s2, course_id) == 50.0
+    assert db.verify_grade_sums() == []
+
+def test_verify_repairs_drifted_sums(db, school):
+    s1 = school['student_ids'][0]
+    course_id = school['course_ids'][0]
+    quiz = create_assignment(db, school, 'Quiz', 20, 10)
+    db.update_grade(s1, quiz, 15)
+
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE enrollments SET weighted_score_sum = 0, weight_sum = 3 WHERE student_id = ?", (s1,))
+        conn.commit()
+
+    assert db.verify_grade_sums(repair=True)
+    assert marks(db, s1, course_id) == 75.0
+    assert db.verify_grade_sums() == []
+
+def test_archived_grades_still_balance(db, school, tmp_path):
+    s1 = school['student_ids'][0]
+    course_id = school['course_ids'][0]
+    old = create_assignment(db, school, 'Old', 100, 40, due_date='2025-03-01')
+    new = create_assignment(db, school, 'New', 100, 60)
+    db.update_grade(s1, old, 50)
+    db.update_grade(s1, new, 100)
+    before = marks(db, s1, course_id)
+
+    moved = TermArchiver(db, archive_dir=str(tmp_path / "archive")).archive(date(2026, 1, 1))
+    assert moved[2025]['grades'] == 3
+    assert marks(db, s1, course_id) == before
+    assert db.verify_grade_sums() == []
+
+    # The triggers cannot see archived grades, so the assignment is frozen
+    assert not db.update_assignment_weightage(old, 10)
+    assert not db.delete_assignment(old)
+    assert db.update_assignment_weightage(new, 30)
+    assert db.verify_grade_sums() == []
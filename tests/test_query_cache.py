@@ -0,0 +1,53 @@
+import sqlite3
+
+def test_cached_getter_hits_until_a_write(db, school):
+    course_id = school['course_ids'][0]
+    first = db.get_course_enrollments(course_id)
+    hits = db.cache_stats()['hits']
+    assert db.get_course_enrollments(course_id) == first
+    assert db.cache_stats()['hits'] == hits + 1
+
+    # A write through a Database method drops results that read the table
+    db.mark_attendance(school['student_ids'][0], course_id, '2026-09-01', 'present')
+    fresh = db.get_course_enrollments(course_id)
+    assert [e['total_count'] for e in fresh] == [1, 0, 0]
+
+def test_raw_writer_sql_invalidates_by_table(db, school):
+    student_id = school['student_ids'][0]
+    assert db.get_student_enrollments(student_id)[0]['status'] == 'enrolled'
+
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE enrollments SET status = 'dropped' WHERE student_id = ?", (student_id,))
+        conn.commit()
+    assert db.get_student_enrollments(student_id) == []
+    assert [c['enrolled_students'] for c in db.get_courses_by_teacher(school['teacher_id'])] == [2, 2]
+
+    # Results that do not read the written table stay cached
+    user_id = school['student_user_ids'][0]
+    assert db.get_student_by_user_id(user_id)['phone'] == ''
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE students SET phone = '555' WHERE student_id = ?", (student_id,))
+        conn.commit()
+    hits = db.cache_stats()['hits']
+    assert [c['enrolled_students'] for c in db.get_courses_by_teacher(school['teacher_id'])] == [2, 2]
+    assert db.cache_stats()['hits'] == hits + 1
+    assert db.get_student_by_user_id(user_id)['phone'] == '555'
+
+def test_write_from_another_connection_clears_the_cache(db, school):
+    course_id = school['course_ids'][0]
+    assert len(db.get_course_enrollments(course_id)) == 3
+
+    # Another process's write is only visible through PRAGMA data_version
+    other = sqlite3.connect(db.pool.db_path)
+    other.execute("UPDATE enrollments SET status = 'completed' WHERE course_id = ?", (course_id,))
+    other.commit()
+    other.close()
+    assert db.get_course_enrollments(course_id) == []
+
+def test_uncached_reads_bypass_the_cache(db, school):
+    course_id = school['course_ids'][0]
+    db.get_course_enrollments(course_id)
+    hits = db.cache_stats()['hits']
+    with db.uncached():
+        db.get_course_enrollments(course_id)
+    assert db.cache_stats()['hits'] == hits
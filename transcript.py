@@ -0,0 +1,241 @@
+import sys
+import numpy as np
+import pandas as pd
+from archive import TermArchiver
+
+# (minimum marks, letter, grade points), highest first
+GRADE_SCALE = [
+    (90, 'A', 4.0),
+    (80, 'B', 3.0),
+    (70, 'C', 2.0),
+    (60, 'D', 1.0),
+    (0, 'F', 0.0),
+]
+GRADE_POINTS = {letter: points for _, letter, points in GRADE_SCALE}
+
+# Enrollments that count towards the GPA: graded work or a recorded letter
+# grade. {enrollments} is the live table or the archived_enrollments view.
+CONTRIBUTING_ENROLLMENTS = """
+    SELECT e.student_id, e.course_id, c.course_code, c.course_name,
+           COALESCE(c.semester, 0) AS semester, COALESCE(c.credits, 0) AS credits,
+           e.marks, e.grade, e.status
+    FROM {enrollments} e
+    JOIN courses c ON e.course_id = c.course_id
+    WHERE e.student_id IN ({students})
+      AND e.status != 'dropped'
+      AND (e.weight_sum > 0 OR e.grade IS NOT NULL)
+    ORDER BY e.student_id, semester, c.course_code
+"""
+
+SEMESTER_COLUMNS = ['student_id', 'semester', 'courses', 'credits', 'quality_points', 'gpa',
+                    'cumulative_credits', 'cumulative_gpa']
+SUMMARY_COLUMNS = ['student_id', 'courses', 'credits', 'quality_points', 'gpa']
+
+def letter_grades(marks, grades):
+    """Letter and grade points per course; a recorded letter grade wins over marks"""
+    marks = pd.to_numeric(marks, errors='coerce').fillna(0).to_numpy()
+    conditions = [marks >= minimum for minimum, _, _ in GRADE_SCALE]
+    letters = pd.Series(np.select(conditions, [letter for _, letter, _ in GRADE_SCALE], 'F'), index=grades.index)
+    recorded = grades.fillna('').str.strip().str.upper()
+    letters = letters.where(~recorded.isin(list(GRADE_POINTS)), recorded)
+    return letters, letters.map(GRADE_POINTS).astype(float)
+
+def compute_gpas(courses, student_ids):
+    """Per-semester and cumulative credit-weighted GPAs for contributing course rows
+
+    Returns (semesters, summary) DataFrames; every id in student_ids gets a
+    summary row, with a NULL GPA when it has no graded credits.
+    """
+    # Typed explicitly: an empty result comes back as object columns
+    courses = courses.astype({'student_id': 'int64', 'semester': 'int64', 'credits': 'float64'})
+    courses['letter'], courses['points'] = letter_grades(courses['marks'], courses['grade'])
+    courses['quality_points'] = courses['points'] * courses['credits']
+
+    semesters = courses.groupby(['student_id', 'semester'], sort=True).agg(
+        courses=('course_id', 'size'),
+        credits=('credits', 'sum'),
+        quality_points=('quality_points', 'sum'),
+    ).reset_index()
+    semesters['gpa'] = semesters['quality_points'] / semesters['credits'].where(semesters['credits'] > 0)
+    by_student = semesters.groupby('student_id')
+    semesters['cumulative_credits'] = by_student['credits'].cumsum()
+    cumulative_points = by_student['quality_points'].cumsum()
+    semesters['cumulative_gpa'] = cumulative_points / semesters['cumulative_credits'].where(semesters['cumulative_credits'] > 0)
+
+    summary = semesters.groupby('student_id')[['courses', 'credits', 'quality_points']].sum()
+    summary = summary.reindex(pd.Index(list(student_ids), name='student_id'), fill_value=0).reset_index()
+    summary['gpa'] = summary['quality_points'] / summary['credits'].where(summary['credits'] > 0)
+    return semesters[SEMESTER_COLUMNS].round({'gpa': 2, 'cumulative_gpa': 2}), summary[SUMMARY_COLUMNS].round({'gpa': 2})
+
+def _sql_rows(frame):
+    """DataFrame rows as plain Python tuples with NaN as NULL, for executemany"""
+    return [tuple(None if pd.isna(v) else v.item() if hasattr(v, 'item') else v for v in row)
+            for row in frame.itertuples(index=False, name=None)]
+
+class TranscriptEngine:
+    """Credit-weighted GPA per semester and overall, stored as cached rows
+
+    Results live in transcript_summary/transcript_semesters. Triggers on
+    enrollments and courses delete a student's rows when one of their
+    contributing enrollments changes, so only those students are ever
+    recomputed. Any number of students is computed in one pass: one query,
+    one set of group-bys, one transaction. Enrollments moved to term
+    archives are read back through ATTACH and count like live ones.
+    """
+
+    def __init__(self, db, batch_size=500):
+        self.db = db
+        self.archiver = TermArchiver(db)
+        # Stay under SQLite's bound-parameter limit
+        self.batch_size = batch_size
+
+    def _read_frame(self, sql, params=()):
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(sql, params)
+            frame = pd.DataFrame.from_records(cursor.fetchall(), columns=[c[0] for c in cursor.description])
+            cursor.close()
+        return frame
+
+    def _archived_courses(self, student_ids):
+        """Contributing enrollments of the students found in term archives (None without archives)"""
+        if not self.db.get_term_archives():
+            return None
+        return self.archiver.read_frame(
+            CONTRIBUTING_ENROLLMENTS.format(enrollments='archived_enrollments', students=', '.join('?' * len(student_ids))),
+            student_ids
+        )
+
+    @staticmethod
+    def _with_archived(courses, archived):
+        if archived is None or archived.empty:
+            return courses
+        if courses.empty:
+            return archived
+        return pd.concat([courses, archived], ignore_index=True).sort_values(
+            ['student_id', 'semester', 'course_code'], kind='stable', ignore_index=True)
+
+    def refresh(self, student_ids):
+        """Recompute and store the rows of the given students; returns how many were computed"""
+        student_ids = list(dict.fromkeys(student_ids))
+        for start in range(0, len(student_ids), self.batch_size):
+            self._refresh_batch(student_ids[start:start + self.batch_size])
+        return len(student_ids)
+
+    def _refresh_batch(self, student_ids):
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            # Read and write under one lock so a concurrent grade change cannot slip between
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.row_factory = None
+            cursor.execute(CONTRIBUTING_ENROLLMENTS.format(enrollments='enrollments',
+                                                          students=', '.join('?' * len(student_ids))), student_ids)
+            courses = pd.DataFrame.from_records(cursor.fetchall(), columns=[c[0] for c in cursor.description])
+            # Archives only change under the writer lock held here
+            courses = self._with_archived(courses, self._archived_courses(student_ids))
+            semesters, summary = compute_gpas(courses, student_ids)
+
+            placeholders = ', '.join('?' * len(student_ids))
+            cursor.execute(f"DELETE FROM transcript_semesters WHERE student_id IN ({placeholders})", student_ids)
+            cursor.execute(f"DELETE FROM transcript_summary WHERE student_id IN ({placeholders})", student_ids)
+            cursor.executemany(
+                f"INSERT INTO transcript_semesters ({', '.join(SEMESTER_COLUMNS)}) VALUES ({', '.join('?' * len(SEMESTER_COLUMNS))})",
+                _sql_rows(semesters)
+            )
+            cursor.executemany(
+                f"INSERT INTO transcript_summary ({', '.join(SUMMARY_COLUMNS)}) VALUES ({', '.join('?' * len(SUMMARY_COLUMNS))})",
+                _sql_rows(summary)
+            )
+            conn.commit()
+            cursor.close()
+
+    def refresh_class(self, class_name, section=None):
+        """Recompute every student of a class (optionally one section) in one pass"""
+        if section is None:
+            students = self._read_frame("SELECT student_id FROM students WHERE class_name = ?", (class_name,))
+        else:
+            students = self._read_frame("SELECT student_id FROM students WHERE class_name = ? AND section = ?",
+                                        (class_name, section))
+        return self.refresh(students['student_id'].tolist())
+
+    def refresh_stale(self):
+        """Recompute every student whose stored rows were invalidated; returns how many"""
+        stale = self._read_frame("""
+            SELECT s.student_id FROM students s
+            WHERE NOT EXISTS (SELECT 1 FROM transcript_summary t WHERE t.student_id = s.student_id)
+        """)
+        return self.refresh(stale['student_id'].tolist())
+
+    def _compute(self, student_ids):
+        """(semesters, summary) of the given students computed from a reader, without storing them"""
+        placeholders = ', '.join('?' * len(student_ids))
+        courses = self._read_frame(CONTRIBUTING_ENROLLMENTS.format(enrollments='enrollments', students=placeholders),
+                                   student_ids)
+        return compute_gpas(self._with_archived(courses, self._archived_courses(student_ids)), student_ids)
+
+    def summaries(self, student_ids):
+        """Cumulative GPA rows for the given students
+
+        Stale students are computed in memory in one batch but not stored:
+        this runs from read-only pages, which must not queue on the writer.
+        refresh()/refresh_stale() persist them.
+        """
+        student_ids = list(dict.fromkeys(student_ids))
+        if not student_ids:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        summary = self.db.get_transcript_summaries(tuple(student_ids))
+        computed = set(summary['student_id'])
+        stale = [sid for sid in student_ids if sid not in computed]
+        if not stale:
+            return summary
+        frames = [summary] if not summary.empty else []
+        for start in range(0, len(stale), self.batch_size):
+            frames.append(self._compute(stale[start:start + self.batch_size])[1])
+        summary = pd.concat(frames, ignore_index=True)
+        return summary.set_index('student_id').loc[student_ids].reset_index()[SUMMARY_COLUMNS]
+
+    def transcript(self, student_id):
+        """Everything a transcript shows for one student
+
+        Returns {'courses', 'semesters', 'summary'}: courses is one row per
+        contributing course with its letter and grade points, semesters the
+        per-semester and running GPA, summary the cumulative totals dict.
+        """
+        courses = self._with_archived(
+            self._read_frame(CONTRIBUTING_ENROLLMENTS.format(enrollments='enrollments', students='?'), (student_id,)),
+            self._archived_courses([student_id])
+        )
+        summary = self.db.get_transcript_summaries((student_id,))
+        if not summary.empty:
+            semesters = self.db.get_transcript_semesters(student_id)
+        else:
+            # Stale: computed from the rows just read, not stored (see summaries)
+            semesters, summary = compute_gpas(courses, [student_id])
+            semesters = semesters.drop(columns='student_id')
+        if not courses.empty:
+            courses['letter'], courses['points'] = letter_grades(courses['marks'], courses['grade'])
+        return {
+            'courses': courses,
+            'semesters': semesters,
+            'summary': summary.iloc[0].to_dict() if not summary.empty else {},
+        }
+
+if __name__ == "__main__":
+    from database import Database
+    if len(sys.argv) < 2:
+        print("Usage: python transcript.py class_name [section] | --stale")
+        sys.exit(1)
+    engine = TranscriptEngine(Database())
+    if sys.argv[1] == '--stale':
+        print(f"✅ Recomputed transcripts for {engine.refresh_stale()} students")
+        sys.exit(0)
+    class_name, section = sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None
+    count = engine.refresh_class(class_name, section)
+    print(f"✅ Computed transcripts for {count} students")
+    students = engine._read_frame("SELECT student_id, roll_number FROM students WHERE class_name = ?", (class_name,))
+    summary = engine.summaries(students['student_id'].tolist())
+    rolls = dict(zip(students['student_id'], students['roll_number']))
+    for row in summary.itertuples():
+        gpa = f"{row.gpa:.2f}" if pd.notna(row.gpa) else "N/A"
+        print(f"   {rolls[row.student_id]}: GPA {gpa} over {row.credits:g} credits")
@@ -0,0 +1,208 @@
+import csv
+import io
+import sys
+
+USER_COLUMNS = ['username', 'password', 'role', 'email', 'full_name']
+STUDENT_COLUMNS = ['roll_number', 'class_name', 'section', 'dob', 'phone', 'address', 'guardian_name', 'guardian_phone']
+TEACHER_COLUMNS = ['employee_id', 'department', 'qualification', 'specialization', 'experience', 'phone', 'address']
+
+REQUIRED_BY_ROLE = {
+    'student': ['roll_number', 'class_name', 'section'],
+    'teacher': ['employee_id'],
+    'admin': [],
+}
+
+# Columns checked against their UNIQUE indexes before anything is hashed
+UNIQUE_CHECKS = [
+    ('username', "SELECT username FROM users WHERE username IN ({})"),
+    ('email', "SELECT email FROM users WHERE email IN ({})"),
+    ('roll_number', "SELECT roll_number FROM students WHERE roll_number IN ({})"),
+    ('employee_id', "SELECT employee_id FROM teachers WHERE employee_id IN ({})"),
+]
+
+def template_csv():
+    """Header plus one example row per role, for the download button"""
+    columns = USER_COLUMNS + STUDENT_COLUMNS + [c for c in TEACHER_COLUMNS if c not in STUDENT_COLUMNS]
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns)
+    writer.writeheader()
+    writer.writerow({'username': 'jdoe', 'password': 'changeme', 'role': 'student', 'email': 'jdoe@example.com',
+                     'full_name': 'John Doe', 'roll_number': 'S100', 'class_name': '10', 'section': 'A'})
+    writer.writerow({'username': 'asmith', 'password': 'changeme', 'role': 'teacher', 'email': 'asmith@example.com',
+                     'full_name': 'Anna Smith', 'employee_id': 'T100', 'department': 'Mathematics',
+                     'qualification': 'MSc Mathematics', 'experience': '5'})
+    return out.getvalue()
+
+class UserImporter:
+    """Streams a CSV of users (with student/teacher profiles) into the database
+
+    Rows are read and processed chunk_size at a time: validated, checked
+    against the unique indexes, hashed in parallel on the password process
+    pool, then inserted in one transaction per chunk. Each row gets its own
+    savepoint so a bad row is reported without losing the rest of the chunk.
+    """
+
+    def __init__(self, db, chunk_size=500):
+        self.db = db
+        self.chunk_size = max(1, int(chunk_size))
+
+    def import_csv(self, source, progress=None):
+        """Import from a path, text stream or binary stream (e.g. an uploaded file)
+
+        Returns {'rows', 'imported', 'errors'}; errors is a list of
+        {'line', 'username', 'error'}. progress(rows_read, imported) is
+        called after every chunk.
+        """
+        if isinstance(source, str):
+            with open(source, newline='', encoding='utf-8-sig') as f:
+                return self._import_stream(f, progress)
+        if isinstance(source, (io.RawIOBase, io.BufferedIOBase)) or hasattr(source, 'getbuffer'):
+            source = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+        return self._import_stream(source, progress)
+
+    def _import_stream(self, stream, progress):
+        report = {'rows': 0, 'imported': 0, 'errors': []}
+        # Values seen earlier in this file, so duplicates across chunks are caught
+        seen = {column: set() for column, _ in UNIQUE_CHECKS}
+
+        reader = csv.DictReader(stream)
+        missing = [c for c in USER_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            report['errors'].append({'line': 1, 'username': '', 'error': f"Missing columns: {', '.join(missing)}"})
+            return report
+
+        chunk = []
+        for row in reader:
+            report['rows'] += 1
+            chunk.append((reader.line_num, {k: (v or '').strip() for k, v in row.items() if k}))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk, seen, report)
+                chunk = []
+                if progress:
+                    progress(report['rows'], report['imported'])
+        if chunk:
+            self._import_chunk(chunk, seen, report)
+            if progress:
+                progress(report['rows'], report['imported'])
+        return report
+
+    def _validate(self, row):
+        """First problem with a row's own fields, or None"""
+        for column in USER_COLUMNS:
+            if not row.get(column):
+                return f"{column} is required"
+        role = row['role'].lower()
+        if role not in REQUIRED_BY_ROLE:
+            return f"Unknown role '{row['role']}'"
+        for column in REQUIRED_BY_ROLE[role]:
+            if not row.get(column):
+                return f"{column} is required for {role}"
+        if role == 'teacher' and row.get('experience') and not row['experience'].isdigit():
+            return "experience must be a whole number of years"
+        return None
+
+    @staticmethod
+    def _unique_values(row):
+        """(column, value) pairs of a row that must be unique; profile ids only for their role"""
+        pairs = [('username', row['username']), ('email', row['email'])]
+        if row['role'] == 'student':
+            pairs.append(('roll_number', row['roll_number']))
+        elif row['role'] == 'teacher':
+            pairs.append(('employee_id', row['employee_id']))
+        return pairs
+
+    def _existing_values(self, chunk):
+        """Values in the chunk that already exist in the database, per unique column"""
+        existing = {}
+        with self.db.pool.reader() as conn:
+            cursor = conn.cursor()
+            for column, query in UNIQUE_CHECKS:
+                values = list({row[column] for _, row in chunk if row.get(column)})
+                found = set()
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(values), 500):
+                    batch = values[start:start + 500]
+                    cursor.execute(query.format(', '.join('?' * len(batch))), batch)
+                    found.update(r[0] for r in cursor.fetchall())
+                existing[column] = found
+            cursor.close()
+        return existing
+
+    def _import_chunk(self, chunk, seen, report):
+        existing = self._existing_values(chunk)
+        valid = []
+        for line, row in chunk:
+            row['role'] = row.get('role', '').lower()
+            error = self._validate(row)
+            if error is None:
+                for column, value in self._unique_values(row):
+                    if value in existing[column]:
+                        error = f"{column} '{value}' already exists"
+                        break
+                    if value in seen[column]:
+                        error = f"{column} '{value}' is repeated in the file"
+                        break
+            if error:
+                report['errors'].append({'line': line, 'username': row.get('username', ''), 'error': error})
+                continue
+            for column, value in self._unique_values(row):
+                seen[column].add(value)
+            valid.append((line, row))
+
+        if not valid:
+            return
+        # Hash outside the writer lock, across all hashing processes
+        hashes = self.db.hasher.hash_many([row['password'] for _, row in valid])
+
+        with self.db.pool.writer() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            for (line, row), hashed_password in zip(valid, hashes):
+                cursor.execute("SAVEPOINT import_row")
+                try:
+                    cursor.execute(
+                        "INSERT INTO users (username, password, role, email, full_name) VALUES (?, ?, ?, ?, ?)",
+                        (row['username'], hashed_password, row['role'], row['email'], row['full_name'])
+                    )
+                    user_id = cursor.lastrowid
+                    if row['role'] == 'student':
+                        cursor.execute(
+                            """INSERT INTO students (user_id, roll_number, class_name, section,
+                            dob, phone, address, guardian_name, guardian_phone)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                            (user_id, row['roll_number'], row['class_name'], row['section'],
+                             row.get('dob') or None, row.get('phone', ''), row.get('address', ''),
+                             row.get('guardian_name', ''), row.get('guardian_phone', ''))
+                        )
+                    elif row['role'] == 'teacher':
+                        cursor.execute(
+                            """INSERT INTO teachers (user_id, employee_id, department,
+                            qualification, specialization, experience, phone, address)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                            (user_id, row['employee_id'], row.get('department', ''),
+                             row.get('qualification', ''), row.get('specialization') or 'General',
+                             int(row.get('experience') or 0), row.get('phone', ''), row.get('address', ''))
+                        )
+                    cursor.execute("RELEASE import_row")
+                    report['imported'] += 1
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO import_row")
+                    cursor.execute("RELEASE import_row")
+                    report['errors'].append({'line': line, 'username': row['username'], 'error': str(e)})
+            conn.commit()
+            cursor.close()
+
+if __name__ == "__main__":
+    from database import Database
+    if len(sys.argv) < 2:
+        print("Usage: python user_import.py users.csv [database_path]")
+        sys.exit(1)
+    db = Database(sys.argv[2]) if len(sys.argv) > 2 else Database()
+    result = UserImporter(db).import_csv(
+        sys.argv[1],
+        progress=lambda rows, imported: print(f"   {rows} rows read, {imported} imported")
+    )
+    print(f"✅ Imported {result['imported']} of {result['rows']} rows")
+    for error in result['errors']:
+        print(f"❌ line {error['line']} ({error['username']}): {error['error']}")
+    db.hasher.close()
@@ -0,0 +1,38 @@
+import sys
+from database import Database
+
+def verify_counters(repair=False):
+    db = Database()
+    
+    print("🔍 Checking enrollment attendance counters against attendance records...")
+    mismatches = db.verify_attendance_counters(repair=repair)
+    if not mismatches:
+        print("✅ All attendance counters match")
+    else:
+        for m in mismatches:
+            print(f"   enrollment {m['enrollment_id']} (student {m['student_id']}, course {m['course_id']}): "
+                  f"stored {m['present_count']}/{m['total_count']}, "
+                  f"actual {m['actual_present']}/{m['actual_total']}")
+        if repair:
+            print(f"🔧 Repaired {len(mismatches)} enrollments")
+        else:
+            print(f"⚠️ {len(mismatches)} enrollments out of sync - rerun with --repair to fix")
+    
+    print("🔍 Checking enrollment weighted grade sums against grade records...")
+    grade_mismatches = db.verify_grade_sums(repair=repair)
+    if not grade_mismatches:
+        print("✅ All weighted grade sums match")
+    else:
+        for m in grade_mismatches:
+            print(f"   enrollment {m['enrollment_id']} (student {m['student_id']}, course {m['course_id']}): "
+                  f"stored {m['weighted_score_sum']:.4f}/{m['weight_sum']:.2f}, "
+                  f"actual {m['actual_score_sum']:.4f}/{m['actual_weight_sum']:.2f}")
+        if repair:
+            print(f"🔧 Repaired {len(grade_mismatches)} enrollments")
+        else:
+            print(f"⚠️ {len(grade_mismatches)} enrollments out of sync - rerun with --repair to fix")
+    return not mismatches and not grade_mismatches
+
+if __name__ == "__main__":
+    ok = verify_counters(repair="--repair" in sys.argv)
+    sys.exit(0 if ok or "--repair" in sys.argv else 1)